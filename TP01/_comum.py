@@ -0,0 +1,13 @@
+"""
+Coloca o diretório do repositório no sys.path, para os módulos deste trabalho importarem o pacote comum
+(código compartilhado pelo TP01 e pelo TP02).
+
+Importe este módulo antes de qualquer "from comum...". O diretório entra no fim do sys.path, então os
+módulos deste trabalho continuam tendo prioridade.
+"""
+import os
+import sys
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _RAIZ not in sys.path:
+    sys.path.append(_RAIZ)
@@ -0,0 +1,115 @@
+"""
+Linha de comando do TP01, sem interface gráfica.
+
+Uso:
+    python cli.py mapa.bmp [outro.bmp ...] [--busca buscaBidirecional] [--saida caminhos.jsonl]
+
+Para cada bitmap (ou cada .bmp de um diretório informado), cria o grafo, busca o caminho do pixel
+vermelho até o pixel verde e escreve uma linha JSON com o mapa, a busca, o caminho e o custo. Este
+arquivo não importa o tkinter nem o ImageTk, então roda em servidores sem tela e abre rápido.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from graph import Grafo
+
+# Buscas disponíveis. As de conjunto recebem listas de pixels; as outras, o pixel inicial e o final.
+BUSCAS = ["buscaBidirecional", "buscaLargura", "caminhoMinimo", "buscaSaltos"]
+_BUSCAS_CONJUNTO = {"caminhoMinimo", "buscaSaltos"}
+
+
+def listaMapas(caminhos):
+    """
+    Expande os caminhos informados na linha de comando em uma lista de bitmaps.
+
+    Parâmetros:
+    - caminhos: Arquivos .bmp ou diretórios; de um diretório entram todos os .bmp, em ordem alfabética.
+
+    Retorna:
+    Uma lista com o caminho de cada bitmap.
+    """
+    mapas = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            mapas.extend(
+                os.path.join(caminho, arquivo) for arquivo in sorted(os.listdir(caminho)) if arquivo.lower().endswith(".bmp")
+            )
+        else:
+            mapas.append(caminho)
+    return mapas
+
+
+def resolveMapa(arquivoBitmap, busca="buscaBidirecional", compacto=False, implicito=False):
+    """
+    Cria o grafo de um bitmap e busca o caminho do pixel inicial (vermelho) ao pixel final (verde).
+
+    Parâmetros:
+    - arquivoBitmap: Caminho do bitmap.
+    - busca: Nome do método de busca do Grafo (ver BUSCAS).
+    - compacto, implicito: Repassados ao Grafo.
+
+    Retorna:
+    Um dicionário pronto para virar uma linha JSON, com o caminho como lista de [linha, coluna], o custo
+    (número de arestas, ou None se não há caminho) e os tempos de criação e de busca em segundos. Se o
+    bitmap não puder ser lido, o dicionário traz só o mapa e o "erro".
+    """
+    inicio = time.perf_counter()
+    grafo = Grafo(compacto=compacto, implicito=implicito)
+    # As mensagens do grafo vão para a saída de erro, para não se misturarem às linhas JSON.
+    with contextlib.redirect_stdout(sys.stderr):
+        grafo.criaGrafo(os.path.abspath(arquivoBitmap))
+    if grafo.hashMapa is None:
+        return {"mapa": arquivoBitmap, "erro": "não foi possível ler o bitmap"}
+    criacao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    if busca in _BUSCAS_CONJUNTO:
+        caminho = getattr(grafo, busca)([grafo.pixelInicial], [grafo.pixelFinal])[0]
+    else:
+        caminho = getattr(grafo, busca)(grafo.pixelInicial, grafo.pixelFinal)
+    tempoBusca = time.perf_counter() - inicio
+
+    return {
+        "mapa": arquivoBitmap,
+        "busca": busca,
+        "inicio": list(grafo.pixelInicial) if grafo.pixelInicial else None,
+        "fim": list(grafo.pixelFinal) if grafo.pixelFinal else None,
+        "custo": len(caminho) - 1 if caminho else None,
+        "caminho": [list(pixel) for pixel in caminho],
+        "tempoCriacao": round(criacao, 6),
+        "tempoBusca": round(tempoBusca, 6),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca o menor caminho em bitmaps sem abrir a interface gráfica.")
+    parser.add_argument("mapas", nargs="+", help="Arquivos .bmp ou diretórios com arquivos .bmp.")
+    parser.add_argument("--busca", choices=BUSCAS, default="buscaBidirecional", help="Método de busca do Grafo.")
+    parser.add_argument("--saida", help="Arquivo onde as linhas JSON são escritas (padrão: saída padrão).")
+    parser.add_argument("--compacto", action="store_true", help="Usa o GrafoCompacto (csr.py).")
+    parser.add_argument("--implicito", action="store_true", help="Usa a GradeImplicita (implicit.py).")
+    argumentos = parser.parse_args(argv)
+
+    mapas = listaMapas(argumentos.mapas)
+    if not mapas:
+        parser.error("nenhum arquivo .bmp encontrado")
+
+    saida = open(argumentos.saida, "w", encoding="utf-8") if argumentos.saida else sys.stdout
+    falhas = 0
+    try:
+        for mapa in mapas:
+            resultado = resolveMapa(mapa, argumentos.busca, argumentos.compacto, argumentos.implicito)
+            falhas += "erro" in resultado
+            saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            saida.flush()
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,31 @@
+from collections import deque
+import hashlib
 from PIL import Image
 import os
+import numpy as np
+import _comum  # noqa: F401
+from comum.csr import GrafoCompacto
+from implicit import GradeImplicita
+from comum.jps import BuscaSaltos
+from comum.components import Componentes
+from comum.storage import hashArquivos, salvaArrays, carregaArrays
+
+_GRADE_SOMENTE_LEITURA = "A grade implícita é somente leitura: crie o grafo com implicito=False para alterá-lo."
 
 class Grafo:
-    def __init__(self) -> None:
+    def __init__(self, compacto=False, implicito=False) -> None:
         self.lista = {}
+        self.compacto = compacto
+        self.implicito = implicito
         self.numNos = 0
         self.numArestas = 0
         self.pixelInicial = 0
         self.pixelFinal = 0
+        self.livres = None
+        self._saltos = None
+        self._reverso = None
+        self.componentes = None
+        self.hashMapa = None
 
     def adicionaNo(self, no: any) -> None:
         """
@@ -17,14 +35,19 @@ class Grafo:
         - no: O nó que será adicionado ao grafo.
 
         Essa função verifica se o nó já existe no grafo antes de fazer a adição. Após a adição
-        ela itera o número de nós existentes no grafo.
+        ela itera o número de nós existentes no grafo. A grade implícita é somente leitura e lança ValueError.
         """
+        if isinstance(self.lista, GradeImplicita):
+            raise ValueError(_GRADE_SOMENTE_LEITURA)
         try:
             if self.lista[no] != {}:
                 return
         except KeyError:
             self.lista[no] = {}
             self.numNos += 1
+            self.hashMapa = None
+            if self.componentes is not None:
+                self.componentes.adiciona(no)
 
     def adicionaAresta(self, u, v, pesoAresta):
         """
@@ -35,13 +58,24 @@ class Grafo:
         - v: Nó que será ligado a v.
         - pesoAresta: Peso da aresta que será adicionada entre os nós u e v.
 
-        Essa função adiciona uma aresta (ligação) entre dois nós u e v com o peso informado e
-        itera o número de arestas existentes no grafo.
+        Essa função adiciona uma aresta (ligação) entre dois nós u e v com o peso informado,
+        itera o número de arestas existentes no grafo e atualiza o índice de componentes, se ele existir.
+        A grade implícita é somente leitura e lança ValueError.
         """
+        if isinstance(self.lista, GradeImplicita):
+            raise ValueError(_GRADE_SOMENTE_LEITURA)
+        semSaida = self.componentes is not None and u in self.lista and len(self.lista[u]) == 0
         self.adicionaNo(u)
         self.adicionaNo(v)
         self.lista[u][v] = pesoAresta
         self.numArestas += 1
+        self.hashMapa = None
+
+        if semSaida:
+            # Um nó sem saída pode ter arestas chegando nele e agora vira passagem: o índice é refeito na próxima consulta.
+            self.componentes = None
+        elif self.componentes is not None and len(self.lista[v]) > 0:
+            self.componentes.une(u, v)
 
     def carregaImagem(self, arquivoBitmap):
         """
@@ -73,45 +107,299 @@ class Grafo:
         Parâmetros:
         - arquivoBitmap: Caminho da imagem bitmap a ser mapeada.
 
-        Essa função utiliza o módulo "Image" da biblioteca PIL para abrir e carregar a imagem bitmap
-        especificada pelo usuário. Em seguida, percorre os pixels da imagem, adiciona os nós correspondentes
-        ao grafo, identifica os nós inicial e final a partir das cores dos pixels e, finalmente, conecta
-        os vizinhos no grafo. Por fim, realiza uma busca em largura para caminhos mínimos entre os nós inicial
-        e final.
+        Essa função utiliza o módulo "Image" da biblioteca PIL para abrir a imagem bitmap especificada
+        pelo usuário e lê todos os pixels de uma só vez para um array. Em seguida, encontra os pixels
+        não pretos (nós do grafo) e os nós inicial e final a partir das cores dos pixels com operações
+        sobre o array inteiro e, finalmente, conecta os vizinhos no grafo. Se o grafo foi criado com
+        implicito=True, os vizinhos não são conectados: "lista" vira uma GradeImplicita sobre a máscara.
         """
-        pontosRelativos = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-
         imagem = self.carregaImagem(arquivoBitmap)
 
         if imagem is None:
             print("Arquivo não encontrado!")
+            return
 
-        base, altura = imagem.size
+        pixels = np.asarray(imagem.convert("RGB"))
+        altura, base = pixels.shape[:2]
         """
-        Nesse trecho, peguei nó por linha (horizontal), cada nó por coluna (vertical) e somei
-        eles à cada coordenada da lista "pontosRelativos": superior, inferior, esquerda, direita, 
-        pois um nó pode ter 1 a 4 vizinhos dentro dos limites do grafo (base, altura).
-        Utilizei condições para pegar esses nós e adicionar no grafo.
-        Depois disso peguei as cores inicial (vermelho) e final (verde) identificadas no grafo.
-        Por fim, chamei 2 funções: conectaVizinhos e buscaLargura.
+        Um pixel só entrava no grafo ao ser visitado a partir de um vizinho dentro dos limites (base, altura),
+        então numa imagem de um único pixel nenhum nó é criado. Os nós são os pixels não pretos, e
+        o nó inicial (vermelho) e final (verde) são os últimos pixels dessas cores visitados pela varredura.
         """
-        for linha in range(altura):
-            for coluna in range(base):
-                for dx, dy in pontosRelativos:
-                    novoU, novoV = linha + dx, coluna + dy  # S
-                    if altura > novoU >= 0 and base > novoV >= 0:
-                        novoNo = novoU, novoV
-                        pixel = (novoV, novoU)
-                        corDoPixel = imagem.getpixel(pixel)
-                        if (novoNo) not in self.lista and corDoPixel != (0, 0, 0):
-                            self.adicionaNo(novoNo)
-                        if corDoPixel == (255, 0, 0):
-                            pixelInicial = novoNo
-                            self.pixelInicial = novoNo
-                        if corDoPixel == (0, 255, 0):
-                            pixelFinal = novoNo
-                            self.pixelFinal = novoNo
-        self.conectaVizinhos(base, altura)
+        self.livres = np.any(pixels != 0, axis=2) & (altura * base > 1)
+
+        if self.implicito:
+            self.lista = GradeImplicita(self.livres)
+            self.numNos = len(self.lista)
+        elif self.compacto and len(self.lista) == 0:
+            self.lista = GrafoCompacto((altura, base))
+            self.lista.adicionaNos(np.flatnonzero(self.livres))
+            self.numNos = len(self.lista)
+        else:
+            for no in zip(*(eixo.tolist() for eixo in np.nonzero(self.livres))):
+                if no not in self.lista:
+                    self.lista[no] = {}
+                    self.numNos += 1
+
+        vermelhos = np.all(pixels == (255, 0, 0), axis=2) & self.livres
+        if vermelhos.any():
+            self.pixelInicial = self._ultimoVisitado(vermelhos, altura, base)
+
+        verdes = np.all(pixels == (0, 255, 0), axis=2) & self.livres
+        if verdes.any():
+            self.pixelFinal = self._ultimoVisitado(verdes, altura, base)
+
+        if self.implicito:
+            self.numArestas = self.lista.numArestas()
+        else:
+            self.conectaVizinhos(base, altura)
+
+        self.componentes = self._componentesDaMascara(altura, base)
+        self.hashMapa = hashlib.sha1(repr(pixels.shape).encode() + pixels.tobytes()).hexdigest()
+
+    def chaveMapa(self):
+        """
+        Retorna a chave que identifica o mapa, usada pelo cache de caminhos (ver comum/cache.py).
+
+        A chave é o hash do conteúdo do bitmap (calculado no criaGrafo) junto com a regra de peso do grafo
+        (todas as arestas valem 1). Se o grafo foi alterado depois do criaGrafo, retorna None e as buscas
+        não passam pelo cache.
+        """
+        if self.hashMapa is None:
+            return None
+        return self.hashMapa, 1
+
+    def arestasSeguemMapa(self):
+        """
+        Retorna True se as arestas do grafo ainda são as que a máscara de pixels livres define.
+
+        Vale para um grafo criado com criaGrafo (ou carregado com carregaGrafo) e não alterado depois. O
+        adicionaNo e o adicionaAresta apagam o hashMapa, e a buscaSaltos, que lê a máscara em vez da lista de
+        adjacência, daria custos errados: ela passa a usar o caminhoMinimo.
+        """
+        return self.livres is not None and self.hashMapa is not None
+
+    def _componentesDaMascara(self, altura, base):
+        """
+        Monta o índice de componentes (ver comum/components.py) do grafo recém-criado direto da máscara de pixels livres.
+
+        Parâmetros:
+        - altura: Altura da imagem.
+        - base: Largura da imagem.
+
+        Dois pixels livres vizinhos estão sempre ligados, então as uniões de cada direção saem de uma só vez
+        com fatias da máscara, sem percorrer a lista de adjacência.
+        """
+        componentes = Componentes((altura, base))
+        componentes.adicionaIds(np.flatnonzero(self.livres))
+
+        ids = np.arange(altura * base).reshape(altura, base)
+        horizontais = self.livres[:, :-1] & self.livres[:, 1:]
+        verticais = self.livres[:-1] & self.livres[1:]
+        componentes.uneIds(ids[:, :-1][horizontais], ids[:, 1:][horizontais])
+        componentes.uneIds(ids[:-1][verticais], ids[1:][verticais])
+        return componentes
+
+    def indiceComponentes(self):
+        """
+        Retorna o índice de componentes do grafo.
+
+        O criaGrafo já deixa o índice pronto e o adicionaNo e o adicionaAresta o mantêm atualizado. Quando uma
+        mudança não pode ser aplicada ao índice (um nó sem saída que ganha uma aresta), ele é refeito aqui a
+        partir das arestas do grafo.
+        """
+        if self.componentes is not None:
+            return self.componentes
+
+        if isinstance(self.lista, GrafoCompacto):
+            componentes = Componentes(self.lista.forma)
+            componentes.adicionaIds(self.lista.ids)
+            origens, destinos, _ = self.lista.arestas()
+            comSaida = np.zeros(len(componentes.pai), dtype=bool)
+            comSaida[origens] = True
+            componentes.uneIds(origens[comSaida[destinos]], destinos[comSaida[destinos]])
+        else:
+            componentes = Componentes(self.livres.shape if self.livres is not None else ())
+            for no in self.lista:
+                componentes.adiciona(no)
+            for no in self.lista:
+                for vizinho in self.lista[no]:
+                    if len(self.lista[vizinho]) > 0:
+                        componentes.une(no, vizinho)
+
+        self.componentes = componentes
+        return componentes
+
+    def alcancavel(self, origens, destinos):
+        """
+        Verifica no índice de componentes se algum pixel de destino pode ser alcançado a partir das origens.
+
+        Parâmetros:
+        - origens: Pixels onde a busca começa.
+        - destinos: Pixels onde a busca pode terminar.
+
+        Cada pixel custa uma consulta ao union-find, então a resposta sai sem nenhuma busca. Um destino sem
+        arestas de saída só é alcançável se algum nó que chega nele estiver na componente de uma origem; esses
+        nós vêm do grafoReverso, então o teste custa o número de arestas que chegam no destino.
+
+        Retorna:
+        False quando com certeza não existe caminho; True quando a busca precisa ser feita.
+        """
+        componentes = self.indiceComponentes()
+        raizes = {componentes.raiz(origem) for origem in origens}
+        raizes.discard(None)
+        if not raizes:
+            return False
+
+        for destino in destinos:
+            raiz = componentes.raiz(destino)
+            if raiz is None:
+                continue
+            if raiz in raizes:
+                return True
+            if len(self.lista[destino]) == 0:
+                reverso = self.grafoReverso()
+                if destino in reverso and any(componentes.raiz(no) in raizes for no in reverso[destino]):
+                    return True
+        return False
+
+    def grafoReverso(self):
+        """
+        Retorna o grafo com as arestas invertidas, com as arestas que chegam em cada nó.
+
+        A GradeImplicita é simétrica e é o próprio reverso. O reverso do GrafoCompacto (que sabe se inverter) e o do
+        dicionário "lista" são montados uma vez e reaproveitados enquanto o grafo não mudar (mesma lista e mesmos
+        números de nós e de arestas).
+        """
+        if isinstance(self.lista, GradeImplicita):
+            return self.lista
+
+        chave = (id(self.lista), self.numNos, self.numArestas)
+        if self._reverso is not None and self._reverso[0] == chave:
+            return self._reverso[1]
+
+        if isinstance(self.lista, GrafoCompacto):
+            reverso = self.lista.reverso()
+        else:
+            reverso = {no: {} for no in self.lista}
+            for no in self.lista:
+                for vizinho, peso in self.lista[no].items():
+                    reverso.setdefault(vizinho, {})[no] = peso
+        self._reverso = (chave, reverso)
+        return reverso
+
+    def salvaGrafo(self, diretorio, arquivoBitmap):
+        """
+        Salva o grafo pronto em um diretório de arrays binários (ver comum/storage.py).
+
+        Parâmetros:
+        - diretorio: Diretório onde o grafo será salvo.
+        - arquivoBitmap: Imagem bitmap de onde o grafo foi criado (o mesmo caminho passado ao criaGrafo). O hash
+          do seu conteúdo fica guardado junto com o grafo para que o carregaGrafo recuse o arquivo se a imagem mudar.
+
+        Essa função salva a máscara de pixels livres, os pixels inicial e final, os contadores, o índice de
+        componentes e a lista de adjacência no formato do GrafoCompacto (o dicionário "lista" é convertido;
+        a grade implícita só precisa da máscara).
+        """
+        if self.livres is None:
+            raise ValueError("Só um grafo criado com criaGrafo pode ser salvo.")
+
+        arrays = {"livres": self.livres}
+        if not isinstance(self.lista, GradeImplicita):
+            grafo = self.lista
+            if not isinstance(grafo, GrafoCompacto):
+                grafo = GrafoCompacto(self.livres.shape)
+                grafo.adicionaNos([grafo.codifica(no) for no in self.lista])
+                arestas = [(grafo.codifica(u), grafo.codifica(v), peso) for u in self.lista for v, peso in self.lista[u].items()]
+                if arestas:
+                    grafo.adicionaArestas(*zip(*arestas))
+            grafo.consolida()
+            arrays.update(indice=grafo.indice, ids=grafo.ids, inicio=grafo.inicio, destinos=grafo.destinos, pesos=grafo.pesos)
+
+        componentes = self.indiceComponentes()
+        if not componentes.extras:
+            arrays.update(componentesPai=componentes.pai, componentesPresentes=componentes.presentes)
+
+        diretorioAtual = os.path.dirname(os.path.abspath(__file__))
+        meta = {
+            "origem": hashArquivos(os.path.join(diretorioAtual, arquivoBitmap)),
+            "implicito": isinstance(self.lista, GradeImplicita),
+            "pixelInicial": list(self.pixelInicial) if self.pixelInicial else None,
+            "pixelFinal": list(self.pixelFinal) if self.pixelFinal else None,
+            "numNos": int(self.numNos),
+            "numArestas": int(self.numArestas),
+            "hashMapa": self.hashMapa,
+        }
+        salvaArrays(diretorio, arrays, meta)
+
+    def carregaGrafo(self, diretorio, arquivoBitmap=None):
+        """
+        Carrega um grafo salvo com salvaGrafo, sem abrir a imagem nem refazer a lista de adjacência.
+
+        Parâmetros:
+        - diretorio: Diretório onde o grafo foi salvo.
+        - arquivoBitmap: Imagem bitmap de origem. Se informada, um grafo salvo a partir de outra imagem é recusado.
+
+        Os arrays são mapeados do disco (np.load com mmap_mode), então carregar e fazer a primeira busca em um
+        mapa grande leva milissegundos. A lista de adjacência volta como um GrafoCompacto (ou uma GradeImplicita,
+        se o grafo salvo era implícito).
+
+        Retorna True se o grafo foi carregado, ou False se o diretório não existe, é de outra versão ou está
+        desatualizado.
+        """
+        if arquivoBitmap is not None:
+            arquivoBitmap = os.path.join(os.path.dirname(os.path.abspath(__file__)), arquivoBitmap)
+        carregado = carregaArrays(diretorio, arquivoBitmap)
+        if carregado is None:
+            return False
+        arrays, meta = carregado
+
+        self.livres = arrays["livres"]
+        self.pixelInicial = tuple(meta["pixelInicial"]) if meta["pixelInicial"] else 0
+        self.pixelFinal = tuple(meta["pixelFinal"]) if meta["pixelFinal"] else 0
+        self.numNos = meta["numNos"]
+        self.numArestas = meta["numArestas"]
+
+        self.implicito = meta["implicito"]
+        self.compacto = not self.implicito
+        if self.implicito:
+            self.lista = GradeImplicita(self.livres)
+        else:
+            self.lista = GrafoCompacto(self.livres.shape, arrays["indice"])
+            self.lista.usaArrays(arrays["ids"], arrays["inicio"], arrays["destinos"], arrays["pesos"])
+
+        self.componentes = None
+        if "componentesPai" in arrays:
+            self.componentes = Componentes(self.livres.shape, arrays["componentesPai"], arrays["componentesPresentes"])
+        self._saltos = None
+        self.hashMapa = meta["hashMapa"]
+        return True
+
+    def _ultimoVisitado(self, mascara, altura, base):
+        """
+        Retorna o pixel da máscara que a varredura do criaGrafo visitava por último.
+
+        Parâmetros:
+        - mascara: Array booleano (altura, base) com os pixels candidatos.
+        - altura: Altura da imagem.
+        - base: Largura da imagem.
+
+        A última visita de um pixel vem do vizinho de baixo, se existir; senão do vizinho da direita,
+        da esquerda ou de cima, nessa ordem. A chave combina a posição desse vizinho na varredura e o
+        deslocamento usado por ele.
+        """
+        linhas, colunas = np.nonzero(mascara)
+        chaves = np.select(
+            [linhas < altura - 1, colunas < base - 1, colunas > 0],
+            [
+                ((linhas + 1) * base + colunas) * 4,
+                (linhas * base + colunas + 1) * 4 + 2,
+                (linhas * base + colunas - 1) * 4 + 3,
+            ],
+            ((linhas - 1) * base + colunas) * 4 + 1,
+        )
+        ultimo = np.argmax(chaves)
+        return int(linhas[ultimo]), int(colunas[ultimo])
 
     def conectaVizinhos(self, base, altura):
         """
@@ -121,18 +409,35 @@ class Grafo:
         - base: Largura da imagem.
         - altura: Altura da imagem.
 
-        Essa função percorre todos os nós do grafo e, para cada nó, verifica os vizinhos nas direções
-        superior, inferior, esquerda e direita. Se um vizinho estiver dentro dos limites da imagem e existir
-        no grafo, adiciona uma aresta entre o nó atual e o vizinho.
+        Essa função verifica, para cada nó do grafo, os vizinhos nas direções superior, inferior, esquerda e
+        direita. Se um vizinho estiver dentro dos limites da imagem e existir no grafo, adiciona uma aresta entre
+        o nó atual e o vizinho. Quando o grafo foi criado pelo criaGrafo, os pares de vizinhos de cada direção
+        são encontrados de uma só vez com fatias da máscara de pixels livres.
         """
-        for no in self.lista:
-            linha, coluna = no
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                novoU, novoV = linha + dx, coluna + dy
-                if altura > novoU >= 0 and base > novoV >= 0:
-                    vizinho = novoU, novoV
-                    if vizinho in self.lista:
-                        self.adicionaAresta(no, vizinho, 1)
+        if self.livres is None:
+            for no in self.lista:
+                linha, coluna = no
+                for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                    novoU, novoV = linha + dx, coluna + dy
+                    if altura > novoU >= 0 and base > novoV >= 0:
+                        vizinho = novoU, novoV
+                        if vizinho in self.lista:
+                            self.adicionaAresta(no, vizinho, 1)
+            return
+
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            origens = np.zeros_like(self.livres)
+            origens[max(0, -dx):altura - max(0, dx), max(0, -dy):base - max(0, dy)] = self.livres[
+                max(0, dx):altura + min(0, dx), max(0, dy):base + min(0, dy)
+            ]
+            origens &= self.livres
+            linhas, colunas = np.nonzero(origens)
+            if isinstance(self.lista, GrafoCompacto):
+                self.lista.adicionaArestas(linhas * base + colunas, (linhas + dx) * base + colunas + dy, 1)
+            else:
+                for linha, coluna in zip(linhas.tolist(), colunas.tolist()):
+                    self.lista[linha, coluna][linha + dx, coluna + dy] = 1
+            self.numArestas += len(linhas)
 
     def buscaLargura(self, pixelInicial, pixelFinal):
         """
@@ -143,25 +448,171 @@ class Grafo:
         - pixelFinal: Pixel de destino da busca.
 
         Essa função utiliza a busca em largura para encontrar o menor caminho no grafo entre o pixelInicial
-        e o pixelFinal. Ela mantém distâncias e predecessores para reconstruir o caminho percorrido e retornar
-        esse caminho em tuplas: "(X1, Y1), (X2, Y2), ..."
+        e o pixelFinal. Ela usa uma fila (deque) com remoção em O(1) e mantém distâncias e predecessores para
+        reconstruir o caminho percorrido e retornar esse caminho em tuplas: "(X1, Y1), (X2, Y2), ..."
+        Antes da busca, o índice de componentes descarta em O(1) os pares sem caminho; nesse caso, e sempre que
+        o pixelFinal não for alcançado, a função retorna uma lista vazia.
         """
-        dist = {no: float("inf") for no in self.lista}
-        pred = {no: None for no in self.lista}
-        Q = [pixelInicial]
-        dist[pixelInicial] = 0
+        if pixelInicial not in self.lista or not self.alcancavel([pixelInicial], [pixelFinal]):
+            return []
+
+        # As distâncias e predecessores só guardam os nós alcançados, então a busca não paga pelo grafo inteiro.
+        dist = {pixelInicial: 0}
+        pred = {pixelInicial: None}
+        Q = deque([pixelInicial])
 
         while len(Q) != 0:
-            u = Q.pop(0)
+            u = Q.popleft()
             for v in self.lista[u]:
-                if dist[v] == float("inf"):
+                if v not in dist:
                     Q.append(v)
                     dist[v] = dist[u] + 1
                     pred[v] = u
+            if pixelFinal in pred:
+                break  # O predecessor do pixelFinal não muda mais depois que ele é alcançado
+
+        if pixelFinal not in pred:
+            return []
 
         caminho = self.reconstruirCaminho(pixelFinal, pred)
         return caminho
 
+    def buscaBidirecional(self, pixelInicial, pixelFinal):
+        """
+        Executa a busca em largura bidirecional para encontrar o menor caminho entre dois pixels.
+
+        Parâmetros:
+        - pixelInicial: Pixel de início da busca.
+        - pixelFinal: Pixel de destino da busca.
+
+        Essa função cresce duas fronteiras ao mesmo tempo, uma a partir do pixelInicial e outra a partir do
+        pixelFinal, sempre expandindo um nível inteiro da fronteira menor. A busca de trás anda pelas arestas
+        que chegam em cada nó (ver grafoReverso), então as arestas de um só sentido criadas pelo adicionaAresta
+        são respeitadas. Quando um nível encontra um nó já visitado pela outra busca, todo encontro desse nível
+        tem o mesmo comprimento e o caminho é montado juntando as duas metades. Em corredores longos isso explora cerca de metade da área
+        da buscaLargura.
+
+        Retorna:
+        O caminho em tuplas do pixelInicial ao pixelFinal, ou uma lista vazia se eles não estiverem conectados.
+        """
+        if pixelInicial not in self.lista or pixelFinal not in self.lista:
+            return []
+        if pixelInicial == pixelFinal:
+            return [pixelInicial]
+        if not self.alcancavel([pixelInicial], [pixelFinal]):
+            return []
+
+        reverso = self.grafoReverso()
+        predInicio = {pixelInicial: None}
+        predFim = {pixelFinal: None}
+        fronteiraInicio = [pixelInicial]
+        fronteiraFim = [pixelFinal]
+
+        while fronteiraInicio and fronteiraFim:
+            if len(fronteiraInicio) <= len(fronteiraFim):
+                fronteira, pred, outroPred, grafo = fronteiraInicio, predInicio, predFim, self.lista
+            else:
+                fronteira, pred, outroPred, grafo = fronteiraFim, predFim, predInicio, reverso
+
+            proximaFronteira = []
+            encontro = None
+            for u in fronteira:
+                for v in grafo[u]:
+                    if v not in pred:
+                        pred[v] = u
+                        proximaFronteira.append(v)
+                        if encontro is None and v in outroPred:
+                            encontro = v
+
+            if encontro is not None:
+                caminho = self.reconstruirCaminho(encontro, predInicio)
+                atual = predFim[encontro]
+                while atual is not None:
+                    caminho.append(atual)
+                    atual = predFim[atual]
+                return caminho
+
+            if pred is predInicio:
+                fronteiraInicio = proximaFronteira
+            else:
+                fronteiraFim = proximaFronteira
+
+        return []
+
+    def caminhoMinimo(self, origens, destinos):
+        """
+        Busca o menor caminho entre um conjunto de pixels de origem e um conjunto de pixels de destino.
+
+        Parâmetros:
+        - origens: Pixels onde a busca começa.
+        - destinos: Pixels onde a busca pode terminar.
+
+        Essa função executa uma busca em largura a partir de todas as origens ao mesmo tempo e para assim
+        que o primeiro destino é alcançado, sem percorrer o resto do grafo.
+
+        Retorna:
+        Uma tupla (caminho, custo, destino) com o caminho em tuplas, seu número de arestas e o destino
+        alcançado. Se nenhum destino for alcançável, retorna ([], inf, None), sem busca quando o índice de
+        componentes já mostra que não há caminho.
+        """
+        if not self.alcancavel(origens, destinos):
+            return [], float("inf"), None
+
+        destinos = set(destinos)
+        pred = {}
+        Q = deque()
+        for origem in origens:
+            if origem in self.lista and origem not in pred:
+                if origem in destinos:
+                    return [origem], 0, origem
+                pred[origem] = None
+                Q.append((origem, 0))
+
+        while len(Q) != 0:
+            u, custo = Q.popleft()
+            for v in self.lista[u]:
+                if v not in pred:
+                    pred[v] = u
+                    if v in destinos:
+                        return self.reconstruirCaminho(v, pred), custo + 1, v
+                    Q.append((v, custo + 1))
+
+        return [], float("inf"), None
+
+    def buscaSaltos(self, origens, destinos):
+        """
+        Busca o menor caminho entre um conjunto de origens e um conjunto de destinos com Jump Point Search.
+
+        Parâmetros:
+        - origens: Pixels onde a busca começa.
+        - destinos: Pixels onde a busca pode terminar.
+
+        Como todas as arestas têm peso 1, em vez de expandir cada pixel como a buscaLargura, a busca salta em
+        linha reta pelas áreas abertas e só para em destinos e em pixels onde um obstáculo força uma curva
+        (ver comum/jps.py). O caminho tem o mesmo comprimento do encontrado pela buscaLargura. Se as arestas não
+        seguem mais a máscara (ver arestasSeguemMapa), a busca usa o caminhoMinimo.
+
+        Retorna:
+        Uma tupla (caminho, custo, destino, expandidos) com o caminho em tuplas, seu número de arestas, o destino
+        alcançado e o número de nós expandidos (0 quando a busca usa o caminhoMinimo). Se nenhum destino for
+        alcançável, retorna ([], inf, None, expandidos).
+        """
+        if not self.arestasSeguemMapa():
+            caminho, custo, destino = self.caminhoMinimo(origens, destinos)
+            return caminho, custo, destino, 0
+        if not self.alcancavel(origens, destinos):
+            return [], float("inf"), None, 0
+        if self._saltos is None or self._saltos[0] is not self.livres:
+            self._saltos = (self.livres, BuscaSaltos(self.livres))
+
+        # A grade do comum/jps.py usa (x, y) = (coluna, linha).
+        caminho, custo, destino, expandidos = self._saltos[1].busca(
+            [(coluna, linha) for linha, coluna in origens], [(coluna, linha) for linha, coluna in destinos]
+        )
+        if destino is None:
+            return [], custo, None, expandidos
+        return [(linha, coluna) for coluna, linha in caminho], custo, (destino[1], destino[0]), expandidos
+
     def reconstruirCaminho(self, pixelFinal, pred):
         """
         Reconstrói o caminho percorrido a partir dos predecessores.
@@ -176,7 +627,8 @@ class Grafo:
         atual = pixelFinal  # Inicializa o nó com o pixelFinal, pois a reconstrução vai começar pelo final para ser mais performático.
 
         while atual is not None:
-            caminho.insert(0, atual)  # Insere as coordenadas na lista caminho
-            atual = pred[atual]  # Atualiza o nó atual como sendo o predecessor
+            caminho.append(atual)  # Adiciona as coordenadas no fim da lista caminho, em O(1)
+            atual = pred.get(atual)  # Atualiza o nó atual como sendo o predecessor (nós não alcançados não têm predecessor)
 
+        caminho.reverse()  # O caminho foi montado do pixelFinal para o início
         return caminho
\ No newline at end of file
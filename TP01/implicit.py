@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class GradeImplicita:
+    """
+    Grafo de grade que nunca materializa a lista de adjacência.
+
+    O grafo guarda apenas a máscara (altura, base) de pixels livres (não pretos). Os nós são os pixels
+    livres (linha, coluna) e os vizinhos de cada nó (superior, inferior, esquerda e direita) são
+    calculados na hora a partir das coordenadas, todos com peso 1, como no conectaVizinhos.
+
+    A classe se comporta como o dicionário "lista" (grafo[no], "no in grafo", iteração sobre os nós),
+    então buscaLargura e reconstruirCaminho rodam sobre ela sem alterações, ocupando pouco mais que
+    o próprio bitmap. Ela é somente leitura: grafo[no] devolve um dicionário novo a cada chamada, então
+    o Grafo recusa adicionaNo e adicionaAresta sobre ela.
+    """
+
+    def __init__(self, livres) -> None:
+        self.livres = np.asarray(livres, dtype=bool)
+        self.altura, self.base = self.livres.shape
+
+    def passavel(self, linha, coluna):
+        """
+        Retorna se o pixel (linha, coluna) está dentro da grade e é livre.
+        """
+        return 0 <= linha < self.altura and 0 <= coluna < self.base and bool(self.livres[linha, coluna])
+
+    def vizinhos(self, no):
+        """
+        Calcula os vizinhos de um nó.
+
+        Parâmetros:
+        - no: O nó (linha, coluna).
+
+        Retorna:
+        Um dicionário {vizinho: 1} com os vizinhos livres, na ordem superior, inferior, esquerda e direita.
+        """
+        linha, coluna = no
+        vizinhos = {}
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            if self.passavel(linha + dx, coluna + dy):
+                vizinhos[linha + dx, coluna + dy] = 1
+        return vizinhos
+
+    def __contains__(self, no):
+        try:
+            linha, coluna = no
+        except (TypeError, ValueError):
+            return False
+        return self.passavel(linha, coluna)
+
+    def __getitem__(self, no):
+        if no not in self:
+            raise KeyError(no)
+        return self.vizinhos(no)
+
+    def __iter__(self):
+        for linha in range(self.altura):
+            for coluna in np.flatnonzero(self.livres[linha]).tolist():
+                yield (linha, coluna)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.livres))
+
+    def numArestas(self):
+        """
+        Conta as arestas do grafo sem gerá-las.
+        """
+        verticais = np.count_nonzero(self.livres[1:] & self.livres[:-1])
+        horizontais = np.count_nonzero(self.livres[:, 1:] & self.livres[:, :-1])
+        return 2 * int(verticais + horizontais)
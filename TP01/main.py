@@ -1,7 +1,21 @@
 import tkinter as tk
 from tkinter import filedialog, ttk
-from PIL import Image, ImageTk, ImageDraw
+from PIL import Image, ImageTk
+import numpy as np
 from graph import Grafo
+import _comum  # noqa: F401
+from comum.cache import CacheCaminhos
+from comum.render import CacheBlocos, VAZIA
+from comum.worker import Trabalhador
+
+# Classes de desenho das células e suas cores: nós em branco e o caminho em vermelho.
+NO = 0
+CAMINHO = 1
+PALETA = [(255, 255, 255), (255, 0, 0)]
+
+# Tamanho da janela de desenho, em pixels da tela.
+LARGURA_TELA = 400
+ALTURA_TELA = 600
 
 class InterfaceGrafica:
     def __init__(self, root):
@@ -17,82 +31,160 @@ class InterfaceGrafica:
         self.botaoBuscarCaminho = tk.Button(self.frame, text="Buscar Caminho", command=self.realizarBuscaCaminho)
         self.botaoBuscarCaminho.pack(side=tk.LEFT)
 
-        # Adicionei um range para dar zoom na imagem
-        self.sliderZoom = ttk.Scale(self.frame, from_=0.1, to=5, orient=tk.HORIZONTAL, length=200, value=1, command=self.atualizarZoom)
+        # Adicionei um range para dar zoom na imagem (1 = mapa inteiro na janela)
+        self.sliderZoom = ttk.Scale(self.frame, from_=1, to=50, orient=tk.HORIZONTAL, length=200, value=1, command=self.atualizarZoom)
         self.sliderZoom.pack(side=tk.LEFT, padx=10)
 
+        self.labelStatus = tk.Label(self.frame, text="")
+        self.labelStatus.pack(side=tk.LEFT, padx=10)
+
+        # Arrastar a imagem com o mouse move a janela pelo mapa.
         self.labelImagem = tk.Label(root)
         self.labelImagem.pack()
+        self.labelImagem.bind("<ButtonPress-1>", self.iniciarArraste)
+        self.labelImagem.bind("<B1-Motion>", self.arrastar)
 
         self.caminhoImagem = ""
         self.grafo = None
         self.espacamento = 0
+        # Mudar só o zoom não muda o caminho: as buscas repetidas saem do cache.
+        self.cache = CacheCaminhos()
+        # Zoom e arraste só redesenham a janela visível, a partir de blocos já desenhados (ver comum/render.py).
+        self.blocos = CacheBlocos()
+        self.classes = None
+        self.chaveDesenho = None
+        self.origem = [0, 0]
+        self.inicioArraste = None
+        # Criar o grafo e buscar o caminho rodam fora da thread do Tk, para a janela não travar (ver comum/worker.py).
+        self.trabalhador = Trabalhador(root)
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar)
 
     def carregarImagem(self):
         """
         Abre uma interface para carregar um arquivo de imagem BMP 
         e criar um grafo a partir dele.
+
+        O grafo é criado em segundo plano; escolher outro arquivo antes de terminar descarta o anterior,
+        e o botão de busca fica desabilitado até o grafo novo ficar pronto.
         """
         self.caminhoImagem = filedialog.askopenfilename(filetypes=[("Imagens BMP", "*.bmp")])
         if self.caminhoImagem:
-            grafo = Grafo()
-            grafo.criaGrafo(self.caminhoImagem)
-            self.grafo = grafo
+            caminhoImagem = self.caminhoImagem
+
+            def criaGrafo(progresso):
+                progresso("Criando o grafo...")
+                grafo = Grafo()
+                grafo.criaGrafo(caminhoImagem)
+                return grafo
+
+            self.trabalhador.cancela("busca")
+            self.botaoBuscarCaminho.config(state=tk.DISABLED)
+            self.trabalhador.executa("grafo", criaGrafo, self.grafoCriado, self.tarefaFalhou, self.mostrarProgresso)
+
+    def grafoCriado(self, grafo):
+        self.grafo = grafo
+        self.classes = None
+        self.origem = [0, 0]
+        self.botaoBuscarCaminho.config(state=tk.NORMAL)
+        self.mostrarProgresso(f"Grafo com {grafo.numNos} nós")
 
     def realizarBuscaCaminho(self):
         """
-        Realiza a busca em largura no grafo e desenha o caminho na imagem.
-        A imagem é rotacionada e espelhada horizontalmente para ficar visualizada igual a
-        imagem fornecida.
+        Realiza a busca em largura (bidirecional) no grafo e desenha o caminho na imagem.
+        A busca e as classes de cor das células são feitas em segundo plano, uma vez por
+        busca; o desenho da janela visível fica com o desenharJanela.
         """
         if self.grafo:
-            zoom = self.sliderZoom.get()
-            larguraTela = 600
-            alturaTela = 400
-            self.espacamento = min(larguraTela, alturaTela) / max(self.grafo.numNos, 1) * zoom
-
-            imagemBranca = Image.new("RGB", (larguraTela, alturaTela), "white")
-            draw = ImageDraw.Draw(imagemBranca)
-
-            for i, pixel in enumerate(self.grafo.lista):
-                x, y = pixel
-                centroX = (x + 0.5) * self.espacamento
-                centroY = (y + 0.5) * self.espacamento
-                raio = 0.4 * self.espacamento
-                draw.ellipse(
-                    [centroX - raio, centroY - raio, centroX + raio, centroY + raio],
-                    outline="black",
-                    fill="white"
-                )
-
-            caminho = self.grafo.buscaLargura(self.grafo.pixelInicial, self.grafo.pixelFinal)
-
-            self.desenharCaminho(imagemBranca, caminho, self.espacamento)
-
-            imagemBranca = imagemBranca.rotate(-90, expand=True)
-            imagemBranca = imagemBranca.transpose(Image.FLIP_LEFT_RIGHT)
-            imagemBrancaTk = ImageTk.PhotoImage(imagemBranca)
-            self.labelImagem.config(image=imagemBrancaTk)
-            self.labelImagem.imagem = imagemBrancaTk
-
-    def desenharCaminho(self, imagem, caminho, espacamento):
-        draw = ImageDraw.Draw(imagem)
-        corCaminho = (255, 0, 0)
-
-        for pixel in caminho:
-            x, y = pixel
-            centroX = (x + 0.5) * espacamento
-            centroY = (y + 0.5) * espacamento
-            raio = 0.4 * espacamento
-            draw.ellipse(
-                [centroX - raio, centroY - raio, centroX + raio, centroY + raio],
-                outline="black",
-                fill=corCaminho
-            )
+            grafo = self.grafo
 
-    def atualizarZoom(self, _=None):
-        self.realizarBuscaCaminho()
+            def buscaCaminho(progresso):
+                progresso("Buscando o caminho...")
+                caminho = self.cache.consulta(grafo, "buscaBidirecional", grafo.pixelInicial, grafo.pixelFinal)
+                progresso("Preparando o desenho...")
+                return grafo, caminho, self.classesDesenho(grafo, caminho)
+
+            self.trabalhador.executa("busca", buscaCaminho, self.caminhoEncontrado, self.tarefaFalhou, self.mostrarProgresso)
+
+    def caminhoEncontrado(self, resultado):
+        grafo, caminho, self.classes = resultado
+        self.chaveDesenho = (grafo.chaveMapa() or id(grafo), hash(tuple(caminho)))
+        self.mostrarProgresso(f"Caminho com {len(caminho)} pixels" if caminho else "Nenhum caminho encontrado")
+        self.desenharJanela()
+
+    def mostrarProgresso(self, mensagem):
+        self.labelStatus.config(text=mensagem)
+
+    def tarefaFalhou(self, erro):
+        self.botaoBuscarCaminho.config(state=tk.NORMAL if self.grafo else tk.DISABLED)
+        self.mostrarProgresso(f"Erro: {erro}")
 
-root = tk.Tk()
-interface = InterfaceGrafica(root)
-root.mainloop()
+    def fechar(self):
+        self.trabalhador.fecha()
+        self.root.destroy()
+
+    def desenharJanela(self):
+        """
+        Desenha a parte do mapa que aparece na janela, com o zoom e a posição atuais.
+
+        O espaçamento com zoom 1 faz o mapa inteiro caber na janela. Só os blocos visíveis do mapa desenhado
+        são usados, e os que já estão no cache não são desenhados de novo, então o zoom e o arraste respondem
+        na hora mesmo em mapas grandes, sem refazer a busca.
+        """
+        if self.classes is None:
+            return
+        alturaMapa, base = self.classes.shape
+        self.espacamento = min(LARGURA_TELA / base, ALTURA_TELA / alturaMapa) * self.sliderZoom.get()
+
+        # A janela não passa da borda do mapa desenhado.
+        self.origem[0] = min(max(0, self.origem[0]), max(0, int(base * self.espacamento) - LARGURA_TELA))
+        self.origem[1] = min(max(0, self.origem[1]), max(0, int(alturaMapa * self.espacamento) - ALTURA_TELA))
+
+        janela = self.blocos.desenhaJanela(
+            self.chaveDesenho, self.classes, PALETA, (LARGURA_TELA, ALTURA_TELA), self.espacamento, self.origem
+        )
+        imagemBrancaTk = ImageTk.PhotoImage(Image.fromarray(janela))
+        self.labelImagem.config(image=imagemBrancaTk)
+        self.labelImagem.imagem = imagemBrancaTk
+
+    def classesDesenho(self, grafo, caminho):
+        """
+        Monta as classes de cor das células do mapa: NO para os pixels do grafo, CAMINHO para os do caminho
+        e VAZIA (não desenhada) para os pixels pretos.
+        """
+        classes = np.where(grafo.livres, NO, VAZIA).astype(np.uint8)
+        if caminho:
+            linhas, colunas = np.array(caminho).T
+            classes[linhas, colunas] = CAMINHO
+        return classes
+
+    def atualizarZoom(self, _=None):
+        """
+        Redesenha a janela com o novo zoom, mantendo no centro o mesmo ponto do mapa.
+        """
+        if self.classes is None or self.espacamento == 0:
+            return
+        alturaMapa, base = self.classes.shape
+        novoEspacamento = min(LARGURA_TELA / base, ALTURA_TELA / alturaMapa) * self.sliderZoom.get()
+        escala = novoEspacamento / self.espacamento
+        self.origem[0] = int((self.origem[0] + LARGURA_TELA / 2) * escala - LARGURA_TELA / 2)
+        self.origem[1] = int((self.origem[1] + ALTURA_TELA / 2) * escala - ALTURA_TELA / 2)
+        self.desenharJanela()
+
+    def iniciarArraste(self, evento):
+        self.inicioArraste = (evento.x, evento.y)
+
+    def arrastar(self, evento):
+        """
+        Move a janela pelo mapa acompanhando o mouse.
+        """
+        if self.inicioArraste is None or self.classes is None:
+            return
+        self.origem[0] -= evento.x - self.inicioArraste[0]
+        self.origem[1] -= evento.y - self.inicioArraste[1]
+        self.inicioArraste = (evento.x, evento.y)
+        self.desenharJanela()
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    interface = InterfaceGrafica(root)
+    root.mainloop()
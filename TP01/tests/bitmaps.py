@@ -0,0 +1,55 @@
+import numpy as np
+from PIL import Image
+from graph import Grafo
+
+PRETO = (0, 0, 0)
+BRANCO = (255, 255, 255)
+CINZA = (128, 128, 128)
+VERMELHO = (255, 0, 0)
+VERDE = (0, 255, 0)
+
+# Cores sorteadas nos bitmaps aleatórios e a probabilidade de cada uma.
+_CORES = np.array([BRANCO, PRETO, CINZA], dtype=np.uint8)
+_PROBABILIDADES = [0.6, 0.3, 0.1]
+
+
+def pixelsAleatorios(semente, altura=12, base=16, vermelhos=2, verdes=2):
+    """
+    Sorteia os pixels RGB (altura, base, 3) de um bitmap com alguns pixels vermelhos e verdes em posições
+    sorteadas (o criaGrafo escolhe o último de cada cor visitado pela varredura).
+    """
+    gerador = np.random.default_rng(semente)
+    pixels = _CORES[gerador.choice(len(_CORES), size=(altura, base), p=_PROBABILIDADES)]
+    for cor, quantidade in [(VERMELHO, vermelhos), (VERDE, verdes)]:
+        for _ in range(quantidade):
+            pixels[tuple(gerador.integers(0, (altura, base)))] = cor
+    return pixels
+
+
+def gravaBitmap(caminho, pixels):
+    """
+    Grava os pixels RGB em um .bmp e retorna o caminho dele como texto.
+    """
+    Image.fromarray(np.asarray(pixels, dtype=np.uint8)).save(caminho)
+    return str(caminho)
+
+
+def grafoDoBitmap(caminho, **opcoes):
+    """
+    Cria o Grafo do bitmap com as opções do construtor (compacto, implicito).
+    """
+    grafo = Grafo(**opcoes)
+    grafo.criaGrafo(caminho)
+    return grafo
+
+
+def custoDoCaminho(grafo, caminho, origens, destinos):
+    """
+    Confere que o caminho sai de uma origem, chega a um destino e só usa arestas do grafo, e retorna o custo dele.
+    """
+    assert caminho[0] in set(origens) and caminho[-1] in set(destinos)
+    custo = 0
+    for u, v in zip(caminho, caminho[1:]):
+        assert v in grafo.lista[u], (u, v)
+        custo += grafo.lista[u][v]
+    return custo
@@ -0,0 +1,17 @@
+import os
+import sys
+import pytest
+
+# Os testes importam os módulos do TP01 como os scripts dele: a partir do próprio diretório do trabalho.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitmaps import gravaBitmap, pixelsAleatorios  # noqa: E402
+
+
+@pytest.fixture
+def criaBitmap(tmp_path):
+    """
+    Retorna uma função que grava um bitmap aleatório em tmp_path (ver bitmaps.pixelsAleatorios) e devolve o
+    caminho dele.
+    """
+    return lambda semente, **opcoes: gravaBitmap(tmp_path / f"mapa_{semente}.bmp", pixelsAleatorios(semente, **opcoes))
@@ -0,0 +1,136 @@
+import math
+import os
+import numpy as np
+import pytest
+from bitmaps import custoDoCaminho, grafoDoBitmap, gravaBitmap
+
+SEMENTES = range(8)
+OPCOES = [{}, {"compacto": True}, {"implicito": True}]
+
+
+def _pares(grafo, semente, quantidade=12):
+    """
+    Sorteia pares (origem, destino) entre os nós do grafo, começando pelo pixel inicial e o final.
+    """
+    nos = sorted(grafo.lista)
+    gerador = np.random.default_rng(semente)
+    pares = [(grafo.pixelInicial, grafo.pixelFinal)]
+    for _ in range(quantidade):
+        i, j = gerador.integers(0, len(nos), size=2)
+        pares.append((nos[i], nos[j]))
+    return pares
+
+
+def _custoLargura(grafo, origem, destino):
+    caminho = grafo.buscaLargura(origem, destino)
+    return custoDoCaminho(grafo, caminho, [origem], [destino]) if caminho else math.inf
+
+
+def _editaArestas(grafo, semente, quantidade=10):
+    """
+    Adiciona ao grafo arestas de um só sentido entre nós sorteados, inclusive nós sem vizinhos livres, que
+    viram destinos sem arestas de saída.
+    """
+    nos = sorted(grafo.lista)
+    gerador = np.random.default_rng(semente)
+    for _ in range(quantidade):
+        i, j = gerador.integers(0, len(nos), size=2)
+        grafo.adicionaAresta(nos[i], nos[j], 1)
+
+
+@pytest.mark.parametrize("opcoes", OPCOES)
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_buscasIguaisABuscaLargura(criaBitmap, opcoes, semente):
+    grafo = grafoDoBitmap(criaBitmap(semente), **opcoes)
+    for origem, destino in _pares(grafo, semente):
+        esperado = _custoLargura(grafo, origem, destino)
+
+        caminho = grafo.buscaBidirecional(origem, destino)
+        assert (custoDoCaminho(grafo, caminho, [origem], [destino]) if caminho else math.inf) == esperado
+
+        caminho, custo, alcancado = grafo.caminhoMinimo([origem], [destino])
+        assert custo == esperado
+        if caminho:
+            assert alcancado == destino and custoDoCaminho(grafo, caminho, [origem], [destino]) == custo
+
+        caminho, custo, alcancado, _ = grafo.buscaSaltos([origem], [destino])
+        assert custo == esperado
+        if caminho:
+            assert alcancado == destino and custoDoCaminho(grafo, caminho, [origem], [destino]) == custo
+
+
+@pytest.mark.parametrize("opcoes", OPCOES[:2])
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_buscasNoMapaEditado(criaBitmap, opcoes, semente):
+    grafo = grafoDoBitmap(criaBitmap(semente), **opcoes)
+    _editaArestas(grafo, semente)
+    for origem, destino in _pares(grafo, semente + 100):
+        esperado = _custoLargura(grafo, origem, destino)
+
+        caminho = grafo.buscaBidirecional(origem, destino)
+        assert (custoDoCaminho(grafo, caminho, [origem], [destino]) if caminho else math.inf) == esperado
+
+        for busca in [grafo.caminhoMinimo, grafo.buscaSaltos]:
+            caminho, custo = busca([origem], [destino])[:2]
+            assert custo == esperado
+            if caminho:
+                assert custoDoCaminho(grafo, caminho, [origem], [destino]) == custo
+
+
+@pytest.mark.parametrize("opcoes", OPCOES[:2])
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_conjuntosDeOrigensEDestinos(criaBitmap, opcoes, semente):
+    grafo = grafoDoBitmap(criaBitmap(semente), **opcoes)
+    _editaArestas(grafo, semente)
+    pares = _pares(grafo, semente + 200, quantidade=6)
+    origens, destinos = [origem for origem, _ in pares], [destino for _, destino in pares]
+    esperado = min(_custoLargura(grafo, origem, destino) for origem in origens for destino in destinos)
+
+    for busca in [grafo.caminhoMinimo, grafo.buscaSaltos]:
+        caminho, custo, destino = busca(origens, destinos)[:3]
+        assert custo == esperado
+        if caminho:
+            assert caminho[-1] == destino and custoDoCaminho(grafo, caminho, origens, destinos) == custo
+
+
+@pytest.mark.parametrize("opcoes", OPCOES[:2])
+def test_buscaSaltosNoToyEditado(opcoes):
+    # O atalho do pixel inicial até um vizinho do final não existe na máscara: a busca precisa ver a lista.
+    grafo = grafoDoBitmap(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "toy.bmp"), **opcoes)
+    assert grafo.buscaSaltos([grafo.pixelInicial], [grafo.pixelFinal])[1] > 2
+    vizinhoDoFinal = next(iter(grafo.lista[grafo.pixelFinal]))
+    grafo.adicionaAresta(grafo.pixelInicial, vizinhoDoFinal, 1)
+    assert not grafo.arestasSeguemMapa()
+    caminho, custo, destino, _ = grafo.buscaSaltos([grafo.pixelInicial], [grafo.pixelFinal])
+    assert custo == 2 and caminho == [grafo.pixelInicial, vizinhoDoFinal, grafo.pixelFinal]
+
+
+@pytest.mark.parametrize("opcoes", OPCOES)
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_alcancavelIgualABuscaLargura(criaBitmap, opcoes, semente):
+    grafo = grafoDoBitmap(criaBitmap(semente), **opcoes)
+    if not opcoes.get("implicito"):
+        _editaArestas(grafo, semente)
+    for origem, destino in _pares(grafo, semente + 300, quantidade=30):
+        if _custoLargura(grafo, origem, destino) < math.inf:
+            assert grafo.alcancavel([origem], [destino])
+    assert not grafo.alcancavel([(-1, -1)], [grafo.pixelFinal])
+
+
+@pytest.mark.parametrize("opcoes", OPCOES[:2])
+def test_destinoSemArestasDeSaida(tmp_path, opcoes):
+    # O pixel (0, 3) está cercado de pretos: só a aresta de um sentido adicionada chega nele.
+    pixels = np.full((3, 5, 3), 255, dtype=np.uint8)
+    pixels[:, 2] = 0
+    pixels[1, 3:] = 0
+    pixels[0, 4] = 0
+    grafo = grafoDoBitmap(gravaBitmap(tmp_path / "mapa.bmp", pixels), **opcoes)
+    assert len(grafo.lista[0, 3]) == 0
+    assert not grafo.alcancavel([(0, 0)], [(0, 3)]) and grafo.buscaLargura((0, 0), (0, 3)) == []
+
+    grafo.adicionaAresta((0, 1), (0, 3), 1)
+    assert grafo.alcancavel([(0, 0)], [(0, 3)])
+    assert grafo.buscaLargura((0, 0), (0, 3)) == [(0, 0), (0, 1), (0, 3)]
+    assert grafo.buscaBidirecional((0, 0), (0, 3)) == [(0, 0), (0, 1), (0, 3)]
+    assert grafo.caminhoMinimo([(0, 0)], [(0, 3)])[1] == 2
+    assert grafo.buscaLargura((0, 3), (0, 0)) == []
@@ -0,0 +1,49 @@
+import json
+import cli
+from bitmaps import grafoDoBitmap, gravaBitmap, pixelsAleatorios
+
+
+def test_listaMapas(tmp_path):
+    pasta = tmp_path / "mapas"
+    pasta.mkdir()
+    for nome in ["b.bmp", "a.BMP", "leia.txt"]:
+        (pasta / nome).write_bytes(b"")
+    avulso = str(tmp_path / "c.bmp")
+    assert cli.listaMapas([str(pasta), avulso]) == [str(pasta / "a.BMP"), str(pasta / "b.bmp"), avulso]
+
+
+def test_resolveMapaEmTodasAsBuscas(criaBitmap):
+    bitmap = criaBitmap(0)
+    grafo = grafoDoBitmap(bitmap)
+    esperado = len(grafo.buscaLargura(grafo.pixelInicial, grafo.pixelFinal)) - 1
+    assert esperado > 0
+    for busca in cli.BUSCAS:
+        for opcoes in [{}, {"compacto": True}, {"implicito": True}]:
+            resultado = cli.resolveMapa(bitmap, busca, **opcoes)
+            assert resultado["busca"] == busca and resultado["custo"] == esperado
+            assert resultado["inicio"] == list(grafo.pixelInicial) and resultado["fim"] == list(grafo.pixelFinal)
+            assert [tuple(pixel) for pixel in resultado["caminho"]][0] == grafo.pixelInicial
+
+
+def test_resolveMapaSemCaminho(tmp_path):
+    pixels = pixelsAleatorios(0, 3, 5, vermelhos=0, verdes=0)
+    pixels[:, 2] = 0
+    pixels[0, 0] = (255, 0, 0)
+    pixels[0, 4] = (0, 255, 0)
+    resultado = cli.resolveMapa(gravaBitmap(tmp_path / "mapa.bmp", pixels))
+    assert resultado["custo"] is None and resultado["caminho"] == []
+
+
+def test_mainEscreveUmaLinhaPorMapa(tmp_path, criaBitmap):
+    bitmaps = [criaBitmap(semente) for semente in range(3)]
+    saida = tmp_path / "caminhos.jsonl"
+    assert cli.main([str(tmp_path), "--busca", "buscaLargura", "--saida", str(saida)]) == 0
+    linhas = [json.loads(linha) for linha in saida.read_text(encoding="utf-8").splitlines()]
+    assert [linha["mapa"] for linha in linhas] == sorted(bitmaps)
+    assert all(linha["busca"] == "buscaLargura" and "erro" not in linha for linha in linhas)
+
+
+def test_mainContaFalhas(tmp_path):
+    saida = tmp_path / "caminhos.jsonl"
+    assert cli.main([str(tmp_path / "nao_existe.bmp"), "--saida", str(saida)]) == 1
+    assert "erro" in json.loads(saida.read_text(encoding="utf-8"))
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from bitmaps import grafoDoBitmap, gravaBitmap, pixelsAleatorios
+
+OPCOES = [{}, {"compacto": True}, {"implicito": True}]
+
+
+def _varreduraOriginal(pixels):
+    """
+    Refaz, pixel a pixel, a varredura original do criaGrafo: cada pixel visita os vizinhos acima, abaixo, à
+    esquerda e à direita; a primeira visita a um pixel não preto cria o nó, toda visita a um vermelho ou verde
+    troca o pixel inicial ou final, e no fim o conectaVizinhos liga cada nó aos vizinhos que também são nós.
+    """
+    cores = [[tuple(pixel) for pixel in linha] for linha in pixels.tolist()]
+    altura, base = len(cores), len(cores[0])
+    nos, pixelInicial, pixelFinal = set(), 0, 0
+    for linha in range(altura):
+        for coluna in range(base):
+            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                novoU, novoV = linha + dx, coluna + dy
+                if altura > novoU >= 0 and base > novoV >= 0:
+                    cor = cores[novoU][novoV]
+                    if cor != (0, 0, 0):
+                        nos.add((novoU, novoV))
+                    if cor == (255, 0, 0):
+                        pixelInicial = (novoU, novoV)
+                    if cor == (0, 255, 0):
+                        pixelFinal = (novoU, novoV)
+
+    arestas = set()
+    for linha, coluna in nos:
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            if (linha + dx, coluna + dy) in nos:
+                arestas.add(((linha, coluna), (linha + dx, coluna + dy)))
+    return nos, pixelInicial, pixelFinal, arestas
+
+
+def _arestas(grafo):
+    return {(u, v) for u in grafo.lista for v in grafo.lista[u]}
+
+
+@pytest.mark.parametrize("opcoes", OPCOES)
+@pytest.mark.parametrize("semente", range(4))
+@pytest.mark.parametrize("forma", [(1, 1), (1, 7), (6, 1), (2, 2), (9, 13), (12, 16)])
+def test_criaGrafoIgualAVarreduraOriginal(tmp_path, opcoes, semente, forma):
+    pixels = pixelsAleatorios(semente, *forma)
+    grafo = grafoDoBitmap(gravaBitmap(tmp_path / "mapa.bmp", pixels), **opcoes)
+    nos, pixelInicial, pixelFinal, arestas = _varreduraOriginal(pixels)
+    assert set(grafo.lista) == nos and grafo.numNos == len(nos)
+    assert grafo.pixelInicial == pixelInicial and grafo.pixelFinal == pixelFinal
+    assert _arestas(grafo) == arestas and grafo.numArestas == len(arestas)
+
+
+def test_pixelSemCorNaoVira(tmp_path):
+    # Só o vermelho e o verde puros marcam o início e o fim; um tom próximo é um pixel livre comum.
+    pixels = np.full((3, 4, 3), 255, dtype=np.uint8)
+    pixels[1, 1] = (254, 0, 0)
+    pixels[2, 3] = (0, 255, 0)
+    grafo = grafoDoBitmap(gravaBitmap(tmp_path / "mapa.bmp", pixels))
+    assert grafo.pixelInicial == 0 and grafo.pixelFinal == (2, 3)
+    assert (1, 1) in grafo.lista
+
+
+def test_bitmapInexistenteNaoCriaGrafo(tmp_path):
+    grafo = grafoDoBitmap(str(tmp_path / "nao_existe.bmp"))
+    assert grafo.hashMapa is None and len(grafo.lista) == 0
+
+
+@pytest.mark.parametrize("opcoes", OPCOES[:2])
+def test_adicionaArestaInvalidaHashMapa(criaBitmap, opcoes):
+    grafo = grafoDoBitmap(criaBitmap(0), **opcoes)
+    chave = grafo.hashMapa
+    assert chave is not None
+    grafo.adicionaAresta(grafo.pixelInicial, grafo.pixelFinal, 1)
+    assert grafo.hashMapa is None and grafo.pixelFinal in grafo.lista[grafo.pixelInicial]
+
+
+def test_gradeImplicitaSomenteLeitura(criaBitmap):
+    grafo = grafoDoBitmap(criaBitmap(0), implicito=True)
+    numArestas = grafo.numArestas
+    with pytest.raises(ValueError):
+        grafo.adicionaAresta(grafo.pixelInicial, grafo.pixelFinal, 1)
+    with pytest.raises(ValueError):
+        grafo.adicionaNo((0, 0))
+    assert grafo.numArestas == numArestas and grafo.hashMapa is not None
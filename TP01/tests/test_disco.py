@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from bitmaps import grafoDoBitmap, gravaBitmap, pixelsAleatorios
+from graph import Grafo
+
+
+@pytest.mark.parametrize("opcoes", [{}, {"compacto": True}, {"implicito": True}])
+@pytest.mark.parametrize("semente", range(4))
+def test_salvaECarregaGrafo(tmp_path, criaBitmap, opcoes, semente):
+    bitmap = criaBitmap(semente)
+    grafo = grafoDoBitmap(bitmap, **opcoes)
+    grafo.salvaGrafo(str(tmp_path / "grafo"), bitmap)
+
+    carregado = Grafo()
+    assert carregado.carregaGrafo(str(tmp_path / "grafo"), bitmap)
+    assert carregado.implicito == bool(opcoes.get("implicito"))
+    assert (carregado.pixelInicial, carregado.pixelFinal) == (grafo.pixelInicial, grafo.pixelFinal)
+    assert (carregado.numNos, carregado.numArestas, carregado.hashMapa) == (grafo.numNos, grafo.numArestas, grafo.hashMapa)
+    assert {(u, v) for u in carregado.lista for v in carregado.lista[u]} == {(u, v) for u in grafo.lista for v in grafo.lista[u]}
+    assert carregado.buscaLargura(grafo.pixelInicial, grafo.pixelFinal) == grafo.buscaLargura(grafo.pixelInicial, grafo.pixelFinal)
+    assert carregado.buscaSaltos([grafo.pixelInicial], [grafo.pixelFinal])[1] == grafo.caminhoMinimo([grafo.pixelInicial], [grafo.pixelFinal])[1]
+
+
+def test_salvaGrafoEditado(tmp_path, criaBitmap):
+    # As arestas adicionadas depois do criaGrafo vão junto com a lista de adjacência.
+    bitmap = criaBitmap(0)
+    grafo = grafoDoBitmap(bitmap)
+    grafo.adicionaAresta(grafo.pixelInicial, grafo.pixelFinal, 1)
+    grafo.salvaGrafo(str(tmp_path / "grafo"), bitmap)
+
+    carregado = Grafo()
+    assert carregado.carregaGrafo(str(tmp_path / "grafo"), bitmap)
+    assert carregado.hashMapa is None
+    assert carregado.buscaLargura(grafo.pixelInicial, grafo.pixelFinal) == [grafo.pixelInicial, grafo.pixelFinal]
+
+
+def test_carregaGrafoRecusaBitmapAlterado(tmp_path, criaBitmap):
+    bitmap = criaBitmap(0)
+    grafoDoBitmap(bitmap).salvaGrafo(str(tmp_path / "grafo"), bitmap)
+    gravaBitmap(bitmap, pixelsAleatorios(1))
+    assert not Grafo().carregaGrafo(str(tmp_path / "grafo"), bitmap)
+    assert not Grafo().carregaGrafo(str(tmp_path / "nao_existe"), bitmap)
+
+
+def test_salvaGrafoSemBitmap(tmp_path):
+    grafo = Grafo()
+    grafo.adicionaNo((0, 0))
+    with pytest.raises(ValueError):
+        grafo.salvaGrafo(str(tmp_path / "grafo"), "mapa.bmp")
+
+
+def test_indiceDeComponentesCarregado(tmp_path):
+    # Duas metades separadas por uma coluna preta: o índice salvo continua separando as duas.
+    pixels = np.full((4, 5, 3), 255, dtype=np.uint8)
+    pixels[:, 2] = 0
+    bitmap = gravaBitmap(tmp_path / "mapa.bmp", pixels)
+    grafoDoBitmap(bitmap, compacto=True).salvaGrafo(str(tmp_path / "grafo"), bitmap)
+
+    carregado = Grafo()
+    assert carregado.carregaGrafo(str(tmp_path / "grafo"), bitmap)
+    assert carregado.alcancavel([(0, 0)], [(3, 1)])
+    assert not carregado.alcancavel([(0, 0)], [(0, 3)])
@@ -0,0 +1,198 @@
+"""
+Resolução em lote: muitos mapas e muitas consultas espalhados em um conjunto de processos.
+
+- resolveLote cria o grafo e busca o caminho de cada bitmap em um processo do conjunto;
+- GrafoCompartilhado coloca um grafo grande já pronto em memória compartilhada (ver storage.py) e responde
+  muitas consultas sobre ele em paralelo, sem mandar uma cópia do grafo para cada processo.
+
+Os dois recebem o número de processos, o tamanho dos lotes enviados a cada processo e se os resultados
+devem sair na ordem da entrada ou assim que ficam prontos. Com processos=1 tudo roda no próprio processo.
+"""
+import contextlib
+import multiprocessing
+import sys
+import time
+from graph import Graph
+from storage import compartilhaArrays, abreArraysCompartilhados, liberaArrays
+
+# Buscas disponíveis: todas recebem (origens, destinos) e retornam (caminho, custo, destino, ...).
+BUSCAS = ["caminhoMinimo", "aEstrela", "dijkstraBidirecional", "buscaSaltos", "buscaHierarquica"]
+
+# Grafo aberto por cada processo do GrafoCompartilhado, com os blocos de memória que ele usa.
+_grafoTrabalhador = None
+_blocosTrabalhador = None
+
+
+def _numero(valor):
+    """
+    Converte um custo (que pode vir como escalar do NumPy) em int ou float do Python, para o JSON.
+    """
+    valor = float(valor)
+    return int(valor) if valor.is_integer() else valor
+
+
+def _resultadoBusca(grafo, busca, origens, destinos):
+    """
+    Executa a busca no grafo e monta o dicionário do resultado, com o caminho como lista de [x, y, piso].
+    """
+    inicio = time.perf_counter()
+    caminho, custo, destino = getattr(grafo, busca)(origens, destinos)[:3]
+    return {
+        "busca": busca,
+        "destino": list(destino) if destino is not None else None,
+        "custo": _numero(custo) if destino is not None else None,
+        "caminho": [list(pixel) for pixel in caminho],
+        "tempoBusca": round(time.perf_counter() - inicio, 6),
+    }
+
+
+def resolveMapa(arquivoBitmap, busca="caminhoMinimo", compacto=False, implicito=False):
+    """
+    Cria o grafo de um bitmap e busca o caminho de menor custo das áreas vermelhas até as áreas verdes.
+
+    Parâmetros:
+    - arquivoBitmap: O caminho do bitmap, ou de um diretório de pisos (ver listaPisos).
+    - busca: O nome do método de busca do Graph (ver BUSCAS).
+    - compacto, implicito: Repassados ao Graph.
+
+    Retorna:
+    Um dicionário pronto para virar uma linha JSON, com o caminho como lista de [x, y, piso], o custo (soma
+    dos pesos, ou None se não há caminho), o destino alcançado e os tempos de criação e de busca em segundos.
+    Se o bitmap não puder ser lido, o dicionário traz só o mapa e o "erro".
+    """
+    inicio = time.perf_counter()
+    grafo = Graph(compacto=compacto, implicito=implicito)
+    # As mensagens do grafo vão para a saída de erro, para não se misturarem às linhas JSON.
+    with contextlib.redirect_stdout(sys.stderr):
+        grafo.criaGrafo(arquivoBitmap)
+    if grafo.hashMapa is None:
+        return {"mapa": arquivoBitmap, "erro": "não foi possível ler o bitmap"}
+    criacao = time.perf_counter() - inicio
+
+    resultado = _resultadoBusca(grafo, busca, grafo.areasVermelhas, grafo.areasVerdes)
+    return {"mapa": arquivoBitmap, **resultado, "tempoCriacao": round(criacao, 6)}
+
+
+def _resolveTarefa(tarefa):
+    return resolveMapa(*tarefa)
+
+
+def _executa(funcao, tarefas, processos, tamanhoLote, ordenado, inicializador=None, argumentosInicializador=()):
+    """
+    Aplica a função a cada tarefa em um conjunto de processos, devolvendo os resultados conforme ficam prontos.
+
+    Parâmetros:
+    - funcao: Função de um argumento, definida no nível do módulo para poder ser enviada aos processos.
+    - tarefas: Iterável com o argumento de cada chamada.
+    - processos: Número de processos (None usa o número de núcleos; 1 roda tudo no processo atual).
+    - tamanhoLote: Quantas tarefas cada processo recebe de uma vez.
+    - ordenado: Se True, os resultados saem na ordem das tarefas; senão, na ordem em que terminam.
+    - inicializador, argumentosInicializador: Função chamada uma vez em cada processo antes das tarefas.
+    """
+    if processos == 1:
+        if inicializador is not None:
+            inicializador(*argumentosInicializador)
+        yield from map(funcao, tarefas)
+        return
+
+    with multiprocessing.Pool(processos, inicializador, argumentosInicializador) as conjunto:
+        aplica = conjunto.imap if ordenado else conjunto.imap_unordered
+        yield from aplica(funcao, tarefas, tamanhoLote)
+
+
+def resolveLote(mapas, busca="caminhoMinimo", processos=None, tamanhoLote=1, ordenado=True, compacto=False, implicito=False):
+    """
+    Resolve vários bitmaps em paralelo: cada processo lê o bitmap, cria o grafo e busca o caminho.
+
+    Parâmetros:
+    - mapas: Os caminhos dos bitmaps (ou diretórios de pisos).
+    - busca: O nome do método de busca do Graph (ver BUSCAS).
+    - processos: Número de processos (None usa o número de núcleos; 1 roda tudo no processo atual).
+    - tamanhoLote: Quantos mapas cada processo recebe de uma vez. Lotes maiores diminuem a troca de mensagens
+      quando os mapas são pequenos; com mapas grandes, 1 distribui melhor o trabalho.
+    - ordenado: Se True, os resultados saem na ordem dos mapas; senão, assim que cada um fica pronto.
+    - compacto, implicito: Repassados ao Graph.
+
+    Só o caminho do bitmap vai para o processo e só o resultado volta: o grafo nunca é copiado entre processos.
+
+    Retorna:
+    Um gerador com o dicionário do resolveMapa de cada mapa (o campo "mapa" identifica o mapa quando
+    ordenado=False).
+    """
+    if busca not in BUSCAS:
+        raise ValueError(f"Busca desconhecida: {busca}")
+    tarefas = ((mapa, busca, compacto, implicito) for mapa in mapas)
+    return _executa(_resolveTarefa, tarefas, processos, tamanhoLote, ordenado)
+
+
+def _abreGrafo(descricao, meta):
+    """
+    Abre, no processo atual, o grafo colocado em memória compartilhada pelo GrafoCompartilhado.
+    """
+    global _grafoTrabalhador, _blocosTrabalhador
+    arrays, _blocosTrabalhador = abreArraysCompartilhados(descricao)
+    _grafoTrabalhador = Graph()
+    _grafoTrabalhador.importaArrays(arrays, meta)
+    if _grafoTrabalhador.componentes is not None:
+        _grafoTrabalhador.componentes.somenteLeitura = True
+
+
+def _consultaTarefa(tarefa):
+    indice, busca, origens, destinos = tarefa
+    return {"indice": indice, **_resultadoBusca(_grafoTrabalhador, busca, origens, destinos)}
+
+
+class GrafoCompartilhado:
+    """
+    Grafo pronto em memória compartilhada, para muitas consultas em paralelo sobre o mesmo mapa.
+
+    Os arrays do grafo (os mesmos do salvaGrafo, ver exportaArrays) são copiados uma vez para blocos de
+    memória compartilhada, e cada processo do conjunto monta seu Graph sobre esses blocos ao iniciar: o
+    grafo não é serializado nem copiado para os processos, só as origens e os destinos de cada consulta.
+    O índice de componentes também é compartilhado: ele é achatado antes (cada nó aponta direto para a raiz)
+    e, nos processos, só lido, sem encurtar caminhos de pais, então nenhum processo escreve no array.
+
+    Use com "with", ou chame fecha() no fim, para apagar os blocos:
+
+        with GrafoCompartilhado(grafo) as compartilhado:
+            for resultado in compartilhado.consultas(pares, processos=8):
+                ...
+    """
+
+    def __init__(self, grafo) -> None:
+        grafo.indiceComponentes().achata()
+        arrays, self.meta = grafo.exportaArrays()
+        self.blocos, self.descricao = compartilhaArrays(arrays)
+
+    def consultas(self, pares, busca="caminhoMinimo", processos=None, tamanhoLote=16, ordenado=True):
+        """
+        Responde as consultas em paralelo sobre o grafo compartilhado.
+
+        Parâmetros:
+        - pares: Iterável de pares (origens, destinos), cada um uma lista de pixels (x, y, piso).
+        - busca: O nome do método de busca do Graph (ver BUSCAS).
+        - processos: Número de processos (None usa o número de núcleos; 1 roda tudo no processo atual).
+        - tamanhoLote: Quantas consultas cada processo recebe de uma vez.
+        - ordenado: Se True, os resultados saem na ordem das consultas; senão, assim que cada uma fica pronta.
+
+        Retorna:
+        Um gerador com um dicionário por consulta, com o "indice" da consulta em "pares", o caminho, o custo,
+        o destino alcançado e o tempo da busca.
+        """
+        if busca not in BUSCAS:
+            raise ValueError(f"Busca desconhecida: {busca}")
+        tarefas = ((indice, busca, list(origens), list(destinos)) for indice, (origens, destinos) in enumerate(pares))
+        return _executa(_consultaTarefa, tarefas, processos, tamanhoLote, ordenado, _abreGrafo, (self.descricao, self.meta))
+
+    def fecha(self):
+        """
+        Apaga os blocos de memória compartilhada do grafo.
+        """
+        liberaArrays(self.blocos)
+        self.blocos = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fecha()
@@ -0,0 +1,67 @@
+"""
+Linha de comando do TP02, sem interface gráfica.
+
+Uso:
+    python cli.py mapa.bmp [pasta_com_bmp ...] [--busca caminhoMinimo] [--saida caminhos.jsonl] [--processos 0]
+
+Para cada bitmap (ou diretório de pisos, com um .bmp por piso), cria o grafo, busca o caminho de menor custo
+das áreas vermelhas até a área verde mais próxima e escreve uma linha JSON com o mapa, a busca, o caminho e o custo.
+Com --processos os mapas são resolvidos em paralelo (ver batch.py). Este arquivo não importa o tkinter nem o
+ImageTk, então roda em servidores sem tela e abre rápido.
+"""
+import argparse
+import json
+import sys
+from batch import BUSCAS, resolveLote
+from graph import listaPisos
+
+
+def listaMapas(caminhos):
+    """
+    Confere os caminhos informados na linha de comando e retorna os mapas a resolver.
+
+    Parâmetros:
+    - caminhos: Arquivos .bmp ou diretórios de pisos; cada diretório é um único mapa com um piso por .bmp
+      (ver listaPisos).
+
+    Retorna:
+    Uma lista com os caminhos que são um .bmp ou um diretório com pelo menos um .bmp.
+    """
+    return [caminho for caminho in caminhos if listaPisos(caminho)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca o caminho de menor custo em bitmaps sem abrir a interface gráfica.")
+    parser.add_argument("mapas", nargs="+", help="Arquivos .bmp ou diretórios de pisos.")
+    parser.add_argument("--busca", choices=BUSCAS, default="caminhoMinimo", help="Método de busca do Graph.")
+    parser.add_argument("--saida", help="Arquivo onde as linhas JSON são escritas (padrão: saída padrão).")
+    parser.add_argument("--compacto", action="store_true", help="Usa o GrafoCompacto (csr.py).")
+    parser.add_argument("--implicito", action="store_true", help="Usa a GradeImplicita (implicit.py).")
+    parser.add_argument("--processos", type=int, default=1, help="Número de processos (0 usa todos os núcleos).")
+    parser.add_argument("--lote", type=int, default=1, help="Quantos mapas cada processo recebe de uma vez.")
+    parser.add_argument("--desordenado", action="store_true", help="Escreve cada resultado assim que fica pronto.")
+    argumentos = parser.parse_args(argv)
+
+    mapas = listaMapas(argumentos.mapas)
+    if not mapas:
+        parser.error("nenhum arquivo .bmp encontrado")
+
+    saida = open(argumentos.saida, "w", encoding="utf-8") if argumentos.saida else sys.stdout
+    falhas = 0
+    try:
+        resultados = resolveLote(
+            mapas, argumentos.busca, argumentos.processos or None, argumentos.lote, not argumentos.desordenado,
+            argumentos.compacto, argumentos.implicito,
+        )
+        for resultado in resultados:
+            falhas += "erro" in resultado
+            saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            saida.flush()
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
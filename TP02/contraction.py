@@ -0,0 +1,282 @@
+import heapq
+import numpy as np
+
+# Quantos nós a busca de testemunha pode fixar antes de desistir. Desistir cedo só cria atalhos a mais, que
+# não mudam o custo das buscas.
+_LIMITE_TESTEMUNHA = 60
+
+
+def _valor(peso):
+    return peso.item() if isinstance(peso, np.generic) else peso
+
+
+def _csr(linhas, numNos):
+    """
+    Converte uma lista de dicionários {vizinho: (peso, meio)} nos arrays (inicio, destinos, pesos, meios).
+    """
+    inicio = np.zeros(numNos + 1, dtype=np.int64)
+    np.cumsum([len(linha) for linha in linhas], out=inicio[1:])
+    destinos = np.fromiter((v for linha in linhas for v in linha), dtype=np.int32, count=int(inicio[-1]))
+    pesos = np.array([peso for linha in linhas for peso, _ in linha.values()])
+    meios = np.fromiter((meio for linha in linhas for _, meio in linha.values()), dtype=np.int32, count=int(inicio[-1]))
+    if len(pesos) == 0:
+        pesos = np.zeros(0, dtype=np.int64)
+    return inicio, destinos, pesos, meios
+
+
+def contraiGrafo(lista, limiteTestemunha=None):
+    """
+    Cria o índice de contraction hierarchies de uma lista de adjacência (ver IndiceContracao).
+
+    Parâmetros:
+    - lista: O grafo, no formato da lista de adjacência do Graph (dicionário, GrafoCompacto ou GradeImplicita).
+    - limiteTestemunha: Quantos nós a busca de testemunha pode fixar (None usa _LIMITE_TESTEMUNHA).
+
+    Os nós são contraídos um a um, do menos para o mais importante. Contrair v é tirá-lo do grafo e, para cada
+    par de vizinhos u -> v -> w, criar o atalho u -> w com o custo dos dois passos, a menos que uma busca curta
+    sem passar por v (a testemunha) ache um caminho de u até w que não seja mais caro. A importância é a
+    diferença entre os atalhos criados e as arestas removidas, mais o número de vizinhos já contraídos (para
+    espalhar a contração pelo mapa). Ela é recalculada só quando o nó sai da fila, e o nó volta para a fila se
+    deixou de ser o menos importante.
+
+    Retorna:
+    O IndiceContracao com a ordem dos nós, as arestas para cima e para baixo e o nó do meio de cada atalho.
+    """
+    if limiteTestemunha is None:
+        limiteTestemunha = _LIMITE_TESTEMUNHA
+    nos = list(lista)
+    ids = {no: i for i, no in enumerate(nos)}
+    numNos = len(nos)
+    # Arestas entre nós ainda não contraídos, {vizinho: (peso, meio)}; meio -1 é uma aresta do grafo original.
+    saidas = [{} for _ in range(numNos)]
+    entradas = [{} for _ in range(numNos)]
+    for u, no in enumerate(nos):
+        for vizinho, peso in lista[no].items():
+            v, peso = ids[vizinho], _valor(peso)
+            if u != v and peso < saidas[u].get(v, (float("inf"),))[0]:
+                saidas[u][v] = entradas[v][u] = (peso, -1)
+
+    def testemunha(u, v, limite, alvos):
+        dist = {u: 0}
+        Q = [(0, u)]
+        fixados = 0
+        restantes = set(alvos)
+        while Q and restantes and fixados < limiteTestemunha:
+            dist_x, x = heapq.heappop(Q)
+            if dist_x > dist[x]:
+                continue
+            if dist_x > limite:
+                break
+            fixados += 1
+            restantes.discard(x)
+            for y, (peso, _) in saidas[x].items():
+                if y != v and dist.get(y, float("inf")) > dist_x + peso:
+                    dist[y] = dist_x + peso
+                    heapq.heappush(Q, (dist[y], y))
+        return dist
+
+    def atalhos(v):
+        novos = []
+        for u, (pesoEntrada, _) in entradas[v].items():
+            alvos = {w: pesoEntrada + pesoSaida for w, (pesoSaida, _) in saidas[v].items() if w != u}
+            if not alvos:
+                continue
+            dist = testemunha(u, v, max(alvos.values()), alvos)
+            novos.extend((u, w, custo) for w, custo in alvos.items() if dist.get(w, float("inf")) > custo)
+        return novos
+
+    vizinhosContraidos = [0] * numNos
+
+    def prioridade(v):
+        return len(atalhos(v)) - len(entradas[v]) - len(saidas[v]) + vizinhosContraidos[v]
+
+    fila = [(prioridade(v), v) for v in range(numNos)]
+    heapq.heapify(fila)
+    nivel = np.full(numNos, -1, dtype=np.int32)
+    acima, abaixo = [None] * numNos, [None] * numNos
+    proximoNivel = 0
+    while fila:
+        _, v = heapq.heappop(fila)
+        # A prioridade pode ter mudado desde que v entrou na fila: se não é mais a menor, v volta para a fila.
+        atual = prioridade(v)
+        if fila and atual > fila[0][0]:
+            heapq.heappush(fila, (atual, v))
+            continue
+
+        for u, w, custo in atalhos(v):
+            if custo < saidas[u].get(w, (float("inf"),))[0]:
+                saidas[u][w] = entradas[w][u] = (custo, v)
+        nivel[v] = proximoNivel
+        proximoNivel += 1
+        acima[v], abaixo[v] = saidas[v], entradas[v]
+        vizinhos = set(saidas[v]) | set(entradas[v])
+        for w in saidas[v]:
+            del entradas[w][v]
+        for u in entradas[v]:
+            del saidas[u][v]
+        for x in vizinhos:
+            vizinhosContraidos[x] += 1
+
+    arrays = {"nos": np.array(nos, dtype=np.int32).reshape(-1, 3), "nivel": nivel}
+    for nome, linhas in [("acima", acima), ("abaixo", abaixo)]:
+        inicio, destinos, pesos, meios = _csr(linhas, numNos)
+        arrays.update({nome + "Inicio": inicio, nome + "Destinos": destinos, nome + "Pesos": pesos, nome + "Meios": meios})
+    return IndiceContracao(arrays)
+
+
+class IndiceContracao:
+    """
+    Índice de contraction hierarchies para muitas consultas em um mapa que não muda.
+
+    Cada nó tem um nível (a ordem em que foi contraído, ver contraiGrafo) e só guarda as arestas para nós de
+    nível maior: as que saem dele ("acima", usadas pela busca que parte das origens) e as que chegam nele
+    ("abaixo", usadas ao contrário pela busca que parte dos destinos). Os atalhos garantem que todo caminho
+    mínimo tem uma versão que só sobe e depois só desce de nível, então as duas buscas se encontram no nó mais
+    alto dele e cada uma fixa só algumas centenas de nós, mesmo em mapas grandes.
+
+    Tudo fica em arrays no formato do GrafoCompacto (inicio, destinos, pesos, mais o nó do meio de cada atalho,
+    -1 nas arestas originais), então o índice pode ser criado uma vez, salvo com exportaArrays e carregado
+    mapeado do disco (ver Graph.salvaContracao e Graph.carregaContracao).
+    """
+
+    def __init__(self, arrays) -> None:
+        self.arrays = arrays
+        self.numNos = len(arrays["nivel"])
+        self._listas = None
+
+    def exportaArrays(self):
+        """
+        Retorna o dicionário {nome: array} do índice, que o IndiceContracao(arrays) usa para refazê-lo.
+        """
+        return dict(self.arrays)
+
+    def bytesUsados(self):
+        """
+        Retorna o total de bytes ocupado pelos arrays do índice.
+        """
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def _carregaListas(self):
+        # As buscas andam nó a nó, o que é bem mais rápido em listas do Python que em arrays do NumPy.
+        if self._listas is None:
+            arrays = self.arrays
+            nos = [tuple(no) for no in arrays["nos"].tolist()]
+            self._listas = {
+                "nos": nos,
+                "ids": {no: i for i, no in enumerate(nos)},
+                "nivel": arrays["nivel"].tolist(),
+            }
+            for nome in ["acima", "abaixo"]:
+                for parte in ["Inicio", "Destinos", "Pesos", "Meios"]:
+                    self._listas[nome + parte] = arrays[nome + parte].tolist()
+        return self._listas
+
+    def _aresta(self, u, v):
+        """
+        Retorna (peso, meio) da aresta u -> v do índice, guardada no nó de menor nível entre os dois.
+        """
+        listas = self._listas
+        if listas["nivel"][u] < listas["nivel"][v]:
+            nome, dono, outro = "acima", u, v
+        else:
+            nome, dono, outro = "abaixo", v, u
+        inicio, destinos = listas[nome + "Inicio"], listas[nome + "Destinos"]
+        for i in range(inicio[dono], inicio[dono + 1]):
+            if destinos[i] == outro:
+                return listas[nome + "Pesos"][i], listas[nome + "Meios"][i]
+        raise KeyError((u, v))
+
+    def desempacota(self, caminho):
+        """
+        Troca cada atalho de um caminho de ids pelos nós que ele pula, até sobrarem só arestas do grafo original.
+
+        Parâmetros:
+        - caminho: Lista de ids de nós ligados por arestas do índice.
+
+        Retorna:
+        A lista de pixels (x, y, piso) do caminho completo, no formato do Graph.reconstruirCaminho.
+        """
+        listas = self._carregaListas()
+        if not caminho:
+            return []
+        completo = [caminho[0]]
+        pilha = [(u, v) for u, v in zip(caminho[-2::-1], caminho[:0:-1])]
+        while pilha:
+            u, v = pilha.pop()
+            _, meio = self._aresta(u, v)
+            if meio < 0:
+                completo.append(v)
+            else:
+                pilha.append((meio, v))
+                pilha.append((u, meio))
+        return [listas["nos"][id] for id in completo]
+
+    def busca(self, origens, destinos):
+        """
+        Busca o caminho de menor custo entre um conjunto de origens e um conjunto de destinos.
+
+        Parâmetros:
+        - origens: Uma lista de pixels (x, y, piso) de início.
+        - destinos: Uma lista de pixels onde a busca pode terminar.
+
+        Uma busca parte das origens só pelas arestas "acima" e outra parte dos destinos só pelas arestas "abaixo",
+        andando sempre a que tem a menor distância na fila. Cada uma para quando a menor distância da sua fila não é
+        menor que o melhor custo já encontrado em um nó visto pelas duas.
+
+        Retorna:
+        Uma tupla (caminho, custo, destino) como a do Graph.caminhoMinimo, com o caminho já desempacotado em
+        pixels. Se nenhum destino for alcançável, retorna ([], inf, None).
+        """
+        listas = self._carregaListas()
+        ids = listas["ids"]
+        lados = []
+        for pontos, nome in [(origens, "acima"), (destinos, "abaixo")]:
+            dist, pred = {}, {}
+            for ponto in pontos:
+                if ponto in ids:
+                    dist[ids[ponto]] = 0
+                    pred[ids[ponto]] = None
+            Q = [(0, id) for id in dist]
+            lados.append((Q, dist, pred, listas[nome + "Inicio"], listas[nome + "Destinos"], listas[nome + "Pesos"]))
+
+        melhor, encontro = float("inf"), None
+        for id in lados[0][1]:
+            if id in lados[1][1]:
+                melhor, encontro = 0, id
+
+        while True:
+            ativos = [lado for lado in (0, 1) if lados[lado][0] and lados[lado][0][0][0] < melhor]
+            if not ativos:
+                break
+            lado = min(ativos, key=lambda lado: lados[lado][0][0][0])
+            Q, dist, pred, inicio, vizinhos, pesos = lados[lado]
+            outraDist = lados[1 - lado][1]
+
+            dist_u, u = heapq.heappop(Q)
+            if dist_u > dist[u]:
+                continue
+            for i in range(inicio[u], inicio[u + 1]):
+                v, novo = vizinhos[i], dist_u + pesos[i]
+                if dist.get(v, float("inf")) > novo:
+                    dist[v] = novo
+                    pred[v] = u
+                    heapq.heappush(Q, (novo, v))
+                    if v in outraDist and novo + outraDist[v] < melhor:
+                        melhor, encontro = novo + outraDist[v], v
+
+        if encontro is None:
+            return [], float("inf"), None
+
+        predInicio, predFim = lados[0][2], lados[1][2]
+        caminho = []
+        atual = encontro
+        while atual is not None:
+            caminho.append(atual)
+            atual = predInicio[atual]
+        caminho.reverse()
+        atual = predFim[encontro]
+        while atual is not None:
+            caminho.append(atual)
+            atual = predFim[atual]
+        caminho = self.desempacota(caminho)
+        return caminho, melhor, caminho[-1]
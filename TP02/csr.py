@@ -0,0 +1,64 @@
+import numpy as np
+import _comum  # noqa: F401
+from comum.csr import GrafoCompacto as _GrafoCompactoComum
+
+
+class GrafoCompacto(_GrafoCompactoComum):
+    """
+    O GrafoCompacto comum (ver comum/csr.py) que também troca o peso, cria ou remove arestas depois de montado,
+    para o replanejamento (ver Graph.alteraArestas).
+    """
+
+    def alteraArestas(self, alteracoes):
+        """
+        Troca o peso, cria ou remove algumas arestas do grafo já montado.
+
+        Parâmetros:
+        - alteracoes: Iterável de tuplas (u, v, peso) com as tuplas de coordenadas dos nós; peso None remove a
+          aresta de u para v, se ela existir. Se a mesma aresta aparecer mais de uma vez, vale a última.
+
+        Uma aresta que já existe tem o peso trocado no próprio array "pesos", em tempo proporcional ao grau de u,
+        então mudar os pesos de poucas arestas não refaz os arrays CSR. Só as arestas novas (juntadas na próxima
+        leitura, ver _compacta) e as removidas (filtradas de uma só vez) refazem os arrays.
+
+        Retorna:
+        A variação no número de arestas.
+        """
+        if self._pendente():
+            self._compacta()
+        inteiros = self.pesos.dtype == np.uint8
+        remover = []
+        novas = []
+        for (u, v), peso in {(u, v): peso for u, v, peso in alteracoes}.items():
+            idU, idV = self.codifica(u), self.codifica(v)
+            if idU < 0 or idV < 0:
+                raise KeyError(u if idU < 0 else v)
+            indiceU, indiceV = int(self.indice[idU]), int(self.indice[idV])
+            posicao = -1
+            if indiceU >= 0 and indiceV >= 0:
+                a, b = self.inicio[indiceU], self.inicio[indiceU + 1]
+                encontradas = np.flatnonzero(self.destinos[a:b] == indiceV)
+                posicao = int(a + encontradas[0]) if len(encontradas) > 0 else -1
+
+            if peso is None:
+                if posicao >= 0:
+                    remover.append(posicao)
+            elif posicao >= 0 and (not inteiros or (peso == int(peso) and 0 <= peso <= 255)):
+                self.pesos[posicao] = peso
+            else:
+                # Aresta nova, ou peso que não cabe no tipo atual: o _compacta troca o peso e o tipo dos pesos.
+                novas.append((u, v, peso, posicao < 0))
+
+        if remover:
+            numNos = len(self.ids)
+            manter = np.ones(len(self.destinos), dtype=bool)
+            manter[remover] = False
+            origens = np.repeat(np.arange(numNos, dtype=np.int64), np.diff(self.inicio))[manter]
+            self.destinos = self.destinos[manter]
+            self.pesos = self.pesos[manter]
+            self.inicio = np.zeros(numNos + 1, dtype=np.int64)
+            np.cumsum(np.bincount(origens, minlength=numNos), out=self.inicio[1:])
+
+        for u, v, peso, _ in novas:
+            self.adicionaAresta(u, v, peso)
+        return sum(nova for *_, nova in novas) - len(remover)
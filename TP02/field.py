@@ -0,0 +1,145 @@
+import numpy as np
+from labels import PRETO, PESOS, PESO_PISO
+
+
+def distanciasGrade(rotulos, origens, ateOrigens=True):
+    """
+    Calcula o custo entre um conjunto de origens e todos os pixels do mapa com uma fila de baldes em que cada
+    balde é processado de uma só vez.
+
+    Parâmetros:
+    - rotulos: O array de rótulos (pisos, altura, base) do mapa.
+    - origens: Os pixels (x, y, piso) de origem; os que estão fora do mapa são ignorados.
+    - ateOrigens: Se True, mede o custo de cada pixel até a origem mais próxima (andando nas arestas ao
+      contrário); se False, o custo da origem mais próxima até cada pixel.
+
+    Os pesos são inteiros pequenos, então todos os pixels com a mesma distância d saem juntos da fila e
+    seus vizinhos são relaxados com operações sobre arrays. O número de rodadas é o número de distâncias
+    diferentes do mapa, e não o número de pixels.
+
+    Retorna:
+    Dois arrays planos de int64 com um valor por pixel: a distância (-1 se não há caminho) e o id do pixel
+    vizinho de onde ela veio (o próximo passo até as origens, ou o anterior desde elas; -1 nas origens e nos
+    pixels sem caminho).
+    """
+    pisos, altura, base = rotulos.shape
+    tamanho = pisos * altura * base
+    passaveis = (rotulos != PRETO).ravel()
+    pesos = PESOS[rotulos].ravel()
+
+    distancias = np.full(tamanho, np.iinfo(np.int64).max, dtype=np.int64)
+    ligacoes = np.full(tamanho, -1, dtype=np.int64)
+    definidos = np.zeros(tamanho, dtype=bool)
+
+    origens = np.array([(z, y, x) for x, y, z in origens if 0 <= x < base and 0 <= y < altura and 0 <= z < pisos], dtype=np.int64)
+    baldes = {}
+    if len(origens) > 0:
+        ids = np.ravel_multi_index(origens.T, rotulos.shape)
+        distancias[ids] = 0
+        baldes[0] = [ids]
+
+    # Deslocamento no array achatado e teste de limite de cada vizinho: esquerda, direita, acima, abaixo, pisos.
+    vizinhanca = [
+        (-1, lambda x, y, z: x > 0, False),
+        (1, lambda x, y, z: x < base - 1, False),
+        (-base, lambda x, y, z: y > 0, False),
+        (base, lambda x, y, z: y < altura - 1, False),
+        (-base * altura, lambda x, y, z: z > 0, True),
+        (base * altura, lambda x, y, z: z < pisos - 1, True),
+    ]
+
+    while baldes:
+        d = min(baldes)
+        atuais = np.unique(np.concatenate(baldes.pop(d)))
+        atuais = atuais[(distancias[atuais] == d) & ~definidos[atuais]]
+        if len(atuais) == 0:
+            continue
+        definidos[atuais] = True
+
+        z, resto = np.divmod(atuais, base * altura)
+        y, x = np.divmod(resto, base)
+        for deslocamento, dentro, trocaPiso in vizinhanca:
+            daqui = atuais[dentro(x, y, z)]
+            vizinhos = daqui + deslocamento
+            validos = passaveis[vizinhos] & ~definidos[vizinhos]
+            daqui, vizinhos = daqui[validos], vizinhos[validos]
+            # O peso é o da cor do pixel de saída: o vizinho quando a busca anda ao contrário, o atual quando não.
+            if trocaPiso:
+                candidatos = np.broadcast_to(d + PESO_PISO, vizinhos.shape)
+            else:
+                candidatos = d + pesos[vizinhos if ateOrigens else daqui]
+            melhores = candidatos < distancias[vizinhos]
+            daqui, vizinhos, candidatos = daqui[melhores], vizinhos[melhores], candidatos[melhores]
+            np.minimum.at(distancias, vizinhos, candidatos)
+            vencedores = candidatos == distancias[vizinhos]
+            ligacoes[vizinhos[vencedores]] = daqui[vencedores]
+            for valor in np.unique(candidatos).tolist():
+                baldes.setdefault(valor, []).append(vizinhos[candidatos == valor])
+
+    distancias[~definidos] = -1
+    return distancias, ligacoes
+
+
+class CampoDistancias:
+    """
+    Campo de distâncias e de próximos passos de todos os pixels até a saída mais próxima.
+
+    O campo é calculado uma única vez para um mapa (array de rótulos (pisos, altura, base), ver labels.py)
+    e um conjunto de saídas, com um Dijkstra de várias origens que anda nas arestas ao contrário: a
+    distância de um pixel é o custo do melhor caminho dele até alguma saída, com as mesmas regras do grafo
+    (o peso vem da cor do pixel de onde se sai, a troca de piso custa 5 e pixels pretos não são passagem).
+
+    O resultado fica em dois arrays planos com a forma da pilha de imagens:
+    - distancias: custo até a saída mais próxima (-1 se nenhuma saída é alcançável);
+    - proximos: id (posição no array achatado) do próximo pixel no caminho (-1 nas saídas e nos pixels sem caminho).
+
+    Depois disso, cada consulta só segue os próximos passos, em tempo proporcional ao tamanho do caminho.
+    """
+
+    def __init__(self, rotulos, saidas) -> None:
+        rotulos = np.asarray(rotulos, dtype=np.uint8)
+        self.rotulos = rotulos if rotulos.ndim == 3 else rotulos[np.newaxis]
+        self.forma = self.rotulos.shape
+        self.saidas = [tuple(saida) for saida in saidas]
+        self.distancias, self.proximos = self._calcula()
+
+    def _calcula(self):
+        """
+        Calcula os arrays do campo com uma fila de baldes (ver distanciasGrade).
+        """
+        distancias, proximos = distanciasGrade(self.rotulos, self.saidas, ateOrigens=True)
+        return distancias.reshape(self.forma), proximos.reshape(self.forma)
+
+    def _id(self, pixel):
+        x, y, z = pixel
+        pisos, altura, base = self.forma
+        if not (0 <= x < base and 0 <= y < altura and 0 <= z < pisos):
+            raise KeyError(pixel)
+        return (z * altura + y) * base + x
+
+    def distancia(self, pixel):
+        """
+        Retorna o custo do melhor caminho do pixel (x, y, piso) até a saída mais próxima, ou inf se não houver caminho.
+        """
+        distancia = int(self.distancias.flat[self._id(pixel)])
+        return distancia if distancia >= 0 else float("inf")
+
+    def caminho(self, pixel):
+        """
+        Retorna o caminho do pixel (x, y, piso) até a saída mais próxima, seguindo os próximos passos.
+
+        O caminho começa no pixel e termina na saída, em tuplas (x, y, piso). Se nenhuma saída for
+        alcançável a partir do pixel, retorna uma lista vazia.
+        """
+        id = self._id(pixel)
+        if self.distancias.flat[id] < 0:
+            return []
+
+        pisos, altura, base = self.forma
+        caminho = []
+        while id >= 0:
+            z, resto = divmod(id, base * altura)
+            y, x = divmod(resto, base)
+            caminho.append((x, y, z))
+            id = int(self.proximos.flat[id])
+        return caminho
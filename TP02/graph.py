@@ -1,20 +1,158 @@
 import time
+import hashlib
 from PIL import Image
 import os
+import re
 import heapq
+import numpy as np
+from labels import PRETO, VERMELHO, VERDE, CINZA_ESCURO, CINZA_CLARO, PESOS, PESO_PISO, leRotulos, ListaPixels
+from csr import GrafoCompacto
+from implicit import GradeImplicita
+import _comum  # noqa: F401
+from comum.jps import BuscaSaltos
+from comum.components import Componentes
+from field import CampoDistancias
+from comum.storage import hashArquivos, salvaArrays, carregaArrays, PixelsSalvos
+from replan import PlanejadorIncremental
+from hierarchy import Hierarquia
+from landmarks import Marcos
+from contraction import contraiGrafo, IndiceContracao
+
+# Linha e coluna dos deslocamentos acima, esquerda e direita da varredura do criaGrafo (ver _visitasEmOrdem).
+_DESLOCAMENTOS_VISITA = np.array([[-1, 0, 0], [0, -1, 1]])
+
+# Maior peso de aresta possível nas imagens (troca de piso).
+PESO_MAXIMO = max(int(PESOS.max()), PESO_PISO)
+
+_GRADE_SOMENTE_LEITURA = (
+    "A grade implícita é somente leitura: use alteraPixels ou crie o grafo com implicito=False para alterá-lo."
+)
+
+# Acima desse número de destinos a heurística do A* é pré-calculada para a grade inteira.
+_MAX_DESTINOS_DIRETOS = 8
+
+
+def listaPisos(caminho):
+    """
+    Retorna os arquivos bitmap de um mapa: o próprio arquivo, ou os .bmp de um diretório de pisos.
+
+    Parâmetros:
+    - caminho: Um arquivo .bmp ou um diretório com um .bmp por piso (como toyFloors).
+
+    Os arquivos de um diretório são ordenados pelo nome, comparando os números como números, então
+    "toy_2.bmp" vem antes de "toy_10.bmp"; o primeiro é o piso 0.
+    """
+    if not os.path.isdir(caminho):
+        return [caminho]
+    arquivos = [arquivo for arquivo in os.listdir(caminho) if arquivo.lower().endswith(".bmp")]
+    arquivos.sort(key=lambda nome: [int(parte) if parte.isdigit() else parte for parte in re.split(r"(\d+)", nome)])
+    return [os.path.join(caminho, arquivo) for arquivo in arquivos]
+
+
+def _visitasEmOrdem(mascara, inicio, somenteSegunda):
+    """
+    Retorna os pixels da máscara na ordem em que a varredura original do criaGrafo os visitava de novo.
+
+    Parâmetros:
+    - mascara: Array booleano com as linhas [inicio - 1, fim) de uma imagem, ou [0, fim) quando inicio é 0.
+    - inicio: Primeira linha dos pixels que visitam.
+    - somenteSegunda: Se True, só a segunda visita de cada pixel entra; senão, todas depois da primeira.
+
+    Retorna:
+    As linhas e as colunas dos pixels visitados pelos pixels das linhas [inicio, fim), uma vez por visita.
+
+    A varredura percorria os pixels linha a linha e, em cada um, os deslocamentos de "pontosRelativos": acima,
+    abaixo, esquerda e direita. Um pixel é visitado primeiro pelo vizinho de cima, depois pelo da esquerda,
+    pelo da direita e pelo de baixo, então o número de uma visita só depende de quais desses vizinhos existem
+    (a visita pelo vizinho de cima, com o deslocamento "abaixo", é sempre a primeira). Marcando em cada pixel
+    que visita os deslocamentos que levam a uma visita escolhida, o np.nonzero já devolve tudo na ordem da
+    varredura, sem ordenar chaves.
+    """
+    borda = 1 if inicio > 0 else 0
+    base = mascara.shape[1]
+    cima = (np.arange(inicio - borda, inicio - borda + len(mascara)) > 0).astype(np.int8)[:, None]
+    esquerda = (np.arange(base) > 0).astype(np.int8)
+    direita = (np.arange(base) < base - 1).astype(np.int8)
+    escolhida = (lambda numero: numero == 1) if somenteSegunda else (lambda numero: numero >= 1)
+
+    # Deslocamentos acima, esquerda e direita de cada pixel que visita, com o número da visita no pixel visitado.
+    marcas = np.zeros((len(mascara) - borda, base, 3), dtype=bool)
+    marcas[1 - borda:, :, 0] = (mascara & escolhida(cima + esquerda + direita))[:-1]
+    visitados = mascara[borda:] & escolhida(cima + esquerda)[borda:]
+    marcas[:, 1:, 1] = visitados[:, :-1]
+    visitados = mascara[borda:] & escolhida(cima)[borda:]
+    marcas[:, :-1, 2] = visitados[:, 1:]
+    linhas, colunas, deslocamentos = np.nonzero(marcas)
+    return linhas + inicio + _DESLOCAMENTOS_VISITA[0, deslocamentos], colunas + _DESLOCAMENTOS_VISITA[1, deslocamentos]
+
+
+def _hashRotulos(rotulos):
+    """
+    Retorna o hash do conteúdo de um array de rótulos (forma e valores), usado como chave do mapa.
+    """
+    return hashlib.sha1(repr(rotulos.shape).encode() + rotulos.tobytes()).hexdigest()
+
+
+def _pesoMinimo(rotulos):
+    """
+    Retorna o menor peso de aresta entre pixels de um mesmo piso para os rótulos informados (1 se não houver pixels passáveis).
+    """
+    presentes = np.unique(rotulos)
+    presentes = presentes[presentes != PRETO]
+    return int(PESOS[presentes].min()) if len(presentes) > 0 else 1
+
+
+def _distanciasManhattan(alvos, pisos, altura, base):
+    """
+    Calcula a distância de Manhattan de cada pixel até o alvo mais próximo do mesmo piso, ignorando obstáculos.
+
+    Parâmetros:
+    - alvos: Pixels (x, y, piso) de destino.
+    - pisos, altura, base: Dimensões da grade.
+
+    Retorna:
+    Um array (pisos, altura, base) de float, com inf nos pisos sem nenhum alvo. A distância é separável por eixo,
+    então duas varreduras (ida e volta) por eixo calculam o valor exato.
+    """
+    dist = np.full((pisos, altura, base), np.inf)
+    for x, y, z in alvos:
+        dist[z, y, x] = 0
+    for eixo, tamanho in [(2, base), (1, altura)]:
+        anterior = [slice(None)] * 3
+        atual = [slice(None)] * 3
+        for ordem in [range(1, tamanho), range(tamanho - 2, -1, -1)]:
+            for i in ordem:
+                atual[eixo] = i
+                anterior[eixo] = i - 1 if ordem.step == 1 else i + 1
+                np.minimum(dist[tuple(atual)], dist[tuple(anterior)] + 1, out=dist[tuple(atual)])
+    return dist
 
 
 class Graph:
-    def __init__(self) -> None:
+    def __init__(self, compacto=False, implicito=False) -> None:
         self.lista = {}
+        self.compacto = compacto
+        self.implicito = implicito
         self.numNos = 0
         self.numArestas = 0
         self.pixelFinal = 0
-        self.areasVerdes = []
-        self.areasVermelhas = []
-        self.cinzasClaros = []
-        self.cinzasEscuros = []
-        self.pixelsPretos = []
+        # Listas de pixels de cada cor, com "pixel in lista" em O(1) (ver labels.py).
+        self.areasVerdes = ListaPixels()
+        self.areasVermelhas = ListaPixels()
+        self.cinzasClaros = ListaPixels()
+        self.cinzasEscuros = ListaPixels()
+        self.pixelsPretos = ListaPixels()
+        self.dimensoes = None
+        self.pesoMinimo = 1
+        self.rotulos = None
+        self._reverso = None
+        self._saltos = None
+        self.componentes = None
+        self._campo = None
+        self._hierarquia = None
+        self._marcos = None
+        self._contracao = None
+        self.hashMapa = None
 
     def adicionaNo(self, pixel_info):
         """
@@ -24,14 +162,21 @@ class Graph:
         - pixel_info: O nó que será adicionado ao grafo.
 
         Essa função verifica se o nó já existe no grafo antes de fazer a adição. Após a adição
-        ela itera o número de nós existentes no grafo.
+        ela itera o número de nós existentes no grafo e descarta os caches calculados sobre o grafo anterior. A grade
+        implícita é somente leitura e lança ValueError.
         """
+        if isinstance(self.lista, GradeImplicita):
+            raise ValueError(_GRADE_SOMENTE_LEITURA)
         try:
             if self.lista[pixel_info] != {}:
                 return
         except KeyError:
             self.lista[pixel_info] = {}
             self.numNos += 1
+            self.hashMapa = None
+            self._descartaCaches()
+            if self.componentes is not None:
+                self.componentes.adiciona(pixel_info)
 
     def adicionaAresta(self, u, v, pesoAresta):
         """
@@ -43,94 +188,477 @@ class Graph:
         - pesoAresta: O peso da aresta a ser adicionada.
 
         Esta função adiciona uma aresta entre os nós u e v no grafo, garantindo que ambos os nós existam previamente.
-        Após a adição, incrementa o número de arestas do grafo.
+        Após a adição, incrementa o número de arestas do grafo, atualiza o menor peso e o índice de componentes, se
+        ele existir, e descarta os caches calculados sobre o grafo anterior. A grade implícita é somente leitura e
+        lança ValueError.
         """
+        if isinstance(self.lista, GradeImplicita):
+            raise ValueError(_GRADE_SOMENTE_LEITURA)
+        semSaida = self.componentes is not None and u in self.lista and len(self.lista[u]) == 0
         self.adicionaNo(u)
         self.adicionaNo(v)
         self.lista[u][v] = pesoAresta
         self.numArestas += 1
+        self.pesoMinimo = min(self.pesoMinimo, pesoAresta)
+        self.hashMapa = None
+        self._descartaCaches()
+
+        if semSaida:
+            # u pode ter arestas chegando nele, e agora passa a ser ponto de passagem: o índice é refeito na próxima consulta.
+            self.componentes = None
+        elif self.componentes is not None and len(self.lista[v]) > 0:
+            self.componentes.une(u, v)
+
+    def _descartaCaches(self):
+        """
+        Descarta os índices calculados sobre o mapa ou a lista de adjacência (saltos, campo de distâncias,
+        hierarquia, marcos e contração), que o adicionaNo e o adicionaAresta alteram no próprio lugar.
+        """
+        self._saltos = self._campo = self._hierarquia = self._marcos = self._contracao = None
 
     def carregaImagem(self, arquivoBitmap):
         """
-        Carrega imagem do arquivo Bitmap.
+        Carrega as imagens dos pisos de um mapa.
 
         Parâmetros:
-        - arquivoBitmap: O caminho do arquivo Bitmap a ser carregado.
+        - arquivoBitmap: O caminho do arquivo Bitmap a ser carregado, ou de um diretório com um Bitmap por piso.
 
-        Esta função tenta carregar a imagem do arquivo Bitmap especificado e retorna a imagem carregada.
-        Se ocorrer algum erro ao abrir a imagem, imprime uma mensagem de erro e retorna None.
+        Esta função tenta carregar as imagens dos arquivos retornados por listaPisos e retorna a lista de imagens,
+        uma por piso. Se ocorrer algum erro ao abrir as imagens (ou o diretório não tiver nenhum Bitmap), imprime
+        uma mensagem de erro e retorna None.
         """
         try:
-            imagem = Image.open(arquivoBitmap)
-            return [imagem]
+            imagens = [Image.open(arquivo) for arquivo in listaPisos(arquivoBitmap)]
         except Exception as e:
             print("Erro ao abrir as imagens:", e)
             return None
+        if len(imagens) == 0:
+            print("Nenhum arquivo .bmp em", arquivoBitmap)
+            return None
+        return imagens
 
     def criaGrafo(self, arquivoBitmap):
         """
-        Cria o grafo a partir de uma imagem Bitmap.
+        Cria o grafo a partir de uma imagem Bitmap, ou de um diretório com uma imagem por piso.
 
         Parâmetros:
-        - arquivoBitmap: O caminho do arquivo Bitmap a ser utilizado para criar o grafo.
+        - arquivoBitmap: O caminho do arquivo Bitmap a ser utilizado para criar o grafo, ou de um diretório de
+          pisos (ver listaPisos). Todos os pisos precisam ter o mesmo tamanho.
 
-        Esta função carrega a imagem do arquivo Bitmap especificado e cria um grafo com base nos pixels da imagem.
-        Itera sobre os pixels da imagem, criando nós para representar cada pixel e adicionando-os ao grafo.
-        Além disso, identifica diferentes regiões na imagem com base nas cores dos pixels e as marca para posterior análise.
+        Esta função carrega as imagens e cria um grafo com base nos pixels de todos os pisos, com nós (x, y, piso).
+        Cada imagem é lida uma única vez para um array de rótulos (ver labels.py) e todos os pixels, classes de
+        cor e vizinhanças são calculados com operações sobre o array inteiro, gerando para cada piso o mesmo grafo
+        que a varredura pixel a pixel com "getpixel" gerava; pisos vizinhos são ligados no conectaVizinhos. Se o
+        grafo foi criado com implicito=True, a lista de adjacência não é montada: "lista" vira uma GradeImplicita
+        sobre os rótulos das imagens.
         """
-        pontosRelativos = [
-            (-1, 0, 0),
-            (1, 0, 0),
-            (0, -1, 0),
-            (0, 1, 0),
-            (0, 0, 1),
-            (0, 0, -1),
-        ]
-
         imagens = self.carregaImagem(arquivoBitmap)
-        numPisos = len(imagens)
 
         if imagens is None:
             print("Arquivos não encontrados!")
             return
 
+        numPisos = len(imagens)
+        pisos = [leRotulos(imagem) for imagem in imagens]
+        if any(rotulos.shape != pisos[0].shape for rotulos in pisos):
+            raise ValueError(f"Os pisos de {arquivoBitmap} não têm todos o mesmo tamanho.")
+
         for numPiso in range(numPisos):
-            imagem = imagens[numPiso]
-            base, altura = imagem.size
-
-            for linha in range(altura):
-                for coluna in range(base):
-                    for dx, dy, dz in pontosRelativos:
-                        novoU, novoV, novoT = linha + dx, coluna + dy, dz
-                        if (
-                            altura > novoU >= 0
-                            and base > novoV >= 0
-                            and numPisos > novoT >= 0
-                        ):
-                            pixel = (novoV, novoU, numPiso)
-
-                            corDoPixel = imagem.getpixel((novoV, novoU))
-
-                            if pixel not in self.lista:
-                                self.adicionaNo(pixel)
-                            elif corDoPixel == (0, 0, 0):
-                                self.pixelsPretos.append(pixel)
-                            elif corDoPixel == (255, 0, 0):
-                                if pixel not in self.areasVermelhas:
-                                    self.areasVermelhas.append(pixel)
-                            elif corDoPixel == (0, 255, 0):
-                                if pixel not in self.areasVerdes:
-                                    self.pixelFinal = pixel
-                                    self.areasVerdes.append(pixel)
-                            elif corDoPixel == (128, 128, 128):
-                                if pixel not in self.cinzasEscuros:
-                                    self.cinzasEscuros.append(pixel)
-                            elif corDoPixel == (196, 196, 196):
-                                if pixel not in self.cinzasClaros:
-                                    self.cinzasClaros.append(pixel)
-        self.conectaVizinhos(base, altura, numPisos, imagem)
-
-    def conectaVizinhos(self, base, altura, profundidade, imagem):
+            rotulos = pisos[numPiso]
+            altura, base = rotulos.shape
+
+            if self.compacto and len(self.lista) == 0:
+                self.lista = GrafoCompacto((base, altura, numPisos))
+
+            # Cada pixel é visitado uma vez por vizinho dentro da imagem: a primeira visita cria o nó
+            # e as seguintes registram a classe do pixel, na mesma ordem da varredura original.
+            if not self.implicito and altura * base > 1:
+                linhas, colunas = np.indices((altura, base)).reshape(2, -1)
+                self._adicionaNosGrade(colunas, linhas, numPiso)
+
+            for rotulo, area in [
+                (VERMELHO, self.areasVermelhas),
+                (VERDE, self.areasVerdes),
+                (CINZA_ESCURO, self.cinzasEscuros),
+                (CINZA_CLARO, self.cinzasClaros),
+            ]:
+                linhas, colunas = _visitasEmOrdem(rotulos == rotulo, 0, True)
+                area.extend((coluna, linha, numPiso) for coluna, linha in zip(colunas.tolist(), linhas.tolist()))
+
+            if len(self.areasVerdes) > 0:
+                self.pixelFinal = self.areasVerdes[-1]
+
+            # Pixels pretos são registrados uma vez a cada visita depois da primeira.
+            linhas, colunas = _visitasEmOrdem(rotulos == PRETO, 0, False)
+            self.pixelsPretos.extend((coluna, linha, numPiso) for coluna, linha in zip(colunas.tolist(), linhas.tolist()))
+
+        self.rotulos = np.stack(pisos)
+        self.dimensoes = (base, altura, numPisos)
+        self.pesoMinimo = _pesoMinimo(self.rotulos)
+
+        if self.implicito:
+            # Na grade implícita os pixels pretos não são nós: os vizinhos são gerados sob demanda.
+            self.lista = GradeImplicita(self.rotulos)
+            self.numNos = len(self.lista)
+            self.numArestas = self.lista.numArestas()
+        else:
+            self.conectaVizinhos(base, altura, numPisos, self.rotulos)
+
+        self.componentes = self._componentesDaImagem()
+        self.hashMapa = _hashRotulos(self.rotulos)
+
+    def classePixel(self, pixel):
+        """
+        Retorna a classe (rótulo, ver labels.py) do pixel (x, y, piso), ou None se ele estiver fora do mapa.
+
+        A consulta é um acesso ao array de rótulos, em O(1), e serve para colorir ou classificar nós sem
+        procurar o pixel nas listas de cada cor.
+        """
+        x, y, z = pixel
+        forma = self.rotulos.shape if self.rotulos is not None else (0, 0, 0)
+        if not (0 <= z < forma[0] and 0 <= y < forma[1] and 0 <= x < forma[2]):
+            return None
+        return int(self.rotulos[z, y, x])
+
+    def alteraPixels(self, mudancas):
+        """
+        Muda a classe de alguns pixels de um grafo já criado, sem refazer o grafo.
+
+        Parâmetros:
+        - mudancas: Dicionário {(x, y, piso): rótulo} com a nova classe de cada pixel (ver labels.py), por
+          exemplo {porta: PRETO} para fechar uma porta.
+
+        As arestas que saem de cada pixel alterado ou chegam nele são calculadas antes e depois da mudança com
+        as regras do conectaVizinhos, e só as diferenças são aplicadas à lista de adjacência (a grade implícita
+        lê os rótulos direto). As listas de cada cor, o pixel final, o índice de componentes, o grafo reverso
+        guardado, a hierarquia de clusters (só os clusters afetados são refeitos) e o hash do mapa acompanham a
+        mudança, então o cache de caminhos continua valendo; os caches calculados sobre o mapa inteiro (saltos,
+        campo de distâncias, marcos e índice de contração) são descartados.
+
+        Retorna:
+        A lista de arestas alteradas em tuplas (u, v, peso), com peso None nas removidas, que o
+        PlanejadorIncremental usa para reparar a busca sem refazê-la (ver replan.py).
+        """
+        if self.rotulos is None:
+            raise ValueError("Só um grafo criado com criaGrafo pode ter pixels alterados.")
+
+        mudancas = dict(mudancas)
+        for pixel, rotulo in mudancas.items():
+            if self.classePixel(pixel) is None:
+                raise KeyError(pixel)
+            if not 0 <= rotulo < len(PESOS):
+                raise ValueError(f"Rótulo desconhecido: {rotulo}")
+
+        antigos = {pixel: self.classePixel(pixel) for pixel in mudancas}
+        antes = {}
+        for pixel in mudancas:
+            antes.update(self._arestasPixel(pixel))
+        for (x, y, z), rotulo in mudancas.items():
+            self.rotulos[z, y, x] = rotulo
+        depois = {}
+        for pixel in mudancas:
+            depois.update(self._arestasPixel(pixel))
+
+        alteracoes = [(u, v, depois.get((u, v))) for u, v in {**antes, **depois} if antes.get((u, v)) != depois.get((u, v))]
+        if isinstance(self.lista, GradeImplicita):
+            # Na grade implícita só os pixels não pretos são nós.
+            self.numArestas += len(depois) - len(antes)
+            self.numNos += sum((antigos[pixel] == PRETO) - (rotulo == PRETO) for pixel, rotulo in mudancas.items())
+        else:
+            self._aplicaArestas(alteracoes)
+
+        listas = {
+            VERMELHO: self.areasVermelhas,
+            VERDE: self.areasVerdes,
+            CINZA_ESCURO: self.cinzasEscuros,
+            CINZA_CLARO: self.cinzasClaros,
+            PRETO: self.pixelsPretos,
+        }
+        for pixel, rotulo in mudancas.items():
+            if antigos[pixel] == rotulo:
+                continue
+            if antigos[pixel] in listas:
+                while pixel in listas[antigos[pixel]]:
+                    listas[antigos[pixel]].remove(pixel)
+            if rotulo in listas:
+                listas[rotulo].append(pixel)
+            if rotulo != PRETO:
+                self.pesoMinimo = min(self.pesoMinimo, int(PESOS[rotulo]))
+        if len(self.areasVerdes) > 0:
+            self.pixelFinal = self.areasVerdes[-1]
+
+        if self.componentes is not None:
+            if any(antigos[pixel] != PRETO and rotulo == PRETO for pixel, rotulo in mudancas.items()):
+                # Fechar uma passagem pode separar uma componente, o que o union-find não desfaz: o índice é refeito na próxima consulta.
+                self.componentes = None
+            else:
+                for pixel, rotulo in mudancas.items():
+                    if antigos[pixel] == PRETO and rotulo != PRETO:
+                        self.componentes.adiciona(pixel)
+                        for u, v in depois:
+                            if u == pixel and self.classePixel(v) != PRETO:
+                                self.componentes.une(u, v)
+
+        self._saltos = self._campo = self._marcos = self._contracao = None
+        if self._hierarquia is not None:
+            self._hierarquia[2].atualizaPixels(mudancas)
+        if self.hashMapa is not None:
+            self.hashMapa = _hashRotulos(self.rotulos)
+        return alteracoes
+
+    def alteraArestas(self, alteracoes):
+        """
+        Troca o peso, cria ou remove arestas de um grafo já criado, sem refazer o grafo.
+
+        Parâmetros:
+        - alteracoes: Iterável de tuplas (u, v, peso); peso None remove a aresta de u para v, se ela existir.
+
+        Diferente do alteraPixels, as arestas deixam de seguir o mapa (ver arestasSeguemMapa): o grafo perde a
+        chave de mapa (as buscas deixam de passar pelo cache), os marcos da heurística ALT e o índice de contração
+        são descartados, o menor peso passa a considerar os novos pesos e, se alguma aresta for removida, o índice
+        de componentes é refeito na próxima consulta. Na grade implícita os pesos vêm dos rótulos, então só o
+        alteraPixels pode ser usado.
+
+        Retorna:
+        A lista de alterações, para o PlanejadorIncremental (ver replan.py).
+        """
+        if isinstance(self.lista, GradeImplicita):
+            raise ValueError("Na grade implícita os pesos vêm dos rótulos: use alteraPixels.")
+
+        alteracoes = list(alteracoes)
+        adicionadas = [(u, v) for u, v, peso in alteracoes if peso is not None]
+        semSaida = any(u not in self.lista or len(self.lista[u]) == 0 for u, _ in adicionadas)
+        self._aplicaArestas(alteracoes)
+
+        if self.componentes is not None:
+            if semSaida or len(adicionadas) < len(alteracoes):
+                self.componentes = None
+            else:
+                for u, v in adicionadas:
+                    if len(self.lista[v]) > 0:
+                        self.componentes.une(u, v)
+        pesos = [peso for _, _, peso in alteracoes if peso is not None]
+        if pesos:
+            self.pesoMinimo = min(self.pesoMinimo, min(pesos))
+        self.hashMapa = None
+        self._marcos = self._contracao = None
+        return alteracoes
+
+    def arestasSeguemMapa(self):
+        """
+        Retorna True se as arestas do grafo ainda são as que os rótulos do mapa definem.
+
+        Vale para um grafo criado com criaGrafo (ou carregado com carregaGrafo) e alterado só pelo alteraPixels.
+        Depois do alteraArestas ou do adicionaAresta o grafo perde a chave de mapa, e as buscas que leem os rótulos
+        em vez da lista de adjacência (buscaSaltos, buscaHierarquica, buscaMarcos, campoDistancias e a heurística
+        de grade) dariam custos errados: elas passam a usar o aEstrela sem heurística ou recusam a consulta.
+        """
+        return self.rotulos is not None and self.hashMapa is not None
+
+    def _arestasPixel(self, pixel):
+        """
+        Calcula, com os rótulos atuais, as arestas que saem do pixel ou chegam nele.
+
+        As regras são as do conectaVizinhos: o peso vem da classe do pixel de origem, que não pode ser preto, e a
+        troca de piso (peso 5) liga dois pixels não pretos. Na grade implícita o pixel de chegada também não pode
+        ser preto, pois os pixels pretos não são nós.
+
+        Retorna:
+        Um dicionário {(u, v): peso}.
+        """
+        x, y, z = pixel
+        pisos, altura, base = self.rotulos.shape
+        rotulos = self.rotulos
+        chegadaPassavel = isinstance(self.lista, GradeImplicita)
+
+        def dentro(x, y, z):
+            return 0 <= x < base and 0 <= y < altura and 0 <= z < pisos
+
+        def passavel(x, y, z):
+            return dentro(x, y, z) and rotulos[z, y, x] != PRETO
+
+        arestas = {}
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            vizinho = (x + dx, y + dy, z)
+            if not dentro(*vizinho):
+                continue
+            if passavel(*pixel) and (not chegadaPassavel or passavel(*vizinho)):
+                arestas[pixel, vizinho] = int(PESOS[rotulos[z, y, x]])
+            if passavel(*vizinho) and (not chegadaPassavel or passavel(*pixel)):
+                arestas[vizinho, pixel] = int(PESOS[rotulos[z, y + dy, x + dx]])
+        if passavel(*pixel):
+            for dz in [-1, 1]:
+                if passavel(x, y, z + dz):
+                    arestas[pixel, (x, y, z + dz)] = PESO_PISO
+                    arestas[(x, y, z + dz), pixel] = PESO_PISO
+        return arestas
+
+    def _aplicaArestas(self, alteracoes):
+        """
+        Aplica as alterações (u, v, peso) à lista de adjacência (dicionário ou GrafoCompacto) e ao grafo reverso
+        guardado pelo grafoReverso, se houver, e atualiza os contadores. Peso None remove a aresta.
+        """
+        alteracoes = [(u, v, peso) for (u, v), peso in {(u, v): peso for u, v, peso in alteracoes}.items()]
+        chaveReverso = (id(self.lista), self.numNos, self.numArestas)
+        reverso = self._reverso[1] if self._reverso is not None and self._reverso[0] == chaveReverso else None
+
+        if isinstance(self.lista, GrafoCompacto):
+            numNos = len(self.lista)
+            self.numArestas += self.lista.alteraArestas(alteracoes)
+            self.numNos += len(self.lista) - numNos
+            if reverso is not None:
+                reverso.alteraArestas([(v, u, peso) for u, v, peso in alteracoes])
+        else:
+            for u, v, peso in alteracoes:
+                existia = u in self.lista and v in self.lista[u]
+                if peso is None:
+                    if existia:
+                        del self.lista[u][v]
+                        self.numArestas -= 1
+                        if reverso is not None:
+                            del reverso[v][u]
+                    continue
+                for no in (u, v):
+                    if no not in self.lista:
+                        self.lista[no] = {}
+                        self.numNos += 1
+                        if reverso is not None:
+                            reverso.setdefault(no, {})
+                self.lista[u][v] = peso
+                self.numArestas += not existia
+                if reverso is not None:
+                    reverso[v][u] = peso
+
+        if reverso is not None:
+            self._reverso = ((id(self.lista), self.numNos, self.numArestas), reverso)
+
+    def chaveMapa(self):
+        """
+        Retorna a chave que identifica o mapa e as regras de peso do grafo, usada pelo cache de caminhos (ver comum/cache.py).
+
+        A chave junta o hash do conteúdo do mapa (os rótulos de todos os pisos, calculado no criaGrafo), os pesos
+        de cada classe, o peso da troca de piso e o tipo de grafo. Se o grafo foi alterado depois do criaGrafo,
+        retorna None e as buscas não passam pelo cache.
+        """
+        if self.hashMapa is None:
+            return None
+        return self.hashMapa, tuple(PESOS.tolist()), PESO_PISO, self.compacto, self.implicito
+
+    def salvaGrafo(self, diretorio, arquivoBitmap):
+        """
+        Salva o grafo pronto em um diretório de arrays binários (ver comum/storage.py).
+
+        Parâmetros:
+        - diretorio: O diretório onde o grafo será salvo.
+        - arquivoBitmap: O bitmap (ou diretório de pisos) de onde o grafo foi criado. O hash do seu conteúdo fica
+          guardado junto com o grafo para que o carregaGrafo recuse o arquivo se o bitmap mudar.
+
+        Os arrays salvos são os do exportaArrays.
+        """
+        arrays, meta = self.exportaArrays()
+        meta["origem"] = hashArquivos(listaPisos(arquivoBitmap))
+        salvaArrays(diretorio, arrays, meta)
+
+    def exportaArrays(self):
+        """
+        Converte o grafo pronto em arrays e metadados, o formato usado pelo salvaGrafo e pelo batch.py.
+
+        São exportados o array de rótulos, as listas de pixels de cada cor, o pixel final, os contadores, o índice
+        de componentes e a lista de adjacência com pesos no formato do GrafoCompacto (o dicionário "lista" é
+        convertido; a grade implícita só precisa dos rótulos).
+
+        Retorna:
+        Uma tupla (arrays, meta) com o dicionário {nome: array} e o dicionário de metadados, que o importaArrays
+        usa para refazer o grafo.
+        """
+        if self.rotulos is None:
+            raise ValueError("Só um grafo criado com criaGrafo pode ser exportado.")
+
+        arrays = {"rotulos": self.rotulos}
+        for nome in ["areasVerdes", "areasVermelhas", "cinzasClaros", "cinzasEscuros", "pixelsPretos"]:
+            arrays[nome] = np.array(getattr(self, nome), dtype=np.int64).reshape(-1, 3)
+
+        if not isinstance(self.lista, GradeImplicita):
+            grafo = self.lista
+            if not isinstance(grafo, GrafoCompacto):
+                grafo = GrafoCompacto(self.dimensoes)
+                grafo.adicionaNos([grafo.codifica(no) for no in self.lista])
+                arestas = [(grafo.codifica(u), grafo.codifica(v), peso) for u in self.lista for v, peso in self.lista[u].items()]
+                if arestas:
+                    grafo.adicionaArestas(*zip(*arestas))
+            grafo.consolida()
+            arrays.update(indice=grafo.indice, ids=grafo.ids, inicio=grafo.inicio, destinos=grafo.destinos, pesos=grafo.pesos)
+
+        componentes = self.indiceComponentes()
+        if not componentes.extras:
+            arrays.update(componentesPai=componentes.pai, componentesPresentes=componentes.presentes)
+
+        meta = {
+            "implicito": isinstance(self.lista, GradeImplicita),
+            "dimensoes": list(self.dimensoes),
+            "pixelFinal": list(self.pixelFinal) if self.pixelFinal else None,
+            "pesoMinimo": self.pesoMinimo,
+            "numNos": int(self.numNos),
+            "numArestas": int(self.numArestas),
+            "hashMapa": self.hashMapa,
+        }
+        return arrays, meta
+
+    def carregaGrafo(self, diretorio, arquivoBitmap=None):
+        """
+        Carrega um grafo salvo com salvaGrafo, sem decodificar o bitmap nem refazer a lista de adjacência.
+
+        Parâmetros:
+        - diretorio: O diretório onde o grafo foi salvo.
+        - arquivoBitmap: O bitmap (ou diretório de pisos) de origem. Se informado, um grafo salvo a partir de outro
+          conteúdo é recusado.
+
+        Os arrays são mapeados do disco (np.load com mmap_mode), então carregar e fazer a primeira consulta em um
+        mapa grande leva milissegundos: só as páginas usadas pela busca são lidas. A lista de adjacência volta como
+        um GrafoCompacto (ou uma GradeImplicita, se o grafo salvo era implícito), e as listas de pixels de cada cor
+        voltam como PixelsSalvos, que leem o array sob demanda.
+
+        Retorna:
+        True se o grafo foi carregado; False se o diretório não existe, é de outra versão ou está desatualizado.
+        """
+        carregado = carregaArrays(diretorio, listaPisos(arquivoBitmap) if arquivoBitmap is not None else None)
+        if carregado is None:
+            return False
+        self.importaArrays(*carregado)
+        return True
+
+    def importaArrays(self, arrays, meta):
+        """
+        Refaz o grafo a partir dos arrays e metadados do exportaArrays, usando os arrays sem copiá-los.
+
+        Parâmetros:
+        - arrays: Dicionário {nome: array}, por exemplo mapeado do disco ou de memória compartilhada.
+        - meta: Dicionário de metadados do exportaArrays.
+        """
+        self.rotulos = arrays["rotulos"]
+        self.dimensoes = tuple(meta["dimensoes"])
+        for nome in ["areasVerdes", "areasVermelhas", "cinzasClaros", "cinzasEscuros", "pixelsPretos"]:
+            setattr(self, nome, PixelsSalvos(arrays[nome]))
+        self.pixelFinal = tuple(meta["pixelFinal"]) if meta["pixelFinal"] else 0
+        self.pesoMinimo = meta["pesoMinimo"]
+        self.numNos = meta["numNos"]
+        self.numArestas = meta["numArestas"]
+
+        self.implicito = meta["implicito"]
+        self.compacto = not self.implicito
+        if self.implicito:
+            self.lista = GradeImplicita(self.rotulos)
+        else:
+            self.lista = GrafoCompacto(self.dimensoes, arrays["indice"])
+            self.lista.usaArrays(arrays["ids"], arrays["inicio"], arrays["destinos"], arrays["pesos"])
+
+        self.componentes = None
+        if "componentesPai" in arrays:
+            self.componentes = Componentes(self.dimensoes, arrays["componentesPai"], arrays["componentesPresentes"])
+        self._reverso = self._saltos = self._campo = self._hierarquia = self._marcos = self._contracao = None
+        self.hashMapa = meta["hashMapa"]
+
+    def conectaVizinhos(self, base, altura, profundidade, rotulos):
         """
         Conecta os vizinhos no grafo.
 
@@ -138,125 +666,852 @@ class Graph:
         - base: A largura da imagem em pixels.
         - altura: A altura da imagem em pixels.
         - profundidade: A profundidade do grafo, representando o número de andares.
-        - imagem: A imagem utilizada para determinar a conectividade dos pixels.
+        - rotulos: O array de rótulos (ver labels.py) utilizado para determinar a conectividade dos pixels, com
+          forma (profundidade, altura, base) (ou (altura, base) para um só piso).
 
-        Esta função percorre os pixels da imagem e adiciona arestas entre os pixels vizinhos no grafo,
-        considerando apenas os pixels que não são pretos. O peso das arestas é determinado com base na cor do pixel.
+        Esta função adiciona arestas entre os pixels vizinhos no grafo, considerando apenas os pixels que não
+        são pretos como origem. O peso das arestas é determinado com base na cor do pixel de origem. Cada pixel
+        não preto também é ligado, com peso 5 (PESO_PISO), ao mesmo (x, y) do piso de baixo e do piso de cima
+        quando lá o pixel não é preto. As arestas de cada direção são encontradas de uma só vez com fatias do
+        array de rótulos, então o tempo é linear no número total de pixels.
         """
-        for linha in range(altura):
-            for coluna in range(base):
-                # Obtém a cor do pixel atual
-                corDoPixelAtual = imagem.getpixel((coluna, linha))
+        rotulos = rotulos.reshape(profundidade, altura, base)
+        passaveis = rotulos != PRETO
+        pesos = PESOS[rotulos]
 
-                # Verifica se o pixel não é preto
-                if corDoPixelAtual != (0, 0, 0):
-                    # Adiciona o pixel como nó no grafo
-                    pixel = (coluna, linha, 0)
-                    self.adicionaNo(pixel)
+        for piso in range(profundidade):
+            # Mesma ordem de vizinhos da varredura original: esquerda, direita, acima, abaixo.
+            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                origens = np.zeros_like(passaveis[piso])
+                origens[max(0, -dy):altura - max(0, dy), max(0, -dx):base - max(0, dx)] = True
+                origens &= passaveis[piso]
+                linhas, colunas = np.nonzero(origens)
+                self._adicionaArestasGrade(colunas, linhas, dx, dy, pesos[piso, linhas, colunas], piso)
 
-                    # Verifica os vizinhos nas direções vertical e horizontal
-                    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        novoU, novoV, novoT = linha + dy, coluna + dx, 0
-                        if (
-                            0 <= novoU < altura
-                            and 0 <= novoV < base
-                            and 0 <= novoT < profundidade
-                        ):
-                            vizinho = (novoV, novoU, novoT)
+        # Troca de piso: piso de baixo e piso de cima, como na GradeImplicita.
+        for dz in [-1, 1]:
+            for piso in range(max(0, -dz), profundidade - max(0, dz)):
+                linhas, colunas = np.nonzero(passaveis[piso] & passaveis[piso + dz])
+                self._adicionaArestasGrade(colunas, linhas, 0, 0, np.full(len(linhas), PESO_PISO), piso, dz)
 
-                            if vizinho in self.lista:
-                                peso = 1
+    def _componentesDaImagem(self):
+        """
+        Monta o índice de componentes do grafo recém-criado direto do array de rótulos.
+
+        Os pixels não pretos são os nós com arestas de saída, e dois deles vizinhos no mesmo piso ou no mesmo
+        (x, y) em pisos vizinhos estão ligados, então as uniões de cada direção saem de uma só vez com fatias do
+        array, sem percorrer a lista de adjacência.
+        """
+        base, altura, numPisos = self.dimensoes
+        componentes = Componentes(self.dimensoes)
+        passaveis = self.rotulos != PRETO
 
-                                if corDoPixelAtual == (128, 128, 128):
-                                    peso = 4  # Peso 4 para pixels cinza escuro
-                                elif corDoPixelAtual == (196, 196, 196):
-                                    peso = 2  # Peso 2 para pixels cinza claro
+        if isinstance(self.lista, GradeImplicita):
+            nos = passaveis
+        else:
+            nos = np.full(passaveis.shape, base * altura > 1)
+        pisos, linhas, colunas = np.nonzero(nos)
+        componentes.adicionaIds(np.ravel_multi_index((colunas, linhas, pisos), self.dimensoes))
 
-                                if novoT != 0:
-                                    peso = 5  # Peso 5 se o vizinho estiver em um piso diferente
+        for eixo in [2, 1, 0]:
+            tamanho = passaveis.shape[eixo]
+            pares = passaveis.take(range(tamanho - 1), axis=eixo) & passaveis.take(range(1, tamanho), axis=eixo)
+            pisos, linhas, colunas = np.nonzero(pares)
+            origens = np.ravel_multi_index((colunas, linhas, pisos), self.dimensoes)
+            componentes.uneIds(origens, origens + componentes.passos[2 - eixo])
+        return componentes
 
-                                self.adicionaAresta(pixel, vizinho, peso)
+    def indiceComponentes(self):
+        """
+        Retorna o índice de componentes do grafo interno (ver comum/components.py).
 
-    def dijkstra(self, areasVermelhas, grafo=None):
+        O criaGrafo já deixa o índice pronto e o adicionaNo e o adicionaAresta o mantêm atualizado. Quando uma
+        mudança no grafo não pode ser aplicada ao índice (um nó sem saída que ganha uma aresta, ou uma passagem
+        fechada pelo alteraPixels), ele é refeito aqui: direto dos rótulos, se o grafo ainda segue o mapa, ou a
+        partir das arestas do grafo.
+        """
+        if self.componentes is not None:
+            return self.componentes
+
+        grafo = self.lista
+        if self.rotulos is not None and self.hashMapa is not None:
+            componentes = self._componentesDaImagem()
+        elif isinstance(grafo, GrafoCompacto):
+            componentes = Componentes(grafo.forma)
+            componentes.adicionaIds(grafo.ids)
+            origens, destinos, _ = grafo.arestas()
+            comSaida = np.zeros(len(componentes.pai), dtype=bool)
+            comSaida[origens] = True
+            componentes.uneIds(origens[comSaida[destinos]], destinos[comSaida[destinos]])
+        else:
+            componentes = Componentes(self.dimensoes or ())
+            for u in grafo:
+                componentes.adiciona(u)
+            for u in grafo:
+                for v in grafo[u]:
+                    if len(grafo[v]) > 0:
+                        componentes.une(u, v)
+
+        self.componentes = componentes
+        return componentes
+
+    def alcancavel(self, origens, destinos, grafo=None):
+        """
+        Verifica no índice de componentes se algum destino pode ser alcançado a partir das origens.
+
+        Parâmetros:
+        - origens: Uma lista de pontos de início.
+        - destinos: Uma lista de pontos de destino.
+        - grafo: O grafo da consulta. O índice só vale para o grafo interno; para outro grafo a resposta é sempre True.
+
+        Cada nó custa uma consulta ao union-find, então a resposta sai sem nenhuma busca. Um destino sem arestas
+        de saída (pixel preto) é alcançável se algum nó que chega nele estiver na componente de uma origem.
+
+        Retorna:
+        False quando com certeza não existe caminho; True quando a busca precisa ser feita.
+        """
+        if grafo is not None and grafo is not self.lista:
+            return True
+
+        componentes = self.indiceComponentes()
+        raizes = {componentes.raiz(ponto) for ponto in origens}
+        raizes.discard(None)
+        if not raizes:
+            return False
+
+        for ponto in destinos:
+            raiz = componentes.raiz(ponto)
+            if raiz is None:
+                continue
+            if raiz in raizes:
+                return True
+            if len(self.lista[ponto]) == 0:
+                reverso = self.grafoReverso()
+                if ponto in reverso and any(componentes.raiz(vizinho) in raizes for vizinho in reverso[ponto]):
+                    return True
+        return False
+
+    def _adicionaNosGrade(self, colunas, linhas, numPiso):
+        """
+        Adiciona ao grafo os nós (coluna, linha, numPiso) de uma só vez, ignorando os que já existem.
+        """
+        if isinstance(self.lista, GrafoCompacto):
+            numNos = len(self.lista)
+            self.lista.adicionaNos(np.ravel_multi_index((colunas, linhas, np.full_like(colunas, numPiso)), self.lista.forma))
+            self.numNos += len(self.lista) - numNos
+            return
+
+        for coluna, linha in zip(colunas.tolist(), linhas.tolist()):
+            if (coluna, linha, numPiso) not in self.lista:
+                self.lista[coluna, linha, numPiso] = {}
+                self.numNos += 1
+
+    def _adicionaArestasGrade(self, colunas, linhas, dx, dy, pesos, piso=0, dz=0):
+        """
+        Adiciona de uma só vez as arestas de cada (coluna, linha, piso) para o vizinho (coluna + dx, linha + dy, piso + dz).
+
+        Todo pixel dentro das imagens já é um nó, então o vizinho sempre existe no grafo.
+        """
+        if isinstance(self.lista, GrafoCompacto):
+            forma = self.lista.forma
+            pisos = np.full_like(colunas, piso)
+            self.lista.adicionaArestas(
+                np.ravel_multi_index((colunas, linhas, pisos), forma),
+                np.ravel_multi_index((colunas + dx, linhas + dy, pisos + dz), forma),
+                pesos,
+            )
+        else:
+            for coluna, linha, peso in zip(colunas.tolist(), linhas.tolist(), pesos.tolist()):
+                self.lista[coluna, linha, piso][coluna + dx, linha + dy, piso + dz] = peso
+        self.numArestas += len(linhas)
+
+    def dijkstra(self, areasVermelhas, grafo=None, fila="heap"):
         """
         Executa o algoritmo de Dijkstra em um grafo.
 
         Parâmetros:
         - areasVermelhas: Uma lista de pontos da saída do caminho no grafo.
         - grafo: O grafo no qual o algoritmo será executado. Se não for fornecido, será utilizado o grafo interno.
+        - fila: A fila de prioridade usada, "heap" (heap binário) ou "baldes" (fila de baldes, ver _dijkstraBaldes).
 
         Retorna:
-        Um dicionário contendo os predecessores de cada nó no caminho mais curto até as áreas vermelhas especificadas.
+        Um dicionário contendo os predecessores de cada nó alcançado no caminho mais curto até as áreas vermelhas
+        especificadas. Nós não alcançados não aparecem no dicionário.
         """
         if grafo is None:
             grafo = self.lista  # Use o grafo interno se nenhum grafo for fornecido
 
-        dist = {no: float("inf") for no in grafo}
-        pred = {no: None for no in grafo}
+        if fila == "baldes":
+            return self._dijkstraBaldes(areasVermelhas, lambda u: grafo[u].items())
+        if fila != "heap":
+            raise ValueError(f"Fila desconhecida: {fila}")
+
+        # Distâncias e predecessores são preenchidos sob demanda: um nó ausente ainda não foi alcançado.
+        dist = {}
+        pred = {}
 
         Q = [(0, ponto) for ponto in areasVermelhas]
 
         for ponto in areasVermelhas:
             dist[ponto] = 0
+            pred[ponto] = None
 
         while Q:
             dist_u, u = heapq.heappop(Q)
+            if dist_u > dist[u]:
+                continue  # Entrada antiga: u já saiu da fila com uma distância menor
 
             for v, peso in grafo[u].items():
-                if dist[v] > dist_u + peso:
+                if dist.get(v, float("inf")) > dist_u + peso:
                     dist[v] = dist_u + peso
                     pred[v] = u
                     heapq.heappush(Q, (dist[v], v))
 
         return pred
     
-    def dijkstraForMultiplasImagens(self, areasVermelhas, grafo=None):
+    def dijkstraForMultiplasImagens(self, areasVermelhas, grafo=None, fila="heap"):
         """
         Executa o algoritmo de Dijkstra em um grafo com múltiplos andares (imagens).
 
         Parâmetros:
         - areasVermelhas: Uma lista de pontos da saída do caminho no grafo.
         - grafo: O grafo no qual o algoritmo será executado. Se não for fornecido, será utilizado o grafo interno.
+        - fila: A fila de prioridade usada, "heap" (heap binário) ou "baldes" (fila de baldes, ver _dijkstraBaldes).
 
         Retorna:
-        Um dicionário contendo os predecessores de cada nó no caminho mais curto até as áreas vermelhas especificadas,
-        considerando a possibilidade de múltiplos andares.
+        Um dicionário contendo os predecessores de cada nó alcançado no caminho mais curto até as áreas vermelhas
+        especificadas, considerando a possibilidade de múltiplos andares.
         """
         if grafo is None:
             grafo = self.lista
 
-        dist = {no: float("inf") for no in grafo}
-        pred = {no: None for no in grafo}
+        def vizinhos(u):
+            x, y, z = u
+
+            # Verificar vizinhos em todos os andares
+            for dx, dy, dz in [(1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, -1), (0, 0, 1)]:
+                novoPonto = (x + dx, y + dy, z + dz)
+
+                if novoPonto in grafo:
+                    yield novoPonto, PESO_PISO if dz != 0 else 1
+
+        if fila == "baldes":
+            return self._dijkstraBaldes(areasVermelhas, vizinhos)
+        if fila != "heap":
+            raise ValueError(f"Fila desconhecida: {fila}")
+
+        dist = {}
+        pred = {}
 
         Q = [(0, ponto) for ponto in areasVermelhas]
 
         for ponto in areasVermelhas:
             dist[ponto] = 0
+            pred[ponto] = None
 
         while Q:
             dist_u, u = heapq.heappop(Q)
+            if dist_u > dist[u]:
+                continue
 
-            # print(f"Explorando nó {u}, distância atual: {dist_u}")
+            for novoPonto, peso in vizinhos(u):
+                if dist.get(novoPonto, float("inf")) > dist_u + peso:
+                    dist[novoPonto] = dist_u + peso
+                    pred[novoPonto] = u
+                    heapq.heappush(Q, (dist[novoPonto], novoPonto))
+        return pred
 
-            x, y, z = u
+    def _dijkstraBaldes(self, areasVermelhas, vizinhos, pesoMaximo=PESO_MAXIMO):
+        """
+        Executa o Dijkstra com uma fila de baldes circular (algoritmo de Dial).
 
-            # Verificar vizinhos em todos os andares
-            for dx, dy, dz in [(1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, -1), (0, 0, 1)]:
-                novoX, novoY, novoZ = x + dx, y + dy, z + dz
-                novoPonto = (novoX, novoY, novoZ)
+        Parâmetros:
+        - areasVermelhas: Uma lista de pontos de início.
+        - vizinhos: Função que recebe um nó e retorna pares (vizinho, peso).
+        - pesoMaximo: O maior peso de aresta do grafo. Os pesos devem ser inteiros entre 0 e pesoMaximo.
+
+        Todos os pesos das imagens são inteiros pequenos (1, 2, 4 ou 5), então as distâncias pendentes na fila
+        ficam sempre entre a distância atual d e d + pesoMaximo. Basta um balde (lista de nós) para cada resto de
+        d módulo pesoMaximo + 1, percorridos em ordem; inserir e remover custa O(1), e a busca inteira fica linear
+        no tamanho do grafo mais a maior distância. Um nó cuja distância melhorou depois de entrar em um balde
+        continua lá, e é descartado quando retirado se sua distância atual não for a do balde.
+
+        Retorna:
+        O dicionário de predecessores, como o do dijkstra.
+        """
+        numBaldes = pesoMaximo + 1
+        baldes = [[] for _ in range(numBaldes)]
+        dist = {}
+        pred = {}
+
+        for ponto in areasVermelhas:
+            dist[ponto] = 0
+            pred[ponto] = None
+            baldes[0].append(ponto)
+
+        pendentes = len(baldes[0])
+        d = 0
+        while pendentes > 0:
+            balde = baldes[d % numBaldes]
+            while balde:
+                u = balde.pop()
+                pendentes -= 1
+                if dist[u] != d:
+                    continue  # Entrada antiga: u já foi retirado com uma distância menor
+
+                for v, peso in vizinhos(u):
+                    if not 0 <= peso <= pesoMaximo:
+                        raise ValueError(f"Peso {peso} fora do intervalo da fila de baldes (0 a {pesoMaximo})")
+                    if dist.get(v, float("inf")) > d + peso:
+                        dist[v] = d + peso
+                        pred[v] = u
+                        baldes[(d + peso) % numBaldes].append(v)
+                        pendentes += 1
+            d += 1
 
-                if novoPonto in grafo:
-                    peso = 1
-                    if dz != 0:
-                        peso = 5
-
-                    if dist[novoPonto] > dist_u + peso:
-                        dist[novoPonto] = dist_u + peso
-                        pred[novoPonto] = u
-                        heapq.heappush(Q, (dist[novoPonto], novoPonto))
-                        # print(f"   Atualizado nó {novoPonto}, nova distância: {dist[novoPonto]}, predecessor: {u}")
         return pred
 
+    def caminhoMinimo(self, origens, destinos, grafo=None):
+        """
+        Busca o caminho de menor custo entre um conjunto de origens e um conjunto de destinos.
+
+        Parâmetros:
+        - origens: Uma lista de pontos de início (por exemplo as áreas vermelhas).
+        - destinos: Uma lista de pontos onde a busca pode terminar (por exemplo as áreas verdes).
+        - grafo: O grafo no qual a busca será executada. Se não for fornecido, será utilizado o grafo interno.
+
+        Esta função executa o Dijkstra a partir de todas as origens ao mesmo tempo e para assim que o primeiro
+        destino sai da fila de prioridade, pois nesse momento o custo dele já é definitivo. Entradas antigas
+        da fila (de nós que já tiveram a distância melhorada) são descartadas quando removidas.
+
+        Retorna:
+        Uma tupla (caminho, custo, destino) com o caminho reconstruído, a soma dos pesos das arestas e o destino
+        alcançado. Se nenhum destino for alcançável, retorna ([], inf, None), sem busca quando o índice de
+        componentes já mostra que não há caminho.
+        """
+        if not self.alcancavel(origens, destinos, grafo):
+            return [], float("inf"), None
+        if grafo is None:
+            grafo = self.lista
+
+        destinos = set(destinos)
+        dist = {}
+        pred = {}
+
+        Q = []
+        for ponto in origens:
+            if ponto in grafo and ponto not in dist:
+                dist[ponto] = 0
+                pred[ponto] = None
+                Q.append((0, ponto))
+
+        while Q:
+            dist_u, u = heapq.heappop(Q)
+            if dist_u > dist[u]:
+                continue
+            if u in destinos:
+                return self.reconstruirCaminho(u, pred), dist_u, u
+
+            for v, peso in grafo[u].items():
+                if dist.get(v, float("inf")) > dist_u + peso:
+                    dist[v] = dist_u + peso
+                    pred[v] = u
+                    heapq.heappush(Q, (dist[v], v))
+
+        return [], float("inf"), None
+
+    def heuristicaGrade(self, destinos, grafo=None, pesoMinimo=None):
+        """
+        Cria a heurística admissível do A* para nós (x, y, piso) de uma grade.
+
+        Parâmetros:
+        - destinos: Os pixels de destino da busca.
+        - grafo: O grafo no qual a busca será executada. Se não for fornecido, será utilizado o grafo interno.
+        - pesoMinimo: O menor peso de aresta dentro de um piso. Se não for fornecido, é o menor peso do mapa atual.
+
+        A estimativa para um nó é a distância de Manhattan até o destino multiplicada pelo menor peso de aresta
+        do mapa, mais 5 por piso de diferença, pois cada troca de piso custa 5 e não anda em x ou y. Com vários
+        destinos, vale o menor valor entre eles; acima de alguns destinos esse mínimo é pré-calculado para toda a
+        grade com uma transformada de distância. Se as arestas do grafo interno não seguem mais o mapa (ver
+        arestasSeguemMapa), uma aresta pode ligar pixels distantes com qualquer peso, e a estimativa é sempre 0.
+
+        Retorna:
+        Uma função que recebe um nó e retorna a estimativa do custo restante até o destino mais próximo.
+        """
+        if grafo is None:
+            grafo = self.lista
+
+        destinos = list(destinos)
+        if len(destinos) == 0 or (grafo is self.lista and self.rotulos is not None and not self.arestasSeguemMapa()):
+            return lambda no: 0
+        pesoInformado = pesoMinimo
+
+        if isinstance(grafo, GradeImplicita):
+            base, altura, pisos = grafo.base, grafo.altura, grafo.pisos
+            pesoMinimo = _pesoMinimo(grafo.rotulos)
+        elif isinstance(grafo, GrafoCompacto):
+            base, altura, pisos = grafo.forma
+            pesoMinimo = self.pesoMinimo
+        elif self.dimensoes is not None:
+            base, altura, pisos = self.dimensoes
+            pesoMinimo = self.pesoMinimo
+        else:
+            pesoMinimo = self.pesoMinimo
+            base = altura = pisos = None
+        if pesoInformado is not None:
+            pesoMinimo = pesoInformado
+
+        def estimativaDireta(no):
+            x, y, z = no
+            return min(pesoMinimo * (abs(x - dx) + abs(y - dy)) + PESO_PISO * abs(z - dz) for dx, dy, dz in destinos)
+
+        if len(destinos) <= _MAX_DESTINOS_DIRETOS or base is None:
+            return estimativaDireta
+
+        manhattan = _distanciasManhattan(destinos, pisos, altura, base) * pesoMinimo
+        tabela = np.full_like(manhattan, np.inf)
+        for piso in range(pisos):
+            for outroPiso in range(pisos):
+                np.minimum(tabela[piso], manhattan[outroPiso] + PESO_PISO * abs(piso - outroPiso), out=tabela[piso])
+
+        def estimativaTabela(no):
+            x, y, z = no
+            if 0 <= x < base and 0 <= y < altura and 0 <= z < pisos:
+                return tabela.item(z, y, x)
+            return estimativaDireta(no)
+
+        return estimativaTabela
+
+    def aEstrela(self, origens, destinos, grafo=None, heuristica=None):
+        """
+        Executa o algoritmo A* entre um conjunto de origens e um conjunto de destinos.
+
+        Parâmetros:
+        - origens: Uma lista de pontos de início (por exemplo as áreas vermelhas).
+        - destinos: Uma lista de pontos onde a busca pode terminar (por exemplo as áreas verdes).
+        - grafo: O grafo no qual a busca será executada. Se não for fornecido, será utilizado o grafo interno.
+        - heuristica: Função que estima o custo restante de um nó até o destino. Se não for fornecida, será usada
+          a heurística de grade (ver heuristicaGrade); com "lambda no: 0" a busca equivale ao Dijkstra.
+
+        Esta função funciona como o caminhoMinimo, mas ordena a fila pelo custo já percorrido somado à estimativa
+        do custo restante. Como a heurística nunca superestima o custo, o caminho encontrado tem o mesmo custo do
+        Dijkstra, expandindo muito menos nós em mapas abertos. Em empates, o nó mais próximo do destino sai primeiro.
+
+        Retorna:
+        Uma tupla (caminho, custo, destino, expandidos) com o caminho reconstruído, a soma dos pesos das arestas,
+        o destino alcançado e o número de nós expandidos. Se nenhum destino for alcançável, retorna
+        ([], inf, None, expandidos).
+        """
+        if not self.alcancavel(origens, destinos, grafo):
+            return [], float("inf"), None, 0
+        if grafo is None:
+            grafo = self.lista
+
+        destinos = set(destinos)
+        if heuristica is None:
+            heuristica = self.heuristicaGrade(destinos, grafo)
+
+        dist = {}
+        pred = {}
+        expandidos = 0
+
+        Q = []
+        for ponto in origens:
+            if ponto in grafo and ponto not in dist:
+                dist[ponto] = 0
+                pred[ponto] = None
+                h = heuristica(ponto)
+                heapq.heappush(Q, (h, h, 0, ponto))
+
+        while Q:
+            _, _, dist_u, u = heapq.heappop(Q)
+            if dist_u > dist[u]:
+                continue
+            if u in destinos:
+                return self.reconstruirCaminho(u, pred), dist_u, u, expandidos
+
+            expandidos += 1
+            for v, peso in grafo[u].items():
+                if dist.get(v, float("inf")) > dist_u + peso:
+                    dist[v] = dist_u + peso
+                    pred[v] = u
+                    h = heuristica(v)
+                    heapq.heappush(Q, (dist[v] + h, h, dist[v], v))
+
+        return [], float("inf"), None, expandidos
+
+    def buscaSaltos(self, origens, destinos):
+        """
+        Busca o caminho de menor custo entre origens e destinos com Jump Point Search (ver comum/jps.py).
+
+        Parâmetros:
+        - origens: Uma lista de pontos de início (por exemplo as áreas vermelhas).
+        - destinos: Uma lista de pontos onde a busca pode terminar (por exemplo as áreas verdes).
+
+        Nas regiões brancas (peso 1) a busca salta em linha reta em vez de expandir cada pixel, e nos pixels
+        cinza e em volta deles volta à expansão normal, então o custo é o mesmo do dijkstra. Com mais de um
+        piso, cada pixel com piso acima ou abaixo é uma troca de peso diferente, então a busca usa o aEstrela, assim
+        como quando as arestas não seguem mais o mapa (ver arestasSeguemMapa).
+
+        Retorna:
+        Uma tupla (caminho, custo, destino, expandidos) como a do aEstrela, com o caminho em tuplas (x, y, piso).
+        """
+        if not self.arestasSeguemMapa() or self.rotulos.shape[0] != 1:
+            return self.aEstrela(origens, destinos)
+        if not self.alcancavel(origens, destinos):
+            return [], float("inf"), None, 0
+
+        if self._saltos is None or self._saltos[0] is not self.rotulos:
+            self._saltos = (self.rotulos, BuscaSaltos(self.rotulos[0] != PRETO, PESOS[self.rotulos[0]]))
+
+        caminho, custo, destino, expandidos = self._saltos[1].busca(
+            [(x, y) for x, y, piso in origens if piso == 0], [(x, y) for x, y, piso in destinos if piso == 0]
+        )
+        if destino is None:
+            return [], custo, None, expandidos
+        return [(x, y, 0) for x, y in caminho], custo, (*destino, 0), expandidos
+
+    def hierarquia(self, tamanho=32):
+        """
+        Retorna a hierarquia de clusters do mapa para a busca hierárquica (ver hierarchy.py).
+
+        Parâmetros:
+        - tamanho: O lado dos clusters em pixels.
+
+        A hierarquia é criada uma vez por mapa e tamanho de cluster e reaproveitada nas buscas seguintes, que
+        completam aos poucos os custos dentro dos clusters por onde passam; o alteraPixels a mantém atualizada.
+        Os clusters são calculados a partir dos rótulos, então o grafo precisa seguir o mapa (ver arestasSeguemMapa).
+        """
+        if self.rotulos is None:
+            raise ValueError("A busca hierárquica precisa do mapa: crie o grafo com criaGrafo antes.")
+        if not self.arestasSeguemMapa():
+            raise ValueError("As arestas do grafo foram alteradas e não seguem mais o mapa: use o caminhoMinimo.")
+        if self._hierarquia is None or self._hierarquia[0] is not self.rotulos or self._hierarquia[1] != tamanho:
+            self._hierarquia = (self.rotulos, tamanho, Hierarquia(self.rotulos, tamanho))
+        return self._hierarquia[2]
+
+    def buscaHierarquica(self, origens, destinos, tamanho=32):
+        """
+        Busca um caminho entre origens e destinos com a busca hierárquica (HPA*, ver hierarchy.py).
+
+        Parâmetros:
+        - origens: Uma lista de pontos de início (por exemplo as áreas vermelhas).
+        - destinos: Uma lista de pontos onde a busca pode terminar (por exemplo as áreas verdes).
+        - tamanho: O lado dos clusters em pixels.
+
+        A busca anda primeiro no grafo pequeno das entradas dos clusters, guiada pela heurística de grade, e só
+        refaz pixel a pixel os clusters do corredor escolhido, então serve para consultas interativas em mapas
+        de dezenas de megapixels. O custo pode ser maior que o do caminhoMinimo quando o caminho ótimo sai do
+        corredor de clusters escolhido (ver Hierarquia). Se as arestas não seguem
+        mais o mapa (ver arestasSeguemMapa), a busca usa o aEstrela.
+
+        Retorna:
+        Uma tupla (caminho, custo, destino, expandidos) como a do aEstrela, em que expandidos conta os nós do
+        grafo abstrato.
+        """
+        if not self.arestasSeguemMapa():
+            return self.aEstrela(origens, destinos)
+        if not self.alcancavel(origens, destinos):
+            return [], float("inf"), None, 0
+        return self.hierarquia(tamanho).busca(origens, destinos, self.heuristicaGrade(destinos))
+
+    def preparaMarcos(self, numMarcos=8, processos=1, marcos=None):
+        """
+        Prepara os marcos da heurística ALT para consultas repetidas no mesmo mapa (ver landmarks.py).
+
+        Parâmetros:
+        - numMarcos: Quantos marcos escolher pelo ponto mais distante.
+        - processos: Número de processos do cálculo das distâncias, um marco por tarefa (None usa todos os núcleos).
+        - marcos: Os pixels (x, y, piso) dos marcos, no lugar da escolha automática.
+
+        O pré-processamento é feito uma vez por mapa e reaproveitado pelo buscaMarcos até o mapa mudar. As
+        distâncias dos marcos são calculadas a partir dos rótulos, então o grafo precisa seguir o mapa (ver
+        arestasSeguemMapa).
+        """
+        if self.rotulos is None:
+            raise ValueError("Os marcos precisam do mapa: crie o grafo com criaGrafo antes.")
+        if not self.arestasSeguemMapa():
+            raise ValueError("As arestas do grafo foram alteradas e não seguem mais o mapa: use o caminhoMinimo.")
+        chave = (numMarcos, None if marcos is None else tuple(tuple(marco) for marco in marcos))
+        if self._marcos is None or self._marcos[0] is not self.rotulos or self._marcos[1] != chave:
+            self._marcos = (self.rotulos, chave, Marcos(self.rotulos, numMarcos, marcos, processos))
+        return self._marcos[2]
+
+    def buscaMarcos(self, origens, destinos):
+        """
+        Executa o A* entre origens e destinos com a heurística ALT dos marcos (ver preparaMarcos).
+
+        Parâmetros:
+        - origens: Uma lista de pontos de início (por exemplo as áreas vermelhas).
+        - destinos: Uma lista de pontos onde a busca pode terminar (por exemplo as áreas verdes).
+
+        Se os marcos ainda não foram preparados, usa o preparaMarcos com os valores padrão. A estimativa é a maior
+        entre a dos marcos e a da heurística de grade, que são admissíveis enquanto as arestas seguem o mapa de
+        onde os marcos foram calculados; nesse caso o custo é o mesmo do caminhoMinimo. Se as arestas não seguem
+        mais o mapa (ver arestasSeguemMapa), a busca usa o aEstrela sem os marcos.
+
+        Retorna:
+        Uma tupla (caminho, custo, destino, expandidos) como a do aEstrela.
+        """
+        if not self.arestasSeguemMapa():
+            return self.aEstrela(origens, destinos)
+        heuristica = self._marcosPreparados().heuristica(destinos, self.heuristicaGrade(destinos))
+        return self.aEstrela(origens, destinos, heuristica=heuristica)
+
+    def _marcosPreparados(self):
+        if self._marcos is not None and self._marcos[0] is self.rotulos:
+            return self._marcos[2]
+        return self.preparaMarcos()
+
+    def aceleracaoMarcos(self, origens, destinos):
+        """
+        Compara o buscaMarcos com o Dijkstra (o aEstrela sem heurística) na mesma consulta.
+
+        Parâmetros:
+        - origens: Uma lista de pontos de início.
+        - destinos: Uma lista de pontos onde a busca pode terminar.
+
+        O pré-processamento dos marcos é feito antes e não entra nos tempos.
+
+        Retorna:
+        Um dicionário com o custo, os nós expandidos e o tempo em segundos de cada busca, e a aceleração (tempo do
+        Dijkstra dividido pelo do buscaMarcos).
+        """
+        self._marcosPreparados()
+
+        inicio = time.perf_counter()
+        _, custoDijkstra, _, expandidosDijkstra = self.aEstrela(origens, destinos, heuristica=lambda no: 0)
+        tempoDijkstra = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        _, custo, _, expandidos = self.buscaMarcos(origens, destinos)
+        tempoMarcos = time.perf_counter() - inicio
+
+        return {
+            "custo": custo,
+            "custoDijkstra": custoDijkstra,
+            "expandidosDijkstra": expandidosDijkstra,
+            "expandidosMarcos": expandidos,
+            "tempoDijkstra": tempoDijkstra,
+            "tempoMarcos": tempoMarcos,
+            "aceleracao": tempoDijkstra / tempoMarcos if tempoMarcos > 0 else float("inf"),
+        }
+
+    def preparaContracao(self, limiteTestemunha=None):
+        """
+        Cria o índice de contraction hierarchies do grafo interno (ver contraction.py).
+
+        Parâmetros:
+        - limiteTestemunha: Quantos nós cada busca de testemunha pode fixar (None usa o padrão do contraiGrafo).
+
+        O pré-processamento é lento (minutos em mapas de megapixels), mas é feito uma vez: o índice pode ser salvo
+        com salvaContracao e carregado com carregaContracao, e fica valendo até o grafo mudar.
+        """
+        if self._contracao is None or self._contracao[0] is not self.lista:
+            self._contracao = (self.lista, contraiGrafo(self.lista, limiteTestemunha))
+        return self._contracao[1]
+
+    def buscaContracao(self, origens, destinos):
+        """
+        Busca o caminho de menor custo entre origens e destinos no índice de contraction hierarchies.
+
+        Parâmetros:
+        - origens: Uma lista de pontos de início (por exemplo as áreas vermelhas).
+        - destinos: Uma lista de pontos onde a busca pode terminar (por exemplo as áreas verdes).
+
+        Se o índice ainda não foi criado nem carregado, usa o preparaContracao. A busca bidirecional só sobe de
+        nível, então cada consulta fixa poucos nós; os atalhos do caminho encontrado são desempacotados em pixels.
+
+        Retorna:
+        Uma tupla (caminho, custo, destino) como a do caminhoMinimo.
+        """
+        if not self.alcancavel(origens, destinos):
+            return [], float("inf"), None
+        return self.preparaContracao().busca(origens, destinos)
+
+    def salvaContracao(self, diretorio, arquivoBitmap):
+        """
+        Salva o índice de contraction hierarchies em um diretório de arrays binários (ver comum/storage.py).
+
+        Parâmetros:
+        - diretorio: O diretório onde o índice será salvo (separado do salvaGrafo).
+        - arquivoBitmap: O bitmap (ou diretório de pisos) de onde o grafo foi criado, como no salvaGrafo.
+
+        Cria o índice com o preparaContracao se ele ainda não existir.
+        """
+        meta = {"origem": hashArquivos(listaPisos(arquivoBitmap)), "hashMapa": self.hashMapa}
+        salvaArrays(diretorio, self.preparaContracao().exportaArrays(), meta)
+
+    def carregaContracao(self, diretorio, arquivoBitmap=None):
+        """
+        Carrega um índice salvo com salvaContracao, com os arrays mapeados do disco.
+
+        Parâmetros:
+        - diretorio: O diretório onde o índice foi salvo.
+        - arquivoBitmap: O bitmap (ou diretório de pisos) de origem. Se informado, um índice salvo a partir de outro
+          conteúdo é recusado.
+
+        Um índice de outro mapa (chave de mapa diferente da do grafo atual) também é recusado.
+
+        Retorna:
+        True se o índice foi carregado; False se o diretório não existe, é de outra versão ou está desatualizado.
+        """
+        carregado = carregaArrays(diretorio, listaPisos(arquivoBitmap) if arquivoBitmap is not None else None)
+        if carregado is None:
+            return False
+        arrays, meta = carregado
+        if meta.get("hashMapa") != self.hashMapa or self.hashMapa is None:
+            print(f"Índice de contração salvo em {diretorio} é de outro mapa.")
+            return False
+        self._contracao = (self.lista, IndiceContracao(arrays))
+        return True
+
+    def grafoReverso(self, grafo=None):
+        """
+        Retorna o grafo com as arestas invertidas.
+
+        Parâmetros:
+        - grafo: O grafo a ser invertido. Se não for fornecido, será utilizado o grafo interno.
+
+        Como o peso de uma aresta vem da cor do pixel de origem, a busca que anda do destino para a origem
+        precisa das arestas que chegam em cada nó. A GradeImplicita devolve uma visão invertida sobre os mesmos
+        rótulos; o reverso do GrafoCompacto (que sabe se inverter) e o do dicionário "lista" são montados uma vez
+        e reaproveitados enquanto o grafo interno não mudar, e o alteraPixels e o alteraArestas os mantêm
+        atualizados.
+        """
+        if grafo is None:
+            grafo = self.lista
+        if isinstance(grafo, GradeImplicita):
+            return grafo.reverso()
+
+        if grafo is self.lista and self._reverso is not None and self._reverso[0] == (id(grafo), self.numNos, self.numArestas):
+            return self._reverso[1]
+
+        if hasattr(grafo, "reverso"):
+            reverso = grafo.reverso()
+        else:
+            reverso = {u: {} for u in grafo}
+            for u in grafo:
+                for v, peso in grafo[u].items():
+                    reverso.setdefault(v, {})[u] = peso
+
+        if grafo is self.lista:
+            self._reverso = ((id(grafo), self.numNos, self.numArestas), reverso)
+        return reverso
+
+    def dijkstraBidirecional(self, origens, destinos, grafo=None, reverso=None):
+        """
+        Executa o Dijkstra bidirecional entre um conjunto de origens e um conjunto de destinos.
+
+        Parâmetros:
+        - origens: Uma lista de pontos de início (por exemplo as áreas vermelhas).
+        - destinos: Uma lista de pontos de destino (por exemplo as áreas verdes).
+        - grafo: O grafo no qual a busca será executada. Se não for fornecido, será utilizado o grafo interno.
+        - reverso: O grafo com as arestas invertidas. Se não for fornecido, é obtido com grafoReverso.
+
+        Esta função cresce uma busca a partir das origens no grafo e outra a partir dos destinos no grafo reverso,
+        sempre avançando a que tem a fila menor. Cada vez que uma aresta liga as duas buscas, o custo do caminho
+        passando por ali é comparado com o melhor encontrado. A busca termina quando a soma dos menores valores
+        das duas filas não é menor que esse melhor custo, pois nenhum caminho ainda não visto pode ser mais barato.
+
+        Retorna:
+        Uma tupla (caminho, custo, destino) como a do caminhoMinimo. Se nenhum destino for alcançável,
+        retorna ([], inf, None).
+        """
+        if not self.alcancavel(origens, destinos, grafo):
+            return [], float("inf"), None
+        if grafo is None:
+            grafo = self.lista
+        if reverso is None:
+            reverso = self.grafoReverso(grafo)
+
+        distInicio, distFim = {}, {}
+        predInicio, predFim = {}, {}
+        QInicio, QFim = [], []
+        melhor, encontro = float("inf"), None
+
+        for ponto in origens:
+            if ponto in grafo and ponto not in distInicio:
+                distInicio[ponto] = 0
+                predInicio[ponto] = None
+                QInicio.append((0, ponto))
+        for ponto in destinos:
+            if ponto in grafo and ponto not in distFim:
+                distFim[ponto] = 0
+                predFim[ponto] = None
+                QFim.append((0, ponto))
+                if ponto in distInicio:
+                    melhor, encontro = 0, ponto
+
+        while QInicio and QFim and QInicio[0][0] + QFim[0][0] < melhor:
+            if len(QInicio) <= len(QFim):
+                Q, adjacencia, dist, pred, outraDist = QInicio, grafo, distInicio, predInicio, distFim
+            else:
+                Q, adjacencia, dist, pred, outraDist = QFim, reverso, distFim, predFim, distInicio
+
+            dist_u, u = heapq.heappop(Q)
+            if dist_u > dist[u]:
+                continue
+
+            for v, peso in adjacencia[u].items():
+                if dist.get(v, float("inf")) > dist_u + peso:
+                    dist[v] = dist_u + peso
+                    pred[v] = u
+                    heapq.heappush(Q, (dist[v], v))
+                    if v in outraDist and dist[v] + outraDist[v] < melhor:
+                        melhor, encontro = dist[v] + outraDist[v], v
+
+        if encontro is None:
+            return [], float("inf"), None
+
+        caminho = self.reconstruirCaminho(encontro, predInicio)
+        atual = predFim[encontro]
+        while atual is not None:
+            caminho.append(atual)
+            atual = predFim[atual]
+        return caminho, melhor, caminho[-1]
+
+    def campoDistancias(self, saidas=None):
+        """
+        Retorna o campo de distâncias de todos os pixels do mapa até a saída mais próxima (ver field.py).
+
+        Parâmetros:
+        - saidas: Os pixels de saída. Se não forem fornecidos, serão usadas as áreas vermelhas.
+
+        O campo é calculado uma vez por mapa e conjunto de saídas e reaproveitado nas chamadas seguintes, então
+        cada consulta "caminho de um pixel até a saída mais próxima" custa só o tamanho do caminho, com
+        campo.caminho(pixel) e campo.distancia(pixel). O campo é calculado a partir dos rótulos, então o grafo
+        precisa seguir o mapa (ver arestasSeguemMapa).
+        """
+        if self.rotulos is None:
+            raise ValueError("O campo de distâncias precisa do mapa: crie o grafo com criaGrafo antes.")
+        if not self.arestasSeguemMapa():
+            raise ValueError("As arestas do grafo foram alteradas e não seguem mais o mapa: use o caminhoMinimo.")
+        if saidas is None:
+            saidas = self.areasVermelhas
+
+        chave = frozenset(saidas)
+        if self._campo is None or self._campo[0] is not self.rotulos or self._campo[1] != chave:
+            self._campo = (self.rotulos, chave, CampoDistancias(self.rotulos, saidas))
+        return self._campo[2]
+
+    def planejadorIncremental(self, origens=None, destinos=None, heuristica=None):
+        """
+        Cria um planejador de caminho que é reparado, e não refeito, quando o mapa muda (ver replan.py).
+
+        Parâmetros:
+        - origens: Os pixels de início. Se não forem fornecidos, serão usadas as áreas vermelhas atuais.
+        - destinos: Os pixels onde a busca pode terminar. Se não forem fornecidos, serão usadas as áreas verdes atuais.
+        - heuristica: Como no aEstrela. Se não for fornecida, será usada a heurística de grade com o menor peso de
+          qualquer classe passável, que continua admissível depois de qualquer alteraPixels.
+
+        As mudanças devem ser feitas com alteraPixels ou alteraArestas, e a lista que eles retornam passada ao
+        planejador.atualiza antes do próximo planejador.busca().
+        """
+        origens = list(self.areasVermelhas if origens is None else origens)
+        destinos = list(self.areasVerdes if destinos is None else destinos)
+        return PlanejadorIncremental(self, origens, destinos, heuristica)
+
     def reconstruirCaminho(self, pixelFinal, pred):
         """
         Reconstrói o caminho a partir do pixel final e dos predecessores.
@@ -266,13 +1521,15 @@ class Graph:
         - pred: Um dicionário contendo os predecessores de cada nó no caminho.
 
         Retorna:
-        Uma lista contendo as coordenadas do caminho reconstruído a partir do pixel final.
+        Uma lista contendo as coordenadas do caminho reconstruído a partir do pixel final. O caminho é montado
+        do pixel final para trás e invertido no fim, em tempo linear no seu tamanho.
         """
         caminho = []
         atual = pixelFinal
 
         while atual is not None:
-            caminho.insert(0, atual)
-            atual = pred[atual]
+            caminho.append(atual)
+            atual = pred.get(atual)
 
+        caminho.reverse()
         return caminho
@@ -0,0 +1,130 @@
+import numpy as np
+from labels import PRETO, PESOS, PESO_PISO
+
+_PESOS = PESOS.tolist()
+
+
+class GradeImplicita:
+    """
+    Grafo de grade que nunca materializa a lista de adjacência.
+
+    O grafo guarda apenas o array de rótulos (ver labels.py) de um ou mais pisos, com forma
+    (pisos, altura, base). Os nós são os pixels não pretos (x, y, piso) e os vizinhos de cada nó são
+    calculados na hora a partir das coordenadas e da classe do pixel, com as mesmas regras do
+    conectaVizinhos: o peso da aresta vem da cor do pixel de origem (1, cinza claro 2, cinza escuro 4)
+    e a troca de piso, para o mesmo (x, y) no piso de cima ou de baixo, custa 5.
+
+    A classe se comporta como o dicionário "lista" (grafo[no], "no in grafo", iteração sobre os nós),
+    então dijkstra, dijkstraForMultiplasImagens e reconstruirCaminho rodam sobre ela sem alterações,
+    ocupando pouco mais que o próprio bitmap. Ela é somente leitura: grafo[no] devolve um dicionário novo a
+    cada chamada, então o Graph recusa adicionaNo e adicionaAresta sobre ela; só o alteraPixels, que muda
+    os rótulos, altera a grade.
+    """
+
+    def __init__(self, rotulos) -> None:
+        rotulos = np.asarray(rotulos, dtype=np.uint8)
+        self.rotulos = rotulos if rotulos.ndim == 3 else rotulos[np.newaxis]
+        self.pisos, self.altura, self.base = self.rotulos.shape
+
+    def passavel(self, x, y, z):
+        """
+        Retorna se o pixel (x, y, z) está dentro da grade e não é preto.
+        """
+        return 0 <= x < self.base and 0 <= y < self.altura and 0 <= z < self.pisos and self.rotulos[z, y, x] != PRETO
+
+    def vizinhos(self, no):
+        """
+        Calcula os vizinhos de um nó.
+
+        Parâmetros:
+        - no: O nó (x, y, piso).
+
+        Retorna:
+        Um dicionário {vizinho: peso} com os vizinhos passáveis, na ordem esquerda, direita, acima,
+        abaixo, piso de baixo e piso de cima.
+        """
+        x, y, z = no
+        peso = _PESOS[self.rotulos[z, y, x]]
+        vizinhos = {}
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            if self.passavel(x + dx, y + dy, z):
+                vizinhos[x + dx, y + dy, z] = peso
+        for dz in [-1, 1]:
+            if self.passavel(x, y, z + dz):
+                vizinhos[x, y, z + dz] = PESO_PISO
+        return vizinhos
+
+    def __contains__(self, no):
+        try:
+            x, y, z = no
+        except (TypeError, ValueError):
+            return False
+        return self.passavel(x, y, z)
+
+    def __getitem__(self, no):
+        if no not in self:
+            raise KeyError(no)
+        return self.vizinhos(no)
+
+    def __iter__(self):
+        for z in range(self.pisos):
+            for y in range(self.altura):
+                for x in np.flatnonzero(self.rotulos[z, y] != PRETO).tolist():
+                    yield (x, y, z)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.rotulos != PRETO))
+
+    def numArestas(self):
+        """
+        Conta as arestas do grafo sem gerá-las.
+        """
+        passaveis = self.rotulos != PRETO
+        total = 0
+        for eixo in range(3):
+            if passaveis.shape[eixo] > 1:
+                pares = np.count_nonzero(
+                    passaveis.take(range(1, passaveis.shape[eixo]), axis=eixo)
+                    & passaveis.take(range(passaveis.shape[eixo] - 1), axis=eixo)
+                )
+                total += 2 * pares
+        return int(total)
+
+    def reverso(self):
+        """
+        Retorna a visão reversa da grade, onde os vizinhos de um nó são os nós que têm arestas chegando nele.
+        A visão usa o mesmo array de rótulos, então acompanha qualquer mudança feita na grade.
+        """
+        return GradeImplicitaReversa(self.rotulos)
+
+
+class GradeImplicitaReversa(GradeImplicita):
+    """
+    Grade implícita com as arestas invertidas, usada pelas buscas que andam do destino para a origem.
+
+    Como o peso de uma aresta vem da cor do pixel de origem, a aresta reversa de v para u tem o peso
+    da classe de u (e 5 entre pisos).
+    """
+
+    def vizinhos(self, no):
+        """
+        Calcula os nós com arestas chegando em "no".
+
+        Parâmetros:
+        - no: O nó (x, y, piso).
+
+        Retorna:
+        Um dicionário {vizinho: peso da aresta vizinho -> no}, na mesma ordem da GradeImplicita.
+        """
+        x, y, z = no
+        vizinhos = {}
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            if self.passavel(x + dx, y + dy, z):
+                vizinhos[x + dx, y + dy, z] = _PESOS[self.rotulos[z, y + dy, x + dx]]
+        for dz in [-1, 1]:
+            if self.passavel(x, y, z + dz):
+                vizinhos[x, y, z + dz] = PESO_PISO
+        return vizinhos
+
+    def reverso(self):
+        return GradeImplicita(self.rotulos)
@@ -1,9 +1,19 @@
-import time
 import tkinter as tk
 from tkinter import filedialog
-from PIL import Image, ImageTk, ImageDraw
-import os
-from graph import Graph
+from PIL import Image, ImageTk
+import numpy as np
+from graph import Graph, listaPisos
+from labels import CORES, BRANCO, VERDE, VERMELHO, OUTRO
+import _comum  # noqa: F401
+from comum.cache import CacheCaminhos
+from comum.render import desenhaCelulas
+from comum.worker import Trabalhador
+
+# Classe de desenho das células do caminho que não são áreas verdes nem vermelhas.
+CAMINHO = OUTRO + 1
+
+# Cor de cada classe de desenho: as classes de pixel (ver labels.py), as sem cor própria em branco, e o caminho em azul.
+PALETA = [CORES.get(classe, CORES[BRANCO]) for classe in range(CAMINHO)] + [(0, 0, 255)]
 
 
 class InterfaceGrafica:
@@ -19,277 +29,139 @@ class InterfaceGrafica:
         )
         self.botaoCarregarImagem.pack(side=tk.LEFT, fill=tk.X)
 
+        self.labelStatus = tk.Label(self.frame, text="")
+        self.labelStatus.pack(side=tk.LEFT, padx=10)
+
         self.frameImagens = tk.Frame(root)
         self.frameImagens.pack()
 
         self.labelImagens = []
         self.grafo = None
 
-        self.grafoDef = []
+        self.cache = CacheCaminhos()
 
         self.pastaImagens = ""
 
+        # Ler os pisos, criar o grafo, buscar e desenhar rodam fora da thread do Tk (ver comum/worker.py).
+        self.trabalhador = Trabalhador(root)
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar)
+
     def carregarImagem(self):
         """
         Carrega imagens para exibição.
 
-        Esta função solicita ao usuário que selecione um diretório contendo imagens BMP.
-        Em seguida, carrega todas as imagens BMP encontradas no diretório e as exibe na interface gráfica.
+        Esta função solicita ao usuário que selecione um diretório contendo imagens BMP, uma por piso.
+        Em seguida, carrega todas as imagens BMP encontradas no diretório, na ordem dos pisos (ver listaPisos),
+        e as exibe na interface gráfica.
+
+        A leitura, o grafo, a busca e o desenho são feitos em segundo plano (ver processaPasta), com o andamento
+        mostrado ao lado do botão; escolher outra pasta antes de terminar descarta a anterior.
         """
         self.pastaImagens = filedialog.askdirectory()
         if self.pastaImagens:
-            imagens = []
-            for arquivo in os.listdir(self.pastaImagens):
-                if arquivo.lower().endswith(".bmp"):
-                    caminhoImagem = os.path.join(self.pastaImagens, arquivo)
-                    imagem = Image.open(caminhoImagem)
-                    imagens.append((imagem, caminhoImagem))
+            pastaImagens = self.pastaImagens
+            self.trabalhador.executa(
+                "pasta",
+                lambda progresso: self.processaPasta(pastaImagens, progresso),
+                self.mostrarImagens,
+                self.tarefaFalhou,
+                self.mostrarProgresso,
+            )
+
+    def processaPasta(self, pastaImagens, progresso):
+        """
+        Lê os pisos de uma pasta, cria o grafo, busca o caminho e desenha cada piso. Roda fora da thread do Tk.
 
-            self.mostrarImagens(imagens)
+        Parâmetros:
+        - pastaImagens: O diretório com uma imagem BMP por piso.
+        - progresso: Função que recebe a mensagem de andamento (ver Trabalhador.executa).
 
-    def mostrarImagens(self, imagens):
+        Retorna:
+        Uma tupla (grafo, desenhos), com o grafo criado e o array RGB de cada piso, ou None se a pasta não tem
+        imagens BMP.
+        """
+        arquivos = listaPisos(pastaImagens)
+        if not arquivos:
+            return None
+
+        progresso(f"Criando o grafo de {len(arquivos)} piso(s)...")
+        grafo = Graph()
+        grafo.criaGrafo(pastaImagens if len(arquivos) > 1 else arquivos[0])
+
+        # A busca para no primeiro pixel verde alcançado, que é o de menor custo a partir das áreas vermelhas.
+        progresso("Buscando o caminho...")
+        menorCaminho, _, _ = self.cache.consulta(grafo, "caminhoMinimo", grafo.areasVermelhas, grafo.areasVerdes)
+
+        desenhos = []
+        for idx in range(len(arquivos)):
+            progresso(f"Desenhando o piso {idx + 1} de {len(arquivos)}...")
+            classes = self.classesDesenho(grafo, idx, [pixel for pixel in menorCaminho if pixel[2] == idx])
+            alturaPiso, basePiso = classes.shape
+            tamanho = (1000, 500) if basePiso > alturaPiso else (450, 450)
+            desenhos.append(desenhaCelulas(classes, PALETA, tamanho, 19))
+        return grafo, desenhos
+
+    def mostrarImagens(self, resultado):
         """
         Mostra imagens na interface gráfica.
 
         Parâmetros:
-        - imagens: Uma lista contendo tuplas de imagens e seus caminhos.
+        - resultado: O retorno do processaPasta: o grafo com todos os pisos (ligados por arestas de peso 5, ver
+          criaGrafo) e o desenho de cada piso com a sua parte do caminho de menor custo.
 
-        Esta função limpa o frame de imagens existente e, em seguida, exibe as imagens fornecidas na interface gráfica.
+        Esta função limpa o frame de imagens existente e exibe cada piso. Roda na thread do Tk.
         """
+        if resultado is None:
+            self.mostrarProgresso("Nenhuma imagem BMP na pasta")
+            return
+
         for widget in self.frameImagens.winfo_children():
             widget.destroy()
 
-        for idx, (imagem, caminhoImagem) in enumerate(imagens):
+        self.grafo, desenhos = resultado
+        for desenho in desenhos:
             frameImagem = tk.Frame(self.frameImagens)
             frameImagem.pack(side=tk.LEFT, padx=10, pady=10)
 
-            if imagem.size[0] > imagem.size[1]:
-                imagemBranca = Image.new("RGB", (1000, 500), "white")
-            else:
-                imagemBranca = Image.new("RGB", (450, 450), "white")
-
-            draw = ImageDraw.Draw(imagemBranca)
-
-            grafo = Graph()
-            grafo.criaGrafo(caminhoImagem)
-
-            self.grafo = grafo
-
-            for pixel in grafo.lista:
-                x, y, numPisos = (
-                    pixel
-                )
-
-                if len(imagens) != 1:
-                    self.grafoDef.append(
-                        (x, y, idx)
-                    )
-
-                centroX = (x + 0.5) * 19
-                centroY = (y + 0.5) * 19
-                raio = 0.4 * 19
-                if pixel in grafo.areasVerdes:
-                    draw.ellipse(
-                        [
-                            centroX - raio,
-                            centroY - raio,
-                            centroX + raio,
-                            centroY + raio,
-                        ],
-                        outline="black",
-                        fill=(0, 255, 0),
-                    )
-                elif pixel in grafo.areasVermelhas:
-                    draw.ellipse(
-                        [
-                            centroX - raio,
-                            centroY - raio,
-                            centroX + raio,
-                            centroY + raio,
-                        ],
-                        outline="black",
-                        fill=(255, 0, 0),
-                    )
-                elif pixel in grafo.cinzasEscuros:
-                    draw.ellipse(
-                        [
-                            centroX - raio,
-                            centroY - raio,
-                            centroX + raio,
-                            centroY + raio,
-                        ],
-                        outline="black",
-                        fill="#808080",
-                    )
-                elif pixel in grafo.cinzasClaros:
-                    draw.ellipse(
-                        [
-                            centroX - raio,
-                            centroY - raio,
-                            centroX + raio,
-                            centroY + raio,
-                        ],
-                        outline="black",
-                        fill="#c4c4c4",
-                    )
-                elif pixel in grafo.pixelsPretos:
-                    draw.ellipse(
-                        [
-                            centroX - raio,
-                            centroY - raio,
-                            centroX + raio,
-                            centroY + raio,
-                        ],
-                        outline="black",
-                        fill="black",
-                    )
-                else:
-                    draw.ellipse(
-                        [
-                            centroX - raio,
-                            centroY - raio,
-                            centroX + raio,
-                            centroY + raio,
-                        ],
-                        outline="black",
-                        fill="white",
-                    )
-
-            if len(imagens) == 1:
-                menorCaminho = None
-                menorDistancia = float("inf")
-                pred = self.grafo.dijkstra(self.grafo.areasVermelhas)
-
-                for pixelFinal in self.grafo.areasVerdes:
-                    caminho = self.grafo.reconstruirCaminho(pixelFinal, pred)
-                    distancia = len(caminho)
-                    if distancia < menorDistancia:
-                        menorDistancia = distancia
-                        menorCaminho = caminho
-
-                self.desenharCaminho(imagemBranca, menorCaminho, 19)
-                imagemBrancaTk = ImageTk.PhotoImage(imagemBranca)
-                label = tk.Label(frameImagem, image=imagemBrancaTk)
-                label.imagem = imagemBrancaTk
-                label.pack()
-            else:
-                self.conectaGrafos(grafo, imagem)
-                menorCaminho = None
-                menorDistancia = float("inf")
-                pred = grafo.dijkstraForMultiplasImagens([(13, 18, 0)], grafo.lista)
-
-                for pixelFinal in grafo.areasVerdes:
-                    caminho = grafo.reconstruirCaminho(pixelFinal, pred)
-
-                    distancia = len(caminho)
-                    if distancia < menorDistancia:
-                        menorDistancia = distancia
-                        menorCaminho = caminho
-
-                # Não consegui desenhar o caminho encontrado. 
-                # Construí o grafo de cada uma das imagens subidas, juntei elas em um só grafo,
-                # ligando com arestas de peso 5 entre eles, porém ao buscar o caminho os predecessores
-                # não davam certo.
-
-                # self.desenharCaminho(imagemBranca, menorCaminho, 19)
-
-                imagemBrancaTk = ImageTk.PhotoImage(imagemBranca)
-                label = tk.Label(frameImagem, image=imagemBrancaTk)
-                label.imagem = imagemBrancaTk
-                label.pack()
-
-    def desenharCaminho(self, imagem, caminho, espacamento):
-        """
-        Desenha o caminho encontrado na imagem.
+            imagemBrancaTk = ImageTk.PhotoImage(Image.fromarray(desenho))
+            label = tk.Label(frameImagem, image=imagemBrancaTk)
+            label.imagem = imagemBrancaTk
+            label.pack()
+        self.mostrarProgresso(f"{len(desenhos)} piso(s) carregado(s)")
 
-        Parâmetros:
-        - imagem: A imagem na qual o caminho será desenhado.
-        - caminho: Uma lista de coordenadas representando o caminho a ser desenhado.
-        - espacamento: O espaçamento entre os pixels na imagem.
+    def mostrarProgresso(self, mensagem):
+        self.labelStatus.config(text=mensagem)
 
-        Esta função desenha o caminho fornecido na imagem especificada.
-        """
-        draw = ImageDraw.Draw(imagem)
-
-        for x, y, _ in caminho:
-            centroX = (x + 0.5) * espacamento
-            centroY = (y + 0.5) * espacamento
-            raio = 0.4 * espacamento
-            if (x, y, _) in self.grafo.areasVerdes:
-                draw.ellipse(
-                    [centroX - raio, centroY - raio, centroX + raio, centroY + raio],
-                    outline="black",
-                    fill=(0, 255, 0),
-                )
-            elif (x, y, _) in self.grafo.areasVermelhas:
-                draw.ellipse(
-                    [centroX - raio, centroY - raio, centroX + raio, centroY + raio],
-                    outline="black",
-                    fill=(255, 0, 0),
-                )
-            else:
-                draw.ellipse(
-                    [
-                        centroX - raio,
-                        centroY - raio,
-                        centroX + raio,
-                        centroY + raio,
-                    ],
-                    outline="black",
-                    fill=(0, 0, 255),
-                )
-
-    def conectaGrafos(self, grafo, imagem):
+    def tarefaFalhou(self, erro):
+        self.mostrarProgresso(f"Erro: {erro}")
+
+    def fechar(self):
+        self.trabalhador.fecha()
+        self.root.destroy()
+
+    def classesDesenho(self, grafo, piso, caminho):
         """
-        Conecta grafos de imagens diferentes.
+        Monta as classes de cor das células de um piso, com o caminho por cima.
 
         Parâmetros:
-        - grafo: O grafo a ser conectado com outros grafos.
-        - imagem: A imagem utilizada para determinar a conectividade dos pixels.
+        - grafo: O grafo com os rótulos dos pisos.
+        - piso: O número do piso.
+        - caminho: Uma lista de coordenadas (x, y, piso) do caminho a ser desenhado nesse piso.
 
-        Esta função conecta o grafo da imagem com outros grafos, considerando os pixels não pretos.
+        Retorna:
+        Um array (altura, base) com o índice de cada célula na PALETA: a classe do pixel (ver labels.py), ou
+        CAMINHO nas células do caminho que não são áreas verdes nem vermelhas (essas mantêm a sua cor).
         """
-        for pixel in self.grafoDef:
-            x, y, idx = pixel
-            cor = imagem.getpixel((x, y))
-
-            if cor != (0, 0, 0):
-                grafo.adicionaNo(pixel)
-
-                for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-                    novoX, novoY, novoIdx = x + dx, y + dy, idx
-                    novoPixel = (novoX, novoY, novoIdx)
-
-                    if novoPixel in self.grafoDef and imagem.getpixel(
-                        (novoX, novoY)
-                    ) != (0, 0, 0):
-                        if cor == (128, 128, 128):
-                            grafo.adicionaAresta(
-                                pixel, novoPixel, 4
-                            )
-                        elif cor == (196, 196, 196):
-                            grafo.adicionaAresta(
-                                pixel, novoPixel, 2
-                            )
-                        elif cor == (255, 0, 0):
-                            self.grafo.areasVermelhas.append(pixel)
-                        elif cor == (0, 255, 0):
-                            self.grafo.pixelFinal = pixel
-                            self.grafo.areasVerdes.append(pixel)
-                        else:
-                            grafo.adicionaAresta(
-                                pixel, novoPixel, 1
-                            )
-                for novoIdx in [idx - 1, idx + 1]:
-                    novoPixel = (x, y, novoIdx)
-                    if novoPixel in self.grafoDef and imagem.getpixel((x, y)) != (
-                        0,
-                        0,
-                        0,
-                    ):
-                        grafo.adicionaAresta(pixel, novoPixel, 5)
-
-
-root = tk.Tk()
-interface = InterfaceGrafica(root)
-root.mainloop()
+        classes = grafo.rotulos[piso].copy()
+        if caminho:
+            colunas, linhas, _ = np.array(caminho).T
+            noCaminho = classes[linhas, colunas]
+            trocar = (noCaminho != VERDE) & (noCaminho != VERMELHO)
+            classes[linhas[trocar], colunas[trocar]] = CAMINHO
+        return classes
+
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    interface = InterfaceGrafica(root)
+    root.mainloop()
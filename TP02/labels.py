@@ -0,0 +1,140 @@
+import numpy as np
+
+# Classes (rótulos) de cada pixel do mapa. Um rótulo ocupa um byte por pixel.
+BRANCO = 0
+PRETO = 1
+VERMELHO = 2
+VERDE = 3
+CINZA_ESCURO = 4
+CINZA_CLARO = 5
+OUTRO = 6
+
+CORES = {
+    BRANCO: (255, 255, 255),
+    PRETO: (0, 0, 0),
+    VERMELHO: (255, 0, 0),
+    VERDE: (0, 255, 0),
+    CINZA_ESCURO: (128, 128, 128),
+    CINZA_CLARO: (196, 196, 196),
+}
+
+# Peso das arestas que saem de um pixel de cada classe (o pixel preto não tem arestas de saída).
+PESOS = np.array([1, 0, 1, 1, 4, 2, 1], dtype=np.int64)
+
+# Peso de uma aresta entre dois pisos diferentes.
+PESO_PISO = 5
+
+
+def classificaPixels(pixels):
+    """
+    Classifica todos os pixels de uma imagem de uma só vez.
+
+    Parâmetros:
+    - pixels: Array (altura, base, 3) com as cores RGB da imagem.
+
+    Retorna:
+    Um array (altura, base) de uint8 com o rótulo de cada pixel. Cores que não pertencem a nenhuma
+    classe conhecida recebem o rótulo OUTRO, e são tratadas como passáveis com peso 1.
+    """
+    rotulos = np.full(pixels.shape[:2], OUTRO, dtype=np.uint8)
+    for rotulo, cor in CORES.items():
+        rotulos[np.all(pixels == cor, axis=-1)] = rotulo
+    return rotulos
+
+
+def leRotulos(imagem):
+    """
+    Lê uma imagem PIL para um array e devolve os rótulos de seus pixels.
+
+    Parâmetros:
+    - imagem: Imagem PIL já aberta.
+
+    Esta função decodifica o bitmap uma única vez; todo o resto da construção do grafo trabalha
+    sobre o array de rótulos retornado.
+    """
+    return classificaPixels(np.asarray(imagem.convert("RGB")))
+
+
+class ListaPixels(list):
+    """
+    Lista de pixels com teste de pertinência ("pixel in lista") em O(1).
+
+    É usada nas listas públicas de cada cor do grafo (areasVerdes, pixelsPretos, ...), que continuam sendo
+    listas comuns, com a mesma ordem e as mesmas repetições de antes. Junto com a lista fica uma contagem de
+    cada pixel, atualizada por todas as operações que alteram a lista, e o "in" consulta só a contagem.
+    """
+
+    def __init__(self, pixels=()) -> None:
+        super().__init__(pixels)
+        self._contagem = {}
+        self._conta(self, 1)
+
+    def _conta(self, pixels, sinal):
+        contagem = self._contagem
+        for pixel in pixels:
+            total = contagem.get(pixel, 0) + sinal
+            if total > 0:
+                contagem[pixel] = total
+            else:
+                contagem.pop(pixel, None)
+
+    def __contains__(self, pixel):
+        try:
+            return pixel in self._contagem
+        except TypeError:
+            return super().__contains__(pixel)
+
+    def count(self, pixel):
+        try:
+            return self._contagem.get(pixel, 0)
+        except TypeError:
+            return super().count(pixel)
+
+    def append(self, pixel):
+        super().append(pixel)
+        self._conta([pixel], 1)
+
+    def extend(self, pixels):
+        pixels = list(pixels)
+        super().extend(pixels)
+        self._conta(pixels, 1)
+
+    def __iadd__(self, pixels):
+        self.extend(pixels)
+        return self
+
+    def __imul__(self, vezes):
+        super().__imul__(vezes)
+        self._contagem.clear()
+        self._conta(self, 1)
+        return self
+
+    def insert(self, posicao, pixel):
+        super().insert(posicao, pixel)
+        self._conta([pixel], 1)
+
+    def remove(self, pixel):
+        super().remove(pixel)
+        self._conta([pixel], -1)
+
+    def pop(self, posicao=-1):
+        pixel = super().pop(posicao)
+        self._conta([pixel], -1)
+        return pixel
+
+    def clear(self):
+        super().clear()
+        self._contagem.clear()
+
+    def __setitem__(self, posicao, pixels):
+        antigos = self[posicao] if isinstance(posicao, slice) else [self[posicao]]
+        if isinstance(posicao, slice):
+            pixels = list(pixels)
+        super().__setitem__(posicao, pixels)
+        self._conta(antigos, -1)
+        self._conta(pixels if isinstance(posicao, slice) else [pixels], 1)
+
+    def __delitem__(self, posicao):
+        antigos = self[posicao] if isinstance(posicao, slice) else [self[posicao]]
+        super().__delitem__(posicao)
+        self._conta(antigos, -1)
@@ -0,0 +1,162 @@
+import multiprocessing
+import numpy as np
+from field import distanciasGrade
+from labels import PRETO
+
+# Rótulos do mapa em cada processo do cálculo paralelo das distâncias dos marcos.
+_rotulosTrabalhador = None
+
+
+def _iniciaTrabalhador(rotulos):
+    global _rotulosTrabalhador
+    _rotulosTrabalhador = rotulos
+
+
+def _distanciasMarco(tarefa):
+    marco, ateMarco = tarefa
+    return distanciasGrade(_rotulosTrabalhador, [marco], ateMarco)[0]
+
+
+class Marcos:
+    """
+    Pré-processamento de marcos (landmarks) para a heurística ALT do A*: para muitas consultas com origens e
+    destinos diferentes no mesmo mapa, a estimativa pela desigualdade triangular é muito mais justa que a
+    distância de Manhattan, e o A* expande só uma faixa estreita em volta do caminho.
+
+    Para cada marco M são guardados o custo de todo pixel até M e o de M até todo pixel, calculados com as
+    regras do grafo (ver distanciasGrade). Como d(v, M) <= d(v, t) + d(t, M) e d(M, t) <= d(M, v) + d(v, t),
+    o custo de v até um destino t é pelo menos d(v, M) - d(t, M) e d(M, t) - d(M, v); o maior desses limites
+    entre os marcos é uma heurística admissível e consistente.
+
+    Os marcos são escolhidos pelo ponto mais distante: cada novo marco é o pixel mais longe dos já escolhidos,
+    então eles ficam espalhados pelas bordas e cantos do mapa, onde os limites são melhores. A escolha é
+    sequencial, mas as distâncias até os marcos (e, quando os marcos são informados, as distâncias desde eles)
+    são calculadas em paralelo, um marco por tarefa.
+
+    As distâncias ficam em dois arrays (pixels, marcos) de uint16, ou uint32 se algum custo não couber, com o
+    maior valor do tipo nos pixels sem caminho.
+    """
+
+    def __init__(self, rotulos, numMarcos=8, marcos=None, processos=1) -> None:
+        rotulos = np.asarray(rotulos, dtype=np.uint8)
+        self.rotulos = rotulos if rotulos.ndim == 3 else rotulos[np.newaxis]
+        self.forma = self.rotulos.shape
+
+        if marcos is None:
+            self.marcos, desde = self._escolheMarcos(numMarcos)
+            tarefas = [(marco, True) for marco in self.marcos]
+        else:
+            self.marcos = [tuple(marco) for marco in marcos if self._dentro(marco) and self.rotulos[marco[2], marco[1], marco[0]] != PRETO]
+            desde = None
+            tarefas = [(marco, True) for marco in self.marcos] + [(marco, False) for marco in self.marcos]
+
+        campos = self._executa(tarefas, processos)
+        ate = campos[:len(self.marcos)]
+        if desde is None:
+            desde = campos[len(self.marcos):]
+
+        maior = max([int(campo.max()) for campo in ate + desde], default=0)
+        tipo = np.uint16 if maior < np.iinfo(np.uint16).max else np.uint32
+        self.semCaminho = int(np.iinfo(tipo).max)
+        self.ate = self._compacta(ate, tipo)
+        self.desde = self._compacta(desde, tipo)
+
+    def _dentro(self, pixel):
+        x, y, z = pixel
+        pisos, altura, base = self.forma
+        return 0 <= x < base and 0 <= y < altura and 0 <= z < pisos
+
+    def _id(self, pixel):
+        x, y, z = pixel
+        pisos, altura, base = self.forma
+        return (z * altura + y) * base + x
+
+    def _pixel(self, id):
+        pisos, altura, base = self.forma
+        z, resto = divmod(id, base * altura)
+        y, x = divmod(resto, base)
+        return x, y, z
+
+    def _escolheMarcos(self, numMarcos):
+        """
+        Escolhe os marcos pelo ponto mais distante, a partir do pixel passável mais longe do primeiro do mapa.
+
+        Retorna:
+        Os marcos e, para cada um, o array plano dos custos desde ele, que a escolha já precisou calcular.
+        """
+        passaveis = np.flatnonzero(self.rotulos != PRETO)
+        if len(passaveis) == 0 or numMarcos <= 0:
+            return [], []
+
+        distancias, _ = distanciasGrade(self.rotulos, [self._pixel(int(passaveis[0]))], ateOrigens=False)
+        marcos, desde = [], []
+        menores = np.where(distancias >= 0, np.iinfo(np.int64).max, -1)
+        proximo = int(np.argmax(distancias))
+        while len(marcos) < numMarcos:
+            marco = self._pixel(proximo)
+            distancias, _ = distanciasGrade(self.rotulos, [marco], ateOrigens=False)
+            marcos.append(marco)
+            desde.append(distancias)
+            # Pixels que este marco não alcança continuam com a menor distância dos outros marcos.
+            alcancados = distancias >= 0
+            menores[alcancados] = np.minimum(menores[alcancados], distancias[alcancados])
+            proximo = int(np.argmax(menores))
+            if menores[proximo] <= 0:
+                break  # Todos os pixels alcançáveis já são marcos
+        return marcos, desde
+
+    def _executa(self, tarefas, processos):
+        """
+        Calcula o campo de distâncias de cada tarefa (marco, ateMarco), em paralelo se processos for diferente de 1.
+        """
+        if processos == 1 or len(tarefas) <= 1:
+            _iniciaTrabalhador(self.rotulos)
+            return [_distanciasMarco(tarefa) for tarefa in tarefas]
+        with multiprocessing.Pool(processos, _iniciaTrabalhador, (self.rotulos,)) as conjunto:
+            return conjunto.map(_distanciasMarco, tarefas)
+
+    def _compacta(self, campos, tipo):
+        compacto = np.empty((self.rotulos.size, len(campos)), dtype=tipo)
+        for i, campo in enumerate(campos):
+            compacto[:, i] = np.where(campo >= 0, campo, self.semCaminho)
+        return compacto
+
+    def heuristica(self, destinos, outra=None):
+        """
+        Cria a heurística ALT do A* para um conjunto de destinos.
+
+        Parâmetros:
+        - destinos: Os pixels (x, y, piso) de destino da busca.
+        - outra: Outra heurística admissível (por exemplo a de Graph.heuristicaGrade); vale a maior das duas.
+
+        Com vários destinos, cada marco usa o maior custo de um destino até ele e o menor custo dele até um
+        destino, então o limite continua valendo para o destino mais próximo. Marcos em outra região do mapa
+        (sem caminho até os destinos) não são usados.
+
+        Retorna:
+        Uma função que recebe um nó e retorna a estimativa do custo restante até o destino mais próximo.
+        """
+        ids = [self._id(destino) for destino in destinos if self._dentro(destino)]
+        termos = []
+        if ids:
+            ateDestinos = self.ate[ids].astype(np.int64)
+            desdeDestinos = self.desde[ids].astype(np.int64)
+            for i in range(len(self.marcos)):
+                alcancados = ateDestinos[:, i] != self.semCaminho
+                if alcancados.any():
+                    termos.append((i, int(ateDestinos[alcancados, i].max()), int(desdeDestinos[alcancados, i].min())))
+
+        ate, desde, semCaminho = self.ate, self.desde, self.semCaminho
+
+        def estimativa(no):
+            melhor = outra(no) if outra is not None else 0
+            if not self._dentro(no):
+                return melhor
+            id = self._id(no)
+            linhaAte, linhaDesde = ate[id].tolist(), desde[id].tolist()
+            for i, maiorAte, menorDesde in termos:
+                if linhaAte[i] != semCaminho:
+                    melhor = max(melhor, linhaAte[i] - maiorAte, menorDesde - linhaDesde[i])
+            return melhor
+
+        return estimativa
@@ -0,0 +1,170 @@
+import heapq
+import itertools
+import numpy as np
+from labels import PRETO, PESOS
+
+# Nó artificial ligado com peso 0 a todos os destinos: a busca termina quando ele fica consistente.
+_FIM = "fim"
+
+# Menor peso de aresta de qualquer classe passável: com ele a heurística de grade continua admissível
+# depois de qualquer mudança de pixels.
+_PESO_MINIMO_CLASSES = int(np.delete(PESOS, PRETO).min())
+
+
+class PlanejadorIncremental:
+    """
+    Busca de menor custo que é reparada, e não refeita, quando pixels ou arestas do grafo mudam (Lifelong
+    Planning A*, ou LPA*).
+
+    Para cada nó visto o planejador guarda g, o custo da melhor rota conhecida desde as origens, e rhs, o
+    custo calculado a partir dos predecessores (rhs(v) = menor g(u) + peso(u, v)). Um nó com g diferente de
+    rhs está inconsistente e fica em uma fila de prioridade ordenada como a do A*. A primeira busca é um A*
+    comum. Depois de uma mudança no grafo (ver Graph.alteraPixels e Graph.alteraArestas), o atualiza
+    recalcula o rhs só dos nós de chegada das arestas alteradas, e a busca seguinte expande apenas os nós
+    cuja distância realmente mudou e que podem afetar o caminho até os destinos, e não o mapa inteiro.
+
+    As origens e os destinos são fixos. Todos os destinos são ligados com peso 0 a um nó artificial, então,
+    como no caminhoMinimo, a busca acha o destino mais barato. O D* Lite é o mesmo algoritmo com a busca
+    invertida, para quando a origem anda; aqui as origens (as áreas vermelhas) não mudam e o LPA* basta.
+
+        planejador = grafo.planejadorIncremental()
+        caminho, custo, destino, expandidos = planejador.busca()
+        planejador.atualiza(grafo.alteraPixels({porta: PRETO}))
+        caminho, custo, destino, expandidos = planejador.busca()  # expande só a região afetada
+    """
+
+    def __init__(self, grafo, origens, destinos, heuristica=None) -> None:
+        self.grafo = grafo
+        self.origens = {ponto for ponto in origens if ponto in grafo.lista}
+        self.destinos = set(destinos)
+        # A heurística de grade só vale enquanto as arestas seguem o mapa (ver atualiza).
+        self._heuristicaGrade = heuristica is None
+        if heuristica is None:
+            heuristica = grafo.heuristicaGrade(self.destinos, pesoMinimo=_PESO_MINIMO_CLASSES)
+        self.heuristica = heuristica
+        self.g = {}
+        self.rhs = {ponto: 0 for ponto in self.origens}
+        # Chave atual de cada nó na fila; entradas da fila com outra chave são antigas e descartadas.
+        self.chaves = {}
+        self.fila = []
+        self._contador = itertools.count()
+        self._reverso = None
+        for ponto in self.origens:
+            self._atualizaFila(ponto)
+
+    def _chave(self, no):
+        menor = min(self.g.get(no, float("inf")), self.rhs.get(no, float("inf")))
+        return (menor + (0 if no == _FIM else self.heuristica(no)), menor)
+
+    def _atualizaFila(self, no):
+        """
+        Coloca o nó na fila com a sua chave atual se ele estiver inconsistente, ou o tira da fila se não estiver.
+        """
+        if self.g.get(no, float("inf")) != self.rhs.get(no, float("inf")):
+            chave = self._chave(no)
+            if self.chaves.get(no) != chave:
+                self.chaves[no] = chave
+                heapq.heappush(self.fila, (chave, next(self._contador), no))
+        else:
+            self.chaves.pop(no, None)
+
+    def _sucessores(self, no):
+        if no == _FIM:
+            return []
+        lista = self.grafo.lista
+        sucessores = list(lista[no].items()) if no in lista else []
+        if no in self.destinos:
+            sucessores.append((_FIM, 0))
+        return sucessores
+
+    def _predecessores(self, no):
+        if no == _FIM:
+            return [(destino, 0) for destino in self.destinos]
+        if self._reverso is None:
+            self._reverso = self.grafo.grafoReverso()
+        return self._reverso[no].items() if no in self._reverso else []
+
+    def _recalcula(self, no):
+        """
+        Recalcula o rhs do nó a partir dos predecessores e atualiza a sua posição na fila.
+        """
+        if no not in self.origens:
+            rhs = min((self.g.get(u, float("inf")) + peso for u, peso in self._predecessores(no)), default=float("inf"))
+            if rhs == float("inf"):
+                self.rhs.pop(no, None)
+            else:
+                self.rhs[no] = rhs
+        self._atualizaFila(no)
+
+    def atualiza(self, alteracoes):
+        """
+        Informa ao planejador as arestas alteradas no grafo.
+
+        Parâmetros:
+        - alteracoes: A lista retornada pelo alteraPixels ou pelo alteraArestas, com tuplas (u, v, peso).
+
+        Só o rhs do nó de chegada de cada aresta é recalculado, em tempo proporcional ao número de alterações;
+        a próxima busca propaga a mudança até onde ela importa. Se as arestas deixaram de seguir o mapa (ver
+        Graph.arestasSeguemMapa), a heurística de grade padrão pode superestimar o custo: ela é trocada por 0 e
+        as chaves da fila são recalculadas.
+        """
+        self._reverso = None
+        if self._heuristicaGrade and not self.grafo.arestasSeguemMapa():
+            self._heuristicaGrade = False
+            self.heuristica = lambda no: 0
+            inconsistentes = list(self.chaves)
+            self.chaves, self.fila = {}, []
+            for no in inconsistentes:
+                self._atualizaFila(no)
+        for no in {v for _, v, _ in alteracoes}:
+            self._recalcula(no)
+
+    def busca(self):
+        """
+        Executa, ou repara depois de mudanças, a busca até o custo do destino mais barato ficar definido.
+
+        Retorna:
+        Uma tupla (caminho, custo, destino, expandidos) como a do aEstrela, em que expandidos conta só os nós
+        expandidos nesta chamada. Se nenhum destino for alcançável, retorna ([], inf, None, expandidos).
+        """
+        self._reverso = None
+        expandidos = 0
+        while self.fila:
+            chave, _, u = self.fila[0]
+            if self.chaves.get(u) != chave:
+                heapq.heappop(self.fila)  # Entrada antiga: u mudou de chave ou ficou consistente
+                continue
+            # Um nó com a mesma chave do fim ainda pode ser um destino desatualizado, então só uma chave maior encerra.
+            if chave > self._chave(_FIM) and self.g.get(_FIM, float("inf")) == self.rhs.get(_FIM, float("inf")):
+                break
+
+            heapq.heappop(self.fila)
+            del self.chaves[u]
+            expandidos += 1
+            gU, rhsU = self.g.get(u, float("inf")), self.rhs.get(u, float("inf"))
+            if gU > rhsU:
+                # u melhorou: o novo custo só pode baixar o rhs dos sucessores.
+                self.g[u] = rhsU
+                for v, peso in self._sucessores(u):
+                    if v not in self.origens and rhsU + peso < self.rhs.get(v, float("inf")):
+                        self.rhs[v] = rhsU + peso
+                        self._atualizaFila(v)
+            else:
+                # u piorou: os sucessores que dependiam dele (e o próprio u) são recalculados.
+                del self.g[u]
+                for v, peso in self._sucessores(u):
+                    if self.rhs.get(v) == gU + peso:
+                        self._recalcula(v)
+                self._recalcula(u)
+
+        custo = self.g.get(_FIM, float("inf"))
+        if custo == float("inf"):
+            return [], float("inf"), None, expandidos
+
+        destino = min(self.destinos, key=lambda ponto: self.g.get(ponto, float("inf")))
+        caminho = [destino]
+        while caminho[-1] not in self.origens:
+            anterior, _ = min(self._predecessores(caminho[-1]), key=lambda par: self.g.get(par[0], float("inf")) + par[1])
+            caminho.append(anterior)
+        caminho.reverse()
+        return caminho, custo, destino, expandidos
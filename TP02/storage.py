@@ -0,0 +1,61 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+
+def compartilhaArrays(arrays):
+    """
+    Copia os arrays de um grafo para blocos de memória compartilhada, que outros processos abrem sem cópia.
+
+    Parâmetros:
+    - arrays: Dicionário {nome: array} com os arrays do grafo.
+
+    Os blocos continuam existindo enquanto não forem liberados: quem chamou deve chamar liberaArrays quando
+    nenhum processo precisar mais deles.
+
+    Retorna:
+    Uma tupla (blocos, descricao) com a lista de blocos criados e o dicionário {nome: (bloco, forma, tipo)}
+    que abreArraysCompartilhados usa em outro processo.
+    """
+    blocos = []
+    descricao = {}
+    try:
+        for nome, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            bloco = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocos.append(bloco)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=bloco.buf)[...] = array
+            descricao[nome] = (bloco.name, array.shape, array.dtype.str)
+    except BaseException:
+        liberaArrays(blocos)
+        raise
+    return blocos, descricao
+
+
+def abreArraysCompartilhados(descricao):
+    """
+    Abre os arrays criados por compartilhaArrays, sem copiar os dados.
+
+    Parâmetros:
+    - descricao: O dicionário {nome: (bloco, forma, tipo)} retornado por compartilhaArrays.
+
+    Os blocos abertos precisam continuar referenciados enquanto os arrays forem usados.
+
+    Retorna:
+    Uma tupla (arrays, blocos) com o dicionário {nome: array} e a lista de blocos abertos.
+    """
+    arrays = {}
+    blocos = []
+    for nome, (nomeBloco, forma, tipo) in descricao.items():
+        bloco = shared_memory.SharedMemory(name=nomeBloco)
+        blocos.append(bloco)
+        arrays[nome] = np.ndarray(forma, dtype=np.dtype(tipo), buffer=bloco.buf)
+    return arrays, blocos
+
+
+def liberaArrays(blocos):
+    """
+    Fecha e apaga os blocos de memória compartilhada criados por compartilhaArrays.
+    """
+    for bloco in blocos:
+        bloco.close()
+        bloco.unlink()
@@ -0,0 +1,302 @@
+import hashlib
+import os
+import struct
+import numpy as np
+from graph import Graph, listaPisos, _visitasEmOrdem
+from labels import PRETO, VERMELHO, VERDE, CINZA_ESCURO, CINZA_CLARO, PESOS, PESO_PISO, classificaPixels
+import _comum  # noqa: F401
+from comum.storage import hashArquivos, preparaDiretorio, escreveMeta, criaArrayEmDisco
+
+# Memória de trabalho padrão do salvaGrafoEmFaixas, em bytes.
+_MEMORIA = 256 << 20
+
+# Estimativa dos bytes usados por pixel de uma faixa (cores, rótulos, visitas, máscaras das arestas).
+_BYTES_POR_PIXEL = 160
+
+# Direções das arestas de cada nó, na ordem do conectaVizinhos: esquerda, direita, acima, abaixo, piso de baixo
+# e piso de cima, como (dx, dy, dz).
+_DIRECOES = [(-1, 0, 0), (1, 0, 0), (0, -1, 0), (0, 1, 0), (0, 0, -1), (0, 0, 1)]
+
+
+class BitmapMapeado:
+    """
+    Bitmap (.bmp) sem compressão lido direto do arquivo mapeado na memória, uma faixa de linhas por vez.
+
+    Só o cabeçalho e a paleta são lidos na abertura; faixa() converte para RGB apenas as linhas pedidas, então
+    a imagem decodificada nunca fica inteira na memória. São aceitas imagens de 1, 4 e 8 bits com paleta e de
+    24 e 32 bits (BGR e BGRX), gravadas de baixo para cima ou de cima para baixo.
+    """
+
+    def __init__(self, caminho) -> None:
+        with open(caminho, "rb") as arquivo:
+            cabecalho = arquivo.read(66)
+            if len(cabecalho) < 54 or cabecalho[:2] != b"BM":
+                raise ValueError(f"{caminho} não é um arquivo BMP.")
+            deslocamento, = struct.unpack_from("<I", cabecalho, 10)
+            tamanhoCabecalho, base, altura, _, bits, compressao = struct.unpack_from("<IiiHHI", cabecalho, 14)
+            coresUsadas, = struct.unpack_from("<I", cabecalho, 46)
+            if tamanhoCabecalho < 40 or base <= 0 or altura == 0:
+                raise ValueError(f"Cabeçalho de {caminho} não suportado.")
+            mascaras = struct.unpack_from("<III", cabecalho, 54) if len(cabecalho) >= 66 else None
+            if not (compressao == 0 or (compressao == 3 and bits == 32 and mascaras == (0xFF0000, 0xFF00, 0xFF))):
+                raise ValueError(f"{caminho} usa compressão {compressao}, que não pode ser lida por faixas.")
+            if bits not in (1, 4, 8, 24, 32):
+                raise ValueError(f"{caminho} tem {bits} bits por pixel, que não são suportados.")
+
+            self.paleta = None
+            if bits <= 8:
+                numCores = min(coresUsadas or 1 << bits, 1 << bits)
+                arquivo.seek(14 + tamanhoCabecalho)
+                paleta = np.frombuffer(arquivo.read(4 * numCores), dtype=np.uint8).reshape(-1, 4)
+                # Índices sem cor na paleta ficam pretos.
+                self.paleta = np.zeros((1 << bits, 3), dtype=np.uint8)
+                self.paleta[:len(paleta)] = paleta[:, 2::-1]
+
+        self.base, self.altura = base, abs(altura)
+        self.bits = bits
+        self.deCimaParaBaixo = altura < 0
+        bytesPorLinha = (base * bits + 31) // 32 * 4
+        self.dados = np.memmap(caminho, dtype=np.uint8, mode="r", offset=deslocamento, shape=(self.altura, bytesPorLinha))
+
+    def faixa(self, inicio, fim):
+        """
+        Retorna as cores das linhas [inicio, fim) da imagem (contadas de cima para baixo) em um array
+        (fim - inicio, base, 3) de uint8 RGB.
+        """
+        if self.deCimaParaBaixo:
+            linhas = self.dados[inicio:fim]
+        else:
+            linhas = self.dados[self.altura - fim:self.altura - inicio][::-1]
+        base = self.base
+        if self.bits == 24:
+            return linhas[:, :3 * base].reshape(len(linhas), base, 3)[..., ::-1]
+        if self.bits == 32:
+            return linhas[:, :4 * base].reshape(len(linhas), base, 4)[..., 2::-1]
+        if self.bits == 8:
+            indices = linhas[:, :base]
+        elif self.bits == 4:
+            indices = np.stack([linhas >> 4, linhas & 0x0F], axis=-1).reshape(len(linhas), -1)[:, :base]
+        else:
+            indices = np.unpackbits(linhas, axis=1)[:, :base]
+        return self.paleta[indices]
+
+
+class _ListaEmFaixas:
+    """
+    Lista de pixels de uma cor (areasVerdes, pixelsPretos, ...) montada faixa a faixa, na ordem do criaGrafo.
+
+    As visitas feitas pelos pixels de uma faixa vêm todas depois das feitas pelas faixas anteriores (ver
+    _visitasEmOrdem), então os pixels de cada faixa vão direto, em ordem, para um arquivo temporário, que no
+    fim é copiado para o .npy da lista.
+    """
+
+    def __init__(self, diretorio, nome) -> None:
+        self.diretorio, self.nome = diretorio, nome
+        self.caminho = os.path.join(diretorio, nome + ".parcial")
+        self.arquivo = open(self.caminho, "wb")
+        self.tamanho = 0
+        self.ultimo = None
+
+    def adiciona(self, pixels):
+        """
+        Escreve no fim da lista os pixels (coluna, linha, piso) de uma faixa, já em ordem.
+        """
+        if len(pixels) > 0:
+            pixels.tofile(self.arquivo)
+            self.ultimo = tuple(pixels[-1].tolist())
+            self.tamanho += len(pixels)
+
+    def salva(self, tamanhoBloco):
+        """
+        Copia o arquivo temporário para o .npy da lista, tamanhoBloco pixels por vez, e o apaga.
+        """
+        self.arquivo.close()
+        array = criaArrayEmDisco(self.diretorio, self.nome, (self.tamanho, 3), np.int64)
+        if self.tamanho > 0:
+            parcial = np.memmap(self.caminho, dtype=np.int64, mode="r", shape=(self.tamanho, 3))
+            for inicio in range(0, self.tamanho, tamanhoBloco):
+                array[inicio:inicio + tamanhoBloco] = parcial[inicio:inicio + tamanhoBloco]
+            array.flush()
+            del parcial
+        os.remove(self.caminho)
+
+
+def _arestasFaixa(rotulos, inicio, fim):
+    """
+    Calcula quais arestas saem de cada pixel das linhas [inicio, fim) de todos os pisos.
+
+    Parâmetros:
+    - rotulos: O array (pisos, altura, base) de rótulos (mapeado do disco).
+    - inicio, fim: As linhas da faixa.
+
+    Retorna:
+    Uma tupla (existe, classes) com o array (6, pisos, fim - inicio, base) de bool que diz se a aresta de cada
+    direção de _DIRECOES existe e os rótulos da faixa. Como no conectaVizinhos, a origem precisa ser passável;
+    no mesmo piso o destino pode ser preto, e entre pisos os dois pixels precisam ser passáveis.
+    """
+    pisos, altura, base = rotulos.shape
+    classes = np.asarray(rotulos[:, inicio:fim])
+    passaveis = classes != PRETO
+    existe = np.zeros((6,) + classes.shape, dtype=bool)
+    existe[0, :, :, 1:] = passaveis[:, :, 1:]
+    existe[1, :, :, :-1] = passaveis[:, :, :-1]
+    existe[2] = passaveis
+    if inicio == 0:
+        existe[2, :, 0] = False
+    existe[3] = passaveis
+    if fim == altura:
+        existe[3, :, -1] = False
+    existe[4, 1:] = passaveis[1:] & passaveis[:-1]
+    existe[5, :-1] = passaveis[:-1] & passaveis[1:]
+    return existe, classes
+
+
+def salvaGrafoEmFaixas(arquivoBitmap, diretorio, implicito=False, memoria=_MEMORIA):
+    """
+    Cria o grafo de um mapa e o salva em disco lendo o bitmap por faixas de linhas, para mapas maiores que a memória.
+
+    Parâmetros:
+    - arquivoBitmap: O bitmap (ou diretório de pisos, ver listaPisos) do mapa. Os arquivos são lidos com o
+      BitmapMapeado, então precisam ser BMP sem compressão.
+    - diretorio: O diretório onde o grafo será salvo, no formato do Graph.salvaGrafo.
+    - implicito: Se True, salva só os rótulos e as listas de cores, como o grafo de Graph(implicito=True).
+    - memoria: Quantos bytes de trabalho as faixas podem ocupar, o que define quantas linhas cada uma tem.
+
+    O resultado é o mesmo do Graph(compacto=True).criaGrafo seguido do salvaGrafo (exceto o índice de
+    componentes, que o carregaGrafo refaz quando a primeira consulta precisa dele), mas nenhum array do tamanho
+    do mapa fica na memória: os pixels de cada faixa são classificados e escritos direto nos arquivos .npy
+    mapeados, em três passadas. A primeira grava os rótulos e as listas de cores de cada piso; a segunda conta
+    as arestas de cada nó e preenche "inicio", "ids" e "indice"; a terceira escreve os destinos e os pesos das
+    arestas nas posições de cada nó. Depois o grafo é aberto com Graph().carregaGrafo(diretorio, arquivoBitmap).
+
+    Um mapa de um só pixel por piso é criado em memória, pelo criaGrafo, porque seus nós seguem outra ordem.
+
+    Retorna:
+    True se o grafo foi salvo; False se os arquivos não puderam ser lidos (o motivo é impresso).
+    """
+    arquivos = listaPisos(arquivoBitmap)
+    try:
+        bitmaps = [BitmapMapeado(arquivo) for arquivo in arquivos]
+    except (OSError, ValueError) as e:
+        print("Erro ao abrir as imagens:", e)
+        return False
+    if len(bitmaps) == 0:
+        print("Nenhum arquivo .bmp em", arquivoBitmap)
+        return False
+    base, altura = bitmaps[0].base, bitmaps[0].altura
+    if any((bitmap.base, bitmap.altura) != (base, altura) for bitmap in bitmaps):
+        raise ValueError(f"Os pisos de {arquivoBitmap} não têm todos o mesmo tamanho.")
+
+    pisos = len(bitmaps)
+    numPixels = pisos * altura * base
+    if base * altura == 1:
+        grafo = Graph(compacto=not implicito, implicito=implicito)
+        grafo.criaGrafo(arquivoBitmap)
+        grafo.salvaGrafo(diretorio, arquivoBitmap)
+        return True
+    if not implicito and numPixels >= 1 << 31:
+        raise ValueError(f"O mapa tem {numPixels} pixels, mais do que o grafo compacto indexa; use implicito=True.")
+
+    linhasPorFaixa = max(1, memoria // (_BYTES_POR_PIXEL * pisos * base))
+    faixas = [(inicio, min(inicio + linhasPorFaixa, altura)) for inicio in range(0, altura, linhasPorFaixa)]
+    preparaDiretorio(diretorio)
+    nomes = ["rotulos", "areasVerdes", "areasVermelhas", "cinzasClaros", "cinzasEscuros", "pixelsPretos"]
+
+    # Primeira passada: rótulos, hash do mapa e listas de cores, piso a piso.
+    rotulos = criaArrayEmDisco(diretorio, "rotulos", (pisos, altura, base), np.uint8)
+    resumo = hashlib.sha1(repr(rotulos.shape).encode())
+    contagem = np.zeros(len(PESOS), dtype=np.int64)
+    listas = {rotulo: _ListaEmFaixas(diretorio, nome) for rotulo, nome in [
+        (VERMELHO, "areasVermelhas"), (VERDE, "areasVerdes"), (CINZA_ESCURO, "cinzasEscuros"),
+        (CINZA_CLARO, "cinzasClaros"), (PRETO, "pixelsPretos"),
+    ]}
+    for piso, bitmap in enumerate(bitmaps):
+        anterior = np.zeros((0, base), dtype=np.uint8)
+        for inicio, fim in faixas:
+            classes = classificaPixels(bitmap.faixa(inicio, fim))
+            rotulos[piso, inicio:fim] = classes
+            resumo.update(classes.tobytes())
+            contagem += np.bincount(classes.ravel(), minlength=len(PESOS))
+
+            # Mesma ordem do criaGrafo: os pixels desta faixa visitam também a última linha da anterior.
+            janela = np.concatenate([anterior, classes])
+            for rotulo, lista in listas.items():
+                linhas, colunas = _visitasEmOrdem(janela == rotulo, inicio, rotulo != PRETO)
+                lista.adiciona(np.stack([colunas, linhas, np.full_like(linhas, piso)], axis=1))
+            anterior = classes[-1:]
+    rotulos.flush()
+
+    tamanhoBloco = max(1, memoria // 64)
+    for lista in listas.values():
+        lista.salva(tamanhoBloco)
+    presentes = np.flatnonzero(contagem)
+    presentes = presentes[presentes != PRETO]
+
+    # Segunda passada: número de arestas de cada nó (todo pixel é nó, na ordem piso, linha, coluna).
+    if implicito:
+        # Na grade implícita só os pixels passáveis são nós, e cada par de vizinhos passáveis é ligado nos dois
+        # sentidos. O par de linhas vizinhas é contado na faixa da linha de cima.
+        numNos, numArestas = int(contagem.sum() - contagem[PRETO]), 0
+        for inicio, fim in faixas:
+            passaveis = np.asarray(rotulos[:, inicio:min(fim + 1, altura)]) != PRETO
+            faixa = passaveis[:, :fim - inicio]
+            pares = np.count_nonzero(faixa[:, :, 1:] & faixa[:, :, :-1]) + np.count_nonzero(passaveis[:, 1:] & passaveis[:, :-1])
+            pares += np.count_nonzero(faixa[1:] & faixa[:-1])
+            numArestas += 2 * int(pares)
+    else:
+        numNos = numPixels
+        inicioArestas = criaArrayEmDisco(diretorio, "inicio", (numNos + 1,), np.int64)
+        ids = criaArrayEmDisco(diretorio, "ids", (numNos,), np.int64)
+        indice = criaArrayEmDisco(diretorio, "indice", (numNos,), np.int32)
+        graus = inicioArestas[1:].reshape(pisos, altura, base)
+        pisosFaixa = np.arange(pisos).reshape(-1, 1, 1)
+        colunasFaixa = np.arange(base).reshape(1, 1, -1)
+        for inicio, fim in faixas:
+            existe, _ = _arestasFaixa(rotulos, inicio, fim)
+            graus[:, inicio:fim] = existe.sum(axis=0)
+            linhasFaixa = np.arange(inicio, fim).reshape(1, -1, 1)
+            ids.reshape(pisos, altura, base)[:, inicio:fim] = (colunasFaixa * altura + linhasFaixa) * pisos + pisosFaixa
+            indice.reshape(base, altura, pisos)[:, inicio:fim] = ((pisosFaixa * altura + linhasFaixa) * base + colunasFaixa).T
+
+        inicioArestas[0] = 0
+        total = 0
+        for a in range(1, numNos + 1, tamanhoBloco):
+            bloco = np.cumsum(inicioArestas[a:a + tamanhoBloco]) + total
+            inicioArestas[a:a + tamanhoBloco] = bloco
+            total = int(bloco[-1])
+        numArestas = total
+
+        # Terceira passada: destinos e pesos, a partir da posição da primeira aresta de cada nó.
+        destinos = criaArrayEmDisco(diretorio, "destinos", (numArestas,), np.int32)
+        pesos = criaArrayEmDisco(diretorio, "pesos", (numArestas,), np.uint8)
+        passos = [dx + dy * base + dz * altura * base for dx, dy, dz in _DIRECOES]
+        for inicio, fim in faixas:
+            existe, classes = _arestasFaixa(rotulos, inicio, fim)
+            for piso in range(pisos):
+                primeiro = (piso * altura + inicio) * base
+                nos = np.arange(primeiro, primeiro + (fim - inicio) * base)
+                posicoes = np.array(inicioArestas[primeiro:primeiro + len(nos)])
+                pesosPiso = PESOS[classes[piso].ravel()].astype(np.uint8)
+                for direcao, passo in enumerate(passos):
+                    saem = existe[direcao, piso].ravel()
+                    destinos[posicoes[saem]] = nos[saem] + passo
+                    pesos[posicoes[saem]] = PESO_PISO if direcao >= 4 else pesosPiso[saem]
+                    posicoes += saem
+        for array in [inicioArestas, ids, indice, destinos, pesos]:
+            if isinstance(array, np.memmap):
+                array.flush()
+        nomes += ["indice", "ids", "inicio", "destinos", "pesos"]
+
+    verde = listas[VERDE].ultimo
+    meta = {
+        "implicito": implicito,
+        "dimensoes": [base, altura, pisos],
+        "pixelFinal": list(verde) if verde else None,
+        "pesoMinimo": int(PESOS[presentes].min()) if len(presentes) > 0 else 1,
+        "numNos": numNos,
+        "numArestas": numArestas,
+        "hashMapa": resumo.hexdigest(),
+        "origem": hashArquivos(arquivos),
+    }
+    escreveMeta(diretorio, nomes, meta)
+    return True
@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+# Os testes importam os módulos do TP02 como os scripts dele: a partir do próprio diretório do trabalho.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mapas import gravaMapa  # noqa: E402
+
+
+@pytest.fixture
+def criaMapa(tmp_path):
+    """
+    Retorna uma função que grava um mapa aleatório em tmp_path (ver mapas.gravaMapa) e devolve o caminho dele.
+    """
+    return lambda semente, **opcoes: gravaMapa(tmp_path, semente, **opcoes)
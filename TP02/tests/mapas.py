@@ -0,0 +1,66 @@
+import numpy as np
+from PIL import Image
+from graph import Graph
+from labels import BRANCO, PRETO, VERMELHO, VERDE, CINZA_ESCURO, CINZA_CLARO, CORES
+
+# Classes sorteadas nos mapas aleatórios e a probabilidade de cada uma.
+_CLASSES = [BRANCO, PRETO, CINZA_ESCURO, CINZA_CLARO]
+_PROBABILIDADES = [0.6, 0.22, 0.09, 0.09]
+
+
+def rotulosAleatorios(semente, pisos=1, altura=12, base=16):
+    """
+    Sorteia o array de rótulos (pisos, altura, base) de um mapa com duas áreas vermelhas e duas verdes: uma de
+    cada nos cantos opostos e as outras em pixels sorteados.
+    """
+    gerador = np.random.default_rng(semente)
+    rotulos = gerador.choice(_CLASSES, size=(pisos, altura, base), p=_PROBABILIDADES).astype(np.uint8)
+    rotulos[0, 0, 0] = VERMELHO
+    rotulos[-1, -1, -1] = VERDE
+    for rotulo in [VERMELHO, VERDE]:
+        rotulos[tuple(gerador.integers(0, rotulos.shape))] = rotulo
+    return rotulos
+
+
+def gravaRotulos(pasta, rotulos):
+    """
+    Grava um array de rótulos (pisos, altura, base) na pasta, um .bmp por piso com as cores de labels.py.
+
+    Retorna:
+    O caminho do .bmp, com um piso, ou da pasta, com mais de um, como o criaGrafo recebe.
+    """
+    paleta = np.zeros((max(CORES) + 1, 3), dtype=np.uint8)
+    for rotulo, cor in CORES.items():
+        paleta[rotulo] = cor
+    pasta.mkdir()
+    for piso, rotulosPiso in enumerate(rotulos):
+        Image.fromarray(paleta[rotulosPiso]).save(pasta / f"piso_{piso}.bmp")
+    return str(pasta) if len(rotulos) > 1 else str(pasta / "piso_0.bmp")
+
+
+def gravaMapa(diretorio, semente, pisos=1, altura=12, base=16):
+    """
+    Grava no diretório um mapa aleatório (ver rotulosAleatorios) e retorna o caminho dele (ver gravaRotulos).
+    """
+    return gravaRotulos(diretorio / f"mapa_{semente}_{pisos}_{altura}x{base}", rotulosAleatorios(semente, pisos, altura, base))
+
+
+def grafoDoMapa(caminho, **opcoes):
+    """
+    Cria o Graph do mapa com as opções do construtor (compacto, implicito).
+    """
+    grafo = Graph(**opcoes)
+    grafo.criaGrafo(caminho)
+    return grafo
+
+
+def custoDoCaminho(grafo, caminho, origens, destinos):
+    """
+    Confere que o caminho sai de uma origem, chega a um destino e só usa arestas do grafo, e retorna o custo dele.
+    """
+    assert caminho[0] in set(origens) and caminho[-1] in set(destinos)
+    custo = 0
+    for u, v in zip(caminho, caminho[1:]):
+        assert v in grafo.lista[u], (u, v)
+        custo += grafo.lista[u][v]
+    return custo
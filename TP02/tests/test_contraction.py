@@ -0,0 +1,43 @@
+import pytest
+from mapas import grafoDoMapa, custoDoCaminho
+
+SEMENTES = range(6)
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+@pytest.mark.parametrize("pisos", [1, 2])
+def test_buscaContracaoIgualAoCaminhoMinimo(criaMapa, semente, pisos):
+    grafo = grafoDoMapa(criaMapa(semente, pisos=pisos, altura=14, base=18), compacto=True)
+    destinos = grafo.areasVerdes
+    for origem in grafo.areasVermelhas:
+        caminho, custo, _ = grafo.buscaContracao([origem], destinos)
+        assert custo == grafo.caminhoMinimo([origem], destinos)[1]
+        if caminho:
+            assert custoDoCaminho(grafo, caminho, [origem], destinos) == custo
+
+
+def test_contracaoSalvaIgualAPreparada(criaMapa, tmp_path):
+    caminhoMapa = criaMapa(1, pisos=2)
+    grafo = grafoDoMapa(caminhoMapa, compacto=True)
+    grafo.preparaContracao()
+    grafo.salvaContracao(tmp_path / "contracao", caminhoMapa)
+
+    carregado = grafoDoMapa(caminhoMapa, compacto=True)
+    assert carregado.carregaContracao(tmp_path / "contracao", caminhoMapa)
+    origens, destinos = grafo.areasVermelhas, grafo.areasVerdes
+    assert carregado.buscaContracao(origens, destinos)[1] == grafo.caminhoMinimo(origens, destinos)[1]
+
+
+@pytest.mark.parametrize("opcoes", [{}, {"compacto": True}])
+def test_indicesPreparadosVeemArestasAdicionadas(criaMapa, opcoes):
+    grafo = grafoDoMapa(criaMapa(2), **opcoes)
+    origem, destino = grafo.areasVermelhas[0], grafo.areasVerdes[-1]
+    grafo.preparaContracao()
+    grafo.preparaMarcos(numMarcos=2)
+    grafo.buscaSaltos([origem], [destino])
+
+    grafo.adicionaAresta(origem, destino, 1)
+    assert grafo.caminhoMinimo([origem], [destino])[1] == 1
+    assert grafo.buscaContracao([origem], [destino])[1] == 1
+    assert grafo.buscaMarcos([origem], [destino])[1] == 1
+    assert grafo.buscaSaltos([origem], [destino])[1] == 1
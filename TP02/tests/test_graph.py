@@ -0,0 +1,94 @@
+import math
+import pytest
+from labels import PRETO, VERMELHO, VERDE, CINZA_ESCURO, CINZA_CLARO
+from mapas import grafoDoMapa, gravaRotulos, custoDoCaminho, rotulosAleatorios
+
+SEMENTES = range(8)
+
+
+def _varreduraOriginal(rotulos):
+    """
+    Refaz, pixel a pixel, a varredura original do criaGrafo: cada pixel visita os vizinhos acima, abaixo, à
+    esquerda e à direita; a primeira visita cria o nó, e as seguintes registram a classe do pixel visitado (uma
+    vez por cor, e a cada visita nos pretos).
+    """
+    nos = set()
+    listas = {VERMELHO: [], VERDE: [], CINZA_ESCURO: [], CINZA_CLARO: [], PRETO: []}
+    for piso, rotulosPiso in enumerate(rotulos.tolist()):
+        altura, base = len(rotulosPiso), len(rotulosPiso[0])
+        for linha in range(altura):
+            for coluna in range(base):
+                for dl, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                    l, c = linha + dl, coluna + dc
+                    if not (0 <= l < altura and 0 <= c < base):
+                        continue
+                    pixel, rotulo = (c, l, piso), rotulosPiso[l][c]
+                    if pixel not in nos:
+                        nos.add(pixel)
+                    elif rotulo == PRETO or (rotulo in listas and pixel not in listas[rotulo]):
+                        listas[rotulo].append(pixel)
+    return nos, listas
+
+
+@pytest.mark.parametrize("semente", range(4))
+@pytest.mark.parametrize("forma", [(1, 1, 1), (1, 1, 7), (1, 6, 1), (1, 2, 2), (1, 9, 13), (2, 7, 5)])
+def test_criaGrafoIgualAVarreduraOriginal(tmp_path, semente, forma):
+    rotulos = rotulosAleatorios(semente, *forma)
+    grafo = grafoDoMapa(gravaRotulos(tmp_path / "mapa", rotulos), compacto=True)
+    nos, listas = _varreduraOriginal(rotulos)
+    assert set(grafo.lista) == nos
+    assert grafo.areasVermelhas == listas[VERMELHO] and grafo.areasVerdes == listas[VERDE]
+    assert grafo.cinzasEscuros == listas[CINZA_ESCURO] and grafo.cinzasClaros == listas[CINZA_CLARO]
+    assert grafo.pixelsPretos == listas[PRETO]
+
+
+def _custosDosPredecessores(grafo, pred):
+    """
+    Retorna o custo de cada nó alcançado, somando os pesos das arestas dos predecessores desde a origem.
+    """
+    custos = {}
+    for no in pred:
+        pilha = []
+        while no not in custos and pred[no] is not None:
+            pilha.append(no)
+            no = pred[no]
+        custos.setdefault(no, 0)
+        for v in reversed(pilha):
+            custos[v] = custos[pred[v]] + grafo.lista[pred[v]][v]
+    return custos
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+@pytest.mark.parametrize("pisos", [1, 2])
+def test_dijkstraBaldesIgualAoHeap(criaMapa, semente, pisos):
+    grafo = grafoDoMapa(criaMapa(semente, pisos=pisos), compacto=True)
+    heap = _custosDosPredecessores(grafo, grafo.dijkstra(grafo.areasVermelhas))
+    baldes = _custosDosPredecessores(grafo, grafo.dijkstra(grafo.areasVermelhas, fila="baldes"))
+    assert baldes == heap
+
+    _, custo, _ = grafo.caminhoMinimo(grafo.areasVermelhas, grafo.areasVerdes)
+    assert min((heap[no] for no in grafo.areasVerdes if no in heap), default=math.inf) == custo
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+@pytest.mark.parametrize("opcoes", [{"compacto": True}, {"implicito": True}])
+def test_buscaSaltosIgualAoCaminhoMinimo(criaMapa, semente, opcoes):
+    grafo = grafoDoMapa(criaMapa(semente, altura=20, base=24), **opcoes)
+    origens, destinos = grafo.areasVermelhas, grafo.areasVerdes
+    _, custo, _ = grafo.caminhoMinimo(origens, destinos)
+    caminho, custoSaltos, _, _ = grafo.buscaSaltos(origens, destinos)
+    assert custoSaltos == custo
+    if caminho:
+        assert custoDoCaminho(grafo, caminho, origens, destinos) == custo
+
+
+def test_gradeImplicitaRecusaAlteracoes(criaMapa):
+    grafo = grafoDoMapa(criaMapa(0), implicito=True)
+    u, v = grafo.areasVermelhas[0], grafo.areasVerdes[0]
+    numNos, numArestas = grafo.numNos, grafo.numArestas
+    with pytest.raises(ValueError):
+        grafo.adicionaAresta(u, v, 1)
+    with pytest.raises(ValueError):
+        grafo.adicionaNo((0, 0, 5))
+    assert (grafo.numNos, grafo.numArestas) == (numNos, numArestas)
+    assert v not in grafo.lista[u]
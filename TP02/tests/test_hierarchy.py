@@ -0,0 +1,48 @@
+import math
+import os
+import numpy as np
+import pytest
+from labels import BRANCO, PRETO
+from mapas import grafoDoMapa, custoDoCaminho
+
+SEMENTES = range(8)
+
+
+def _confereHierarquica(grafo, tamanho):
+    origens, destinos = grafo.areasVermelhas, grafo.areasVerdes
+    _, otimo, _ = grafo.caminhoMinimo(origens, destinos)
+    caminho, custo, _, _ = grafo.buscaHierarquica(origens, destinos, tamanho=tamanho)
+    assert math.isinf(custo) == math.isinf(otimo)
+    if caminho:
+        assert custoDoCaminho(grafo, caminho, origens, destinos) == custo
+        assert custo >= otimo
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+@pytest.mark.parametrize("tamanho", [4, 7])
+def test_buscaHierarquicaValidaENaoMenorQueOtimo(criaMapa, semente, tamanho):
+    grafo = grafoDoMapa(criaMapa(semente, pisos=2, altura=20, base=24), compacto=True)
+    _confereHierarquica(grafo, tamanho)
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_buscaHierarquicaDepoisDoAlteraPixels(criaMapa, semente):
+    grafo = grafoDoMapa(criaMapa(semente, altura=20, base=24), compacto=True)
+    grafo.hierarquia(tamanho=5)
+    gerador = np.random.default_rng(semente)
+    protegidos = set(grafo.areasVermelhas) | set(grafo.areasVerdes)
+    for _ in range(3):
+        mudancas = {}
+        for x, y in zip(gerador.integers(24, size=20).tolist(), gerador.integers(20, size=20).tolist()):
+            if (x, y, 0) not in protegidos:
+                mudancas[x, y, 0] = int(gerador.choice([BRANCO, PRETO]))
+        grafo.alteraPixels(mudancas)
+        _confereHierarquica(grafo, 5)
+
+
+@pytest.mark.parametrize("tamanho", [8, 16, 32])
+def test_buscaHierarquicaOtimaNoToyFloors(tamanho):
+    # O custo não tem limite garantido (ver Hierarquia); com os tamanhos usados na prática o toyFloors sai ótimo.
+    grafo = grafoDoMapa(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "toyFloors"))
+    _, custo, _, _ = grafo.buscaHierarquica(grafo.areasVermelhas, grafo.areasVerdes, tamanho=tamanho)
+    assert custo == grafo.caminhoMinimo(grafo.areasVermelhas, grafo.areasVerdes)[1] == 34
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from labels import PRETO, CINZA_ESCURO
+from landmarks import Marcos
+from mapas import grafoDoMapa, custoDoCaminho
+
+SEMENTES = range(6)
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+@pytest.mark.parametrize("numMarcos", [1, 4])
+def test_buscaMarcosIgualAoCaminhoMinimo(criaMapa, semente, numMarcos):
+    grafo = grafoDoMapa(criaMapa(semente, pisos=2, altura=16, base=20), compacto=True)
+    grafo.preparaMarcos(numMarcos=numMarcos)
+    origens, destinos = grafo.areasVermelhas, grafo.areasVerdes
+    _, custo, _ = grafo.caminhoMinimo(origens, destinos)
+    for origem in origens:
+        caminho, custoMarcos, _, _ = grafo.buscaMarcos([origem], destinos)
+        assert custoMarcos == grafo.caminhoMinimo([origem], destinos)[1]
+        if caminho:
+            assert custoDoCaminho(grafo, caminho, [origem], destinos) == custoMarcos
+    assert grafo.buscaMarcos(origens, destinos)[1] == custo
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_buscaMarcosDepoisDoAlteraPixels(criaMapa, semente):
+    grafo = grafoDoMapa(criaMapa(semente, altura=16, base=20), implicito=True)
+    grafo.preparaMarcos(numMarcos=3)
+    gerador = np.random.default_rng(semente)
+    protegidos = set(grafo.areasVermelhas) | set(grafo.areasVerdes)
+    for _ in range(3):
+        pixels = zip(gerador.integers(20, size=15).tolist(), gerador.integers(16, size=15).tolist())
+        grafo.alteraPixels({(x, y, 0): int(gerador.choice([PRETO, CINZA_ESCURO])) for x, y in pixels if (x, y, 0) not in protegidos})
+        origens, destinos = grafo.areasVermelhas, grafo.areasVerdes
+        assert grafo.buscaMarcos(origens, destinos)[1] == grafo.caminhoMinimo(origens, destinos)[1]
+
+
+def test_marcosEmProcessosIgualAoSequencial(criaMapa):
+    grafo = grafoDoMapa(criaMapa(0, pisos=2), compacto=True)
+    sequencial = Marcos(grafo.rotulos, 3, None, 1)
+    paralelo = Marcos(grafo.rotulos, 3, None, 2)
+    assert sequencial.marcos == paralelo.marcos
+    assert np.array_equal(sequencial.ate, paralelo.ate) and np.array_equal(sequencial.desde, paralelo.desde)
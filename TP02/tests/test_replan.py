@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from labels import BRANCO, PRETO, CINZA_ESCURO, CINZA_CLARO
+from mapas import grafoDoMapa, gravaRotulos, custoDoCaminho
+
+SEMENTES = range(6)
+
+
+def _mudancasAleatorias(grafo, gerador, quantidade):
+    """
+    Sorteia novas classes (branco, preto ou cinza) para alguns pixels que não são vermelhos nem verdes.
+    """
+    pisos, altura, base = grafo.rotulos.shape
+    protegidos = set(grafo.areasVermelhas) | set(grafo.areasVerdes)
+    mudancas = {}
+    while len(mudancas) < quantidade:
+        pixel = (int(gerador.integers(base)), int(gerador.integers(altura)), int(gerador.integers(pisos)))
+        if pixel not in protegidos:
+            mudancas[pixel] = int(gerador.choice([BRANCO, PRETO, CINZA_ESCURO, CINZA_CLARO]))
+    return mudancas
+
+
+def _arestas(grafo):
+    return {no: dict(grafo.lista[no]) for no in grafo.lista}
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+@pytest.mark.parametrize("pisos", [1, 2])
+def test_alteraPixelsIgualAoGrafoRefeito(criaMapa, tmp_path, semente, pisos):
+    grafo = grafoDoMapa(criaMapa(semente, pisos=pisos), compacto=True)
+    gerador = np.random.default_rng(semente)
+    for rodada in range(3):
+        grafo.alteraPixels(_mudancasAleatorias(grafo, gerador, 10))
+        refeito = grafoDoMapa(gravaRotulos(tmp_path / f"refeito_{rodada}", grafo.rotulos), compacto=True)
+        assert _arestas(grafo) == _arestas(refeito)
+        assert grafo.numArestas == refeito.numArestas
+        assert set(grafo.pixelsPretos) == set(refeito.pixelsPretos)
+        origens, destinos = grafo.areasVermelhas, grafo.areasVerdes
+        assert grafo.caminhoMinimo(origens, destinos)[1] == refeito.caminhoMinimo(origens, destinos)[1]
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+@pytest.mark.parametrize("opcoes", [{"compacto": True}, {"implicito": True}])
+def test_planejadorIncrementalIgualAoCaminhoMinimo(criaMapa, semente, opcoes):
+    grafo = grafoDoMapa(criaMapa(semente, pisos=2), **opcoes)
+    planejador = grafo.planejadorIncremental()
+    gerador = np.random.default_rng(semente)
+    for _ in range(4):
+        caminho, custo, _, _ = planejador.busca()
+        assert custo == grafo.caminhoMinimo(grafo.areasVermelhas, grafo.areasVerdes)[1]
+        if caminho:
+            assert custoDoCaminho(grafo, caminho, grafo.areasVermelhas, grafo.areasVerdes) == custo
+        planejador.atualiza(grafo.alteraPixels(_mudancasAleatorias(grafo, gerador, 15)))
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_alteraArestasMantemAsBuscasOtimas(criaMapa, semente):
+    grafo = grafoDoMapa(criaMapa(semente, altura=16, base=20), compacto=True)
+    origens, destinos = grafo.areasVermelhas, grafo.areasVerdes
+    planejador = grafo.planejadorIncremental()
+    planejador.busca()
+    grafo.preparaMarcos(numMarcos=2)
+    grafo.preparaContracao()
+
+    # Arestas novas entre pixels distantes, pesos menores que o de qualquer classe e arestas removidas.
+    gerador = np.random.default_rng(semente)
+    nos = [no for no in grafo.lista if grafo.classePixel(no) != PRETO]
+    alteracoes = []
+    for _ in range(12):
+        u, v = (nos[i] for i in gerador.choice(len(nos), 2, replace=False))
+        alteracoes.append((u, v, [0.5, 1, 3, None][int(gerador.integers(4))]))
+    for u in nos[:20]:
+        alteracoes.extend((u, v, None) for v in list(grafo.lista[u])[:1])
+    planejador.atualiza(grafo.alteraArestas(alteracoes))
+
+    assert not grafo.arestasSeguemMapa()
+    _, custo, _ = grafo.caminhoMinimo(origens, destinos)
+    for busca in [grafo.aEstrela, grafo.dijkstraBidirecional, grafo.buscaSaltos, grafo.buscaHierarquica,
+                  grafo.buscaMarcos, grafo.buscaContracao]:
+        caminho, custoBusca, *_ = busca(origens, destinos)
+        assert custoBusca == custo, busca.__name__
+        if caminho:
+            assert custoDoCaminho(grafo, caminho, origens, destinos) == custo
+    assert planejador.busca()[1] == custo
+    with pytest.raises(ValueError):
+        grafo.campoDistancias(destinos)
+    with pytest.raises(ValueError):
+        grafo.preparaMarcos()
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from graph import Graph, listaPisos
+import _comum  # noqa: F401
+from comum.storage import carregaArrays
+from streaming import salvaGrafoEmFaixas
+from mapas import grafoDoMapa
+
+SEMENTES = range(4)
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+@pytest.mark.parametrize("pisos", [1, 3])
+@pytest.mark.parametrize("implicito", [False, True])
+@pytest.mark.parametrize("memoria", [1, 1 << 20])
+def test_salvaGrafoEmFaixasIgualAoCriaGrafo(criaMapa, tmp_path, semente, pisos, implicito, memoria):
+    caminhoMapa = criaMapa(semente, pisos=pisos, altura=13, base=11)
+    grafo = grafoDoMapa(caminhoMapa, compacto=not implicito, implicito=implicito)
+    arrays, meta = grafo.exportaArrays()
+
+    assert salvaGrafoEmFaixas(caminhoMapa, tmp_path / "faixas", implicito=implicito, memoria=memoria)
+    salvos, metaSalvo = carregaArrays(tmp_path / "faixas", listaPisos(caminhoMapa))
+    # O índice de componentes é montado na primeira consulta do grafo carregado.
+    nomes = {nome for nome in arrays if not nome.startswith("componentes")}
+    assert set(salvos) == nomes
+    for nome in nomes:
+        assert salvos[nome].dtype == arrays[nome].dtype and np.array_equal(salvos[nome], arrays[nome]), nome
+    assert {chave: metaSalvo[chave] for chave in meta} == meta
+
+    carregado = Graph()
+    assert carregado.carregaGrafo(tmp_path / "faixas", caminhoMapa)
+    origens, destinos = grafo.areasVermelhas, grafo.areasVerdes
+    assert carregado.caminhoMinimo(origens, destinos)[1] == grafo.caminhoMinimo(origens, destinos)[1]
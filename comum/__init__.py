@@ -0,0 +1,7 @@
+"""
+Código compartilhado pelo TP01 e pelo TP02: os módulos daqui são usados pelos dois trabalhos, e cada TP guarda
+só o que é dele (por exemplo o GrafoCompacto do TP02, que também altera arestas depois de montado).
+
+Os trabalhos rodam como scripts dos seus próprios diretórios, então cada um tem um _comum.py que coloca o
+diretório do repositório no sys.path antes de importar deste pacote.
+"""
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+
+
+class CacheCaminhos:
+    """
+    Cache LRU (menos usado recentemente) para os resultados das buscas de caminho.
+
+    Cada entrada é identificada pelo hash do conteúdo do mapa e pelas regras de peso do grafo (ver
+    chaveMapa no grafo), pelo nome da busca e pelos argumentos dela. Listas e conjuntos de pixels
+    (origens, destinos) entram na chave como conjuntos, então a ordem em que foram passados não importa.
+    Quando o cache passa da capacidade, a entrada usada há mais tempo é descartada.
+
+    Os contadores "acertos" e "faltas" mostram quantas consultas foram respondidas pelo cache e quantas
+    precisaram executar a busca. O resultado guardado é devolvido sem cópia, então não deve ser alterado.
+    """
+
+    def __init__(self, capacidade=128) -> None:
+        self.capacidade = capacidade
+        self.entradas = OrderedDict()
+        self.acertos = 0
+        self.faltas = 0
+
+    def chave(self, chaveMapa, busca, argumentos):
+        """
+        Monta a chave de uma consulta a partir da chave do mapa, do nome da busca e dos argumentos.
+        """
+        return (chaveMapa, busca, tuple(
+            frozenset(argumento) if isinstance(argumento, (list, set, frozenset)) else argumento for argumento in argumentos
+        ))
+
+    def consulta(self, grafo, busca, *argumentos):
+        """
+        Executa grafo.<busca>(*argumentos), ou devolve o resultado guardado de uma chamada igual.
+
+        Parâmetros:
+        - grafo: O grafo da consulta. Se ele não tiver chave de mapa (foi alterado depois do criaGrafo),
+          a busca é executada sem passar pelo cache.
+        - busca: O nome do método de busca do grafo (por exemplo "caminhoMinimo").
+        - argumentos: Os argumentos da busca.
+        """
+        chaveMapa = grafo.chaveMapa()
+        if chaveMapa is None:
+            self.faltas += 1
+            return getattr(grafo, busca)(*argumentos)
+
+        chave = self.chave(chaveMapa, busca, argumentos)
+        if chave in self.entradas:
+            self.acertos += 1
+            self.entradas.move_to_end(chave)
+            return self.entradas[chave]
+
+        self.faltas += 1
+        resultado = getattr(grafo, busca)(*argumentos)
+        self.entradas[chave] = resultado
+        if len(self.entradas) > self.capacidade:
+            self.entradas.popitem(last=False)
+        return resultado
+
+    def limpa(self):
+        """
+        Remove todas as entradas e zera os contadores.
+        """
+        self.entradas.clear()
+        self.acertos = 0
+        self.faltas = 0
+
+    def __len__(self):
+        return len(self.entradas)
@@ -0,0 +1,152 @@
+import numpy as np
+
+
+class Componentes:
+    """
+    Índice de componentes conexas (union-find) usado para descartar em O(1) as consultas sem caminho.
+
+    Cada nó aponta para um pai, e os nós de uma mesma componente chegam à mesma raiz seguindo os pais.
+    Os nós de uma grade (tuplas de coordenadas dentro de "forma") usam o id do pixel como posição no
+    array de pais, como no GrafoCompacto; qualquer outro nó recebe uma posição nova no fim do array.
+
+    Só as arestas entre dois nós que têm arestas de saída unem componentes. Um nó sem saída (o pixel
+    preto do TP02, por exemplo) pode ser o fim de um caminho, mas nunca um ponto de passagem, então
+    ele não junta as regiões em volta dele. Assim, mesmo num grafo dirigido, não existe caminho entre
+    nós com saída de componentes diferentes, e um nó sem saída só é alcançável a partir da componente
+    de algum nó que tem aresta chegando nele.
+    """
+
+    def __init__(self, forma=(), pai=None, presentes=None) -> None:
+        self.forma = tuple(int(tamanho) for tamanho in forma)
+        self.passos = tuple(int(np.prod(self.forma[i + 1:], dtype=np.int64)) for i in range(len(self.forma)))
+        tamanho = int(np.prod(self.forma, dtype=np.int64)) if self.forma else 0
+        # Os arrays de pais e de presença podem vir prontos (por exemplo de um grafo salvo, ver storage.py).
+        self.pai = np.arange(tamanho, dtype=np.int64) if pai is None else pai
+        self.presentes = np.zeros(tamanho, dtype=bool) if presentes is None else presentes
+        self.extras = {}
+        self._usados = len(self.pai)
+        # Com o array de pais em memória compartilhada entre processos (GrafoCompartilhado do TP02), as
+        # consultas só leem os pais (ver _raiz).
+        self.somenteLeitura = False
+
+    def codifica(self, no):
+        """
+        Converte uma tupla de coordenadas no id do pixel na grade, ou -1 se ela estiver fora da grade.
+        """
+        try:
+            if not self.forma or len(no) != len(self.forma):
+                return -1
+        except TypeError:
+            return -1
+        id = 0
+        for coordenada, tamanho, passo in zip(no, self.forma, self.passos):
+            if not 0 <= coordenada < tamanho:
+                return -1
+            id += coordenada * passo
+        return id
+
+    def _posicao(self, no):
+        """
+        Retorna a posição do nó no array de pais, ou -1 se ele não está no índice.
+        """
+        id = self.codifica(no)
+        if id >= 0:
+            return id if self.presentes[id] else -1
+        return self.extras.get(no, -1)
+
+    def adiciona(self, no):
+        """
+        Adiciona o nó ao índice como uma componente sozinha. Se o nó já existir, nada é feito.
+        """
+        id = self.codifica(no)
+        if id >= 0:
+            self.presentes[id] = True
+            return
+        if no in self.extras:
+            return
+        if self._usados == len(self.pai):
+            novos = max(len(self.pai), 16)
+            self.pai = np.concatenate([self.pai, np.arange(len(self.pai), len(self.pai) + novos, dtype=np.int64)])
+            self.presentes = np.concatenate([self.presentes, np.zeros(novos, dtype=bool)])
+        self.extras[no] = self._usados
+        self.presentes[self._usados] = True
+        self._usados += 1
+
+    def adicionaIds(self, ids):
+        """
+        Adiciona de uma só vez os nós da grade com os ids informados (array de inteiros).
+        """
+        self.presentes[np.asarray(ids, dtype=np.int64)] = True
+
+    def _raiz(self, posicao):
+        pai = self.pai
+        if self.somenteLeitura:
+            while pai[posicao] != posicao:
+                posicao = pai[posicao]
+            return int(posicao)
+        while pai[posicao] != posicao:
+            pai[posicao] = pai[pai[posicao]]  # Encurta o caminho pela metade a cada consulta
+            posicao = pai[posicao]
+        return int(posicao)
+
+    def raiz(self, no):
+        """
+        Retorna a raiz da componente do nó, ou None se o nó não está no índice.
+        """
+        posicao = self._posicao(no)
+        return self._raiz(posicao) if posicao >= 0 else None
+
+    def une(self, u, v):
+        """
+        Junta as componentes dos nós u e v, adicionando os nós que ainda não existem.
+        """
+        self.adiciona(u)
+        self.adiciona(v)
+        raizU, raizV = self._raiz(self._posicao(u)), self._raiz(self._posicao(v))
+        if raizU != raizV:
+            self.pai[max(raizU, raizV)] = min(raizU, raizV)
+
+    def uneIds(self, origens, destinos):
+        """
+        Junta de uma só vez as componentes de cada par de ids (arrays de inteiros) da grade.
+
+        A cada rodada todos os pais são levados direto até a raiz (saltando de pai em pai) e cada raiz
+        que ainda tem um par em outra componente passa a apontar para a menor raiz vizinha. Em grades
+        isso termina em poucas rodadas, cada uma com operações sobre o array inteiro.
+        """
+        origens = np.asarray(origens, dtype=np.int64)
+        destinos = np.asarray(destinos, dtype=np.int64)
+        self.presentes[origens] = True
+        self.presentes[destinos] = True
+        pai = self.pai
+        while len(origens) > 0:
+            while True:
+                avos = pai[pai]
+                if np.array_equal(avos, pai):
+                    break
+                pai = avos
+            raizesOrigem, raizesDestino = pai[origens], pai[destinos]
+            separados = raizesOrigem != raizesDestino
+            origens, destinos = origens[separados], destinos[separados]
+            raizesOrigem, raizesDestino = raizesOrigem[separados], raizesDestino[separados]
+            np.minimum.at(pai, np.maximum(raizesOrigem, raizesDestino), np.minimum(raizesOrigem, raizesDestino))
+        self.pai = pai
+
+    def achata(self):
+        """
+        Leva o pai de cada nó direto à raiz da sua componente, então cada consulta seguinte lê no máximo dois pais.
+        """
+        pai = self.pai
+        while True:
+            avos = pai[pai]
+            if np.array_equal(avos, pai):
+                break
+            pai = avos
+        self.pai = pai
+
+    def conectados(self, u, v):
+        """
+        Retorna se os nós u e v estão no índice e na mesma componente.
+        """
+        raizU = self.raiz(u)
+        return raizU is not None and raizU == self.raiz(v)
@@ -0,0 +1,288 @@
+from collections.abc import Mapping
+import copy
+import numpy as np
+
+
+class GrafoCompacto:
+    """
+    Lista de adjacência compacta (CSR) para grafos cujos nós são coordenadas de uma grade.
+
+    Cada nó (tupla de coordenadas dentro de "forma") vira um id inteiro. Os ids ficam em um array
+    plano, na ordem em que os nós foram adicionados, e as arestas ficam em três arrays: "inicio"
+    (deslocamento das arestas de cada nó), "destinos" (índice do nó de destino) e "pesos". Um array
+    denso "indice" leva cada id da grade ao índice do nó, ou -1 se o pixel não é nó.
+
+    A classe se comporta como o dicionário de dicionários "lista": grafo[no] devolve um mapeamento
+    com os vizinhos e pesos, "no in grafo" e a iteração sobre os nós funcionam igual, e
+    grafo[u][v] = peso adiciona uma aresta. Assim buscaLargura, dijkstra e reconstruirCaminho
+    rodam sobre ela sem alterações.
+    """
+
+    def __init__(self, forma, indice=None) -> None:
+        self.forma = tuple(int(tamanho) for tamanho in forma)
+        self.passos = tuple(int(np.prod(self.forma[i + 1:], dtype=np.int64)) for i in range(len(self.forma)))
+        if indice is None:
+            indice = np.full(int(np.prod(self.forma, dtype=np.int64)), -1, dtype=np.int32)
+        self.indice = indice
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.inicio = np.zeros(1, dtype=np.int64)
+        self.destinos = np.zeros(0, dtype=np.int32)
+        self.pesos = np.zeros(0, dtype=np.uint8)
+        self._novosIds = []
+        self._novasArestas = []
+        self._arestasSoltas = ([], [], [])
+
+    def codifica(self, no):
+        """
+        Converte uma tupla de coordenadas no id do pixel na grade, ou -1 se ela estiver fora da grade.
+        """
+        if len(no) != len(self.forma):
+            return -1
+        id = 0
+        for coordenada, tamanho, passo in zip(no, self.forma, self.passos):
+            if not 0 <= coordenada < tamanho:
+                return -1
+            id += coordenada * passo
+        return id
+
+    def decodifica(self, id):
+        """
+        Converte o id de um pixel de volta na tupla de coordenadas.
+        """
+        no = []
+        for passo in self.passos:
+            coordenada, id = divmod(id, passo)
+            no.append(coordenada)
+        return tuple(no)
+
+    def adicionaNo(self, no):
+        """
+        Adiciona nó ao grafo.
+
+        Parâmetros:
+        - no: A tupla de coordenadas do nó.
+
+        Se o nó já existir, nada é feito.
+        """
+        id = self.codifica(no)
+        if id < 0:
+            raise KeyError(no)
+        if self.indice[id] < 0:
+            self.indice[id] = len(self.ids) + len(self._novosIds)
+            self._novosIds.append(id)
+
+    def adicionaNos(self, ids):
+        """
+        Adiciona de uma só vez os nós com os ids informados (array de inteiros), ignorando os que já existem.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        ids = ids[self.indice[ids] < 0]
+        ids = ids[np.sort(np.unique(ids, return_index=True)[1])]
+        self._consolidaNos()
+        self.indice[ids] = np.arange(len(self.ids), len(self.ids) + len(ids), dtype=np.int32)
+        self.ids = np.concatenate([self.ids, ids])
+
+    def adicionaAresta(self, u, v, pesoAresta):
+        """
+        Adiciona aresta entre os nós u e v com o peso informado, criando os nós se preciso.
+        Se a aresta já existir, seu peso é substituído, como acontece no dicionário "lista".
+        """
+        self.adicionaNo(u)
+        self.adicionaNo(v)
+        origens, destinos, pesos = self._arestasSoltas
+        origens.append(int(self.indice[self.codifica(u)]))
+        destinos.append(int(self.indice[self.codifica(v)]))
+        pesos.append(pesoAresta)
+
+    def adicionaArestas(self, origens, destinos, pesos):
+        """
+        Adiciona de uma só vez as arestas entre os ids de origem e de destino (arrays de inteiros),
+        criando os nós que ainda não existem.
+        """
+        origens = np.asarray(origens, dtype=np.int64)
+        destinos = np.asarray(destinos, dtype=np.int64)
+        self._consolidaNos()
+        self.adicionaNos(origens)
+        self.adicionaNos(destinos)
+        self._guardaArestasSoltas()
+        self._novasArestas.append((self.indice[origens], self.indice[destinos], np.broadcast_to(pesos, origens.shape)))
+
+    def _consolidaNos(self):
+        if self._novosIds:
+            self.ids = np.concatenate([self.ids, np.array(self._novosIds, dtype=np.int64)])
+            self._novosIds = []
+
+    def _guardaArestasSoltas(self):
+        origens, destinos, pesos = self._arestasSoltas
+        if origens:
+            self._novasArestas.append((np.array(origens), np.array(destinos), np.array(pesos)))
+            self._arestasSoltas = ([], [], [])
+
+    def _compacta(self):
+        """
+        Junta as arestas adicionadas desde a última leitura aos arrays CSR.
+
+        As arestas de cada nó mantêm a ordem de inserção; uma aresta repetida fica na posição da
+        primeira inserção com o peso da última, como no dicionário "lista".
+        """
+        self._consolidaNos()
+        self._guardaArestasSoltas()
+        numNos = len(self.ids)
+        if len(self.inicio) - 1 < numNos:
+            self.inicio = np.concatenate([self.inicio, np.full(numNos - len(self.inicio) + 1, self.inicio[-1])])
+        if not self._novasArestas:
+            return
+
+        origens = np.repeat(np.arange(numNos, dtype=np.int64), np.diff(self.inicio))
+        partes = [(origens, self.destinos, self.pesos)] + self._novasArestas
+        self._novasArestas = []
+        origens = np.concatenate([parte[0] for parte in partes]).astype(np.int64)
+        destinos = np.concatenate([parte[1] for parte in partes]).astype(np.int64)
+        pesos = np.concatenate([np.asarray(parte[2]).ravel() for parte in partes])
+
+        chave = origens * numNos + destinos
+        ordem = np.argsort(chave, kind="stable")
+        chave = chave[ordem]
+        novoGrupo = np.ones(len(chave), dtype=bool)
+        novoGrupo[1:] = chave[1:] != chave[:-1]
+        fimGrupo = np.roll(novoGrupo, -1)
+        primeiras = ordem[novoGrupo]
+        pesos = pesos[ordem[fimGrupo]]
+
+        ordem = np.argsort(primeiras, kind="stable")
+        ordem = ordem[np.argsort(origens[primeiras][ordem], kind="stable")]
+        origens = origens[primeiras][ordem]
+        self.destinos = destinos[primeiras][ordem].astype(np.int32)
+        self.pesos = self._tipoPesos(pesos)[ordem]
+        self.inicio = np.zeros(numNos + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origens, minlength=numNos), out=self.inicio[1:])
+
+    def consolida(self):
+        """
+        Junta aos arrays CSR os nós e as arestas adicionados desde a última leitura.
+        """
+        if self._pendente():
+            self._compacta()
+
+    def _tipoPesos(self, pesos):
+        """
+        Guarda os pesos em um byte quando todos são inteiros pequenos, como os pesos das imagens.
+        """
+        pesos = np.asarray(pesos)
+        if len(pesos) == 0 or (np.all(pesos == np.round(pesos)) and pesos.min() >= 0 and pesos.max() <= 255):
+            return pesos.astype(np.uint8)
+        return pesos.astype(np.float64)
+
+    def _pendente(self):
+        return self._novosIds or self._novasArestas or self._arestasSoltas[0] or len(self.inicio) <= len(self.ids)
+
+    def __len__(self):
+        return len(self.ids) + len(self._novosIds)
+
+    def __contains__(self, no):
+        id = self.codifica(no)
+        return id >= 0 and self.indice[id] >= 0
+
+    def __iter__(self):
+        self._consolidaNos()
+        for id in self.ids.tolist():
+            yield self.decodifica(id)
+
+    def __getitem__(self, no):
+        id = self.codifica(no)
+        if id < 0 or self.indice[id] < 0:
+            raise KeyError(no)
+        return VizinhosCompactos(self, int(self.indice[id]), no)
+
+    def __setitem__(self, no, vizinhos):
+        self.adicionaNo(no)
+        for vizinho, peso in vizinhos.items():
+            self.adicionaAresta(no, vizinho, peso)
+
+    def vizinhos(self, indiceNo):
+        """
+        Retorna os índices dos vizinhos e os pesos das arestas que saem do nó de índice "indiceNo".
+        """
+        if self._pendente():
+            self._compacta()
+        a, b = self.inicio[indiceNo], self.inicio[indiceNo + 1]
+        return self.destinos[a:b], self.pesos[a:b]
+
+    def arestas(self):
+        """
+        Retorna os arrays (origens, destinos, pesos) de todas as arestas, com os ids dos pixels de cada ponta.
+        """
+        if self._pendente():
+            self._compacta()
+        origens = np.repeat(self.ids, np.diff(self.inicio))
+        return origens, self.ids[self.destinos], self.pesos
+
+    def usaArrays(self, ids, inicio, destinos, pesos):
+        """
+        Troca os arrays de nós e de arestas pelos informados (por exemplo arrays mapeados de um arquivo, ver
+        storage.py), descartando o que estava pendente. Os arrays devem ser coerentes com o array "indice".
+        """
+        self.ids, self.inicio, self.destinos, self.pesos = ids, inicio, destinos, pesos
+        self._novosIds = []
+        self._novasArestas = []
+        self._arestasSoltas = ([], [], [])
+
+    def reverso(self):
+        """
+        Retorna um novo GrafoCompacto com todas as arestas invertidas (de v para u, com o mesmo peso).
+
+        Os arrays de nós são compartilhados com este grafo, então o reverso é uma fotografia do grafo atual:
+        depois de adicionar nós ou arestas, ele deve ser criado de novo.
+        """
+        if self._pendente():
+            self._compacta()
+        origens = np.repeat(np.arange(len(self.ids), dtype=np.int32), np.diff(self.inicio))
+        ordem = np.argsort(self.destinos, kind="stable")
+        reverso = copy.copy(self)
+        reverso._novosIds = []
+        reverso._novasArestas = []
+        reverso._arestasSoltas = ([], [], [])
+        reverso.destinos = origens[ordem]
+        reverso.pesos = self.pesos[ordem]
+        reverso.inicio = np.zeros(len(self.ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.destinos, minlength=len(self.ids)), out=reverso.inicio[1:])
+        return reverso
+
+    def bytesUsados(self):
+        """
+        Retorna o total de bytes ocupado pelos arrays do grafo.
+        """
+        if self._pendente():
+            self._compacta()
+        return sum(array.nbytes for array in [self.indice, self.ids, self.inicio, self.destinos, self.pesos])
+
+
+class VizinhosCompactos(Mapping):
+    """
+    Visão dos vizinhos de um nó do GrafoCompacto, com a mesma interface de lista[no].
+    """
+
+    def __init__(self, grafo, indiceNo, no) -> None:
+        self.grafo = grafo
+        self.indiceNo = indiceNo
+        self.no = no
+
+    def items(self):
+        destinos, pesos = self.grafo.vizinhos(self.indiceNo)
+        decodifica = self.grafo.decodifica
+        return [(decodifica(id), peso) for id, peso in zip(self.grafo.ids[destinos].tolist(), pesos.tolist())]
+
+    def __iter__(self):
+        return iter([vizinho for vizinho, _ in self.items()])
+
+    def __len__(self):
+        return len(self.grafo.vizinhos(self.indiceNo)[0])
+
+    def __getitem__(self, vizinho):
+        for no, peso in self.items():
+            if no == vizinho:
+                return peso
+        raise KeyError(vizinho)
+
+    def __setitem__(self, vizinho, peso):
+        self.grafo.adicionaAresta(self.no, vizinho, peso)
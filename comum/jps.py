@@ -0,0 +1,199 @@
+import heapq
+import numpy as np
+
+_DIRECOES = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+# Acima desse número de destinos a heurística é pré-calculada para a grade inteira.
+_MAX_DESTINOS_DIRETOS = 8
+
+
+class BuscaSaltos:
+    """
+    Jump Point Search (JPS) para grades de 4 vizinhos.
+
+    A grade é descrita por arrays (altura, base) indexados por [y, x]:
+    - livres: pixels passáveis;
+    - pesos: peso das arestas que saem de cada pixel;
+    - paradas: pixels onde os saltos sempre param e que são expandidos sem poda (opcional).
+
+    Nas regiões de peso 1 a busca não expande pixel por pixel: ela "salta" em linha reta até encontrar
+    um ponto de interesse (destino, vizinho forçado por um obstáculo ou pixel de parada). A ordem canônica
+    dos caminhos é vertical primeiro: andando na vertical, a busca também varre a horizontal para os dois
+    lados a cada passo; andando na horizontal, só vira para cima ou para baixo quando um obstáculo logo
+    atrás força a curva. Pixels com peso diferente de 1, e os pixels livres vizinhos deles, são tratados
+    como paradas: lá a busca volta à expansão normal, vizinho a vizinho, então os custos continuam iguais
+    aos do Dijkstra.
+    """
+
+    def __init__(self, livres, pesos=None, paradas=None) -> None:
+        self.livres = np.asarray(livres, dtype=bool)
+        self.altura, self.base = self.livres.shape
+        self.pesos = np.ones(self.livres.shape, dtype=np.int64) if pesos is None else np.asarray(pesos)
+
+        especiais = self.livres & (self.pesos != 1)
+        vizinhosEspeciais = np.zeros_like(especiais)
+        vizinhosEspeciais[1:] |= especiais[:-1]
+        vizinhosEspeciais[:-1] |= especiais[1:]
+        vizinhosEspeciais[:, 1:] |= especiais[:, :-1]
+        vizinhosEspeciais[:, :-1] |= especiais[:, 1:]
+
+        self.paradas = self.livres & (especiais | vizinhosEspeciais)
+        if paradas is not None:
+            self.paradas |= self.livres & np.asarray(paradas, dtype=bool)
+
+        # Para detectar vizinhos forçados, um pixel mais caro conta como obstáculo: o caminho que passaria
+        # por ele não tem o mesmo custo que o caminho canônico.
+        self._abertos = (self.livres & ~especiais).tolist()
+        self._livres = self.livres.tolist()
+        self._paradas = self.paradas.tolist()
+        self._pesos = self.pesos.tolist()
+        self._destinos = set()
+
+    def aberto(self, x, y):
+        return 0 <= x < self.base and 0 <= y < self.altura and self._abertos[y][x]
+
+    def livre(self, x, y):
+        return 0 <= x < self.base and 0 <= y < self.altura and self._livres[y][x]
+
+    def _forcadoHorizontal(self, x, y, dx):
+        return any(self.aberto(x, y + s) and not self.aberto(x - dx, y + s) for s in (-1, 1))
+
+    def _saltaHorizontal(self, x, y, dx):
+        """
+        Anda na horizontal a partir de (x, y) e retorna o primeiro ponto de interesse, ou None.
+        """
+        while True:
+            x += dx
+            if not self.livre(x, y):
+                return None
+            if (x, y) in self._destinos or self._paradas[y][x] or self._forcadoHorizontal(x, y, dx):
+                return x, y
+
+    def _saltaVertical(self, x, y, dy):
+        """
+        Anda na vertical a partir de (x, y), varrendo a horizontal a cada passo, e retorna o primeiro ponto
+        de interesse, ou None.
+        """
+        while True:
+            y += dy
+            if not self.livre(x, y):
+                return None
+            if (x, y) in self._destinos or self._paradas[y][x]:
+                return x, y
+            if self._saltaHorizontal(x, y, -1) is not None or self._saltaHorizontal(x, y, 1) is not None:
+                return x, y
+
+    def _direcoesPodadas(self, x, y, direcao):
+        """
+        Retorna as direções canônicas a partir de (x, y) quando se chegou andando em "direcao".
+        """
+        dx, dy = direcao
+        if dy != 0:
+            return [(0, dy), (-1, 0), (1, 0)]
+        direcoes = [(dx, 0)]
+        for s in (-1, 1):
+            if self.aberto(x, y + s) and not self.aberto(x - dx, y + s):
+                direcoes.append((0, s))
+        return direcoes
+
+    def _heuristica(self, destinos):
+        if len(destinos) <= _MAX_DESTINOS_DIRETOS:
+            return lambda x, y: min(abs(x - a) + abs(y - b) for a, b in destinos)
+
+        dist = np.full((self.altura, self.base), np.inf)
+        for a, b in destinos:
+            dist[b, a] = 0
+        for x in range(1, self.base):
+            np.minimum(dist[:, x], dist[:, x - 1] + 1, out=dist[:, x])
+        for x in range(self.base - 2, -1, -1):
+            np.minimum(dist[:, x], dist[:, x + 1] + 1, out=dist[:, x])
+        for y in range(1, self.altura):
+            np.minimum(dist[y], dist[y - 1] + 1, out=dist[y])
+        for y in range(self.altura - 2, -1, -1):
+            np.minimum(dist[y], dist[y + 1] + 1, out=dist[y])
+        tabela = dist.tolist()
+        return lambda x, y: tabela[y][x]
+
+    def busca(self, origens, destinos):
+        """
+        Busca o caminho de menor custo entre um conjunto de origens e um conjunto de destinos.
+
+        Parâmetros:
+        - origens: Pixels (x, y) de início.
+        - destinos: Pixels (x, y) onde a busca pode terminar.
+
+        Retorna:
+        Uma tupla (caminho, custo, destino, expandidos) com todos os pixels (x, y) do caminho (os trechos
+        saltados são preenchidos), a soma dos pesos, o destino alcançado e o número de nós expandidos.
+        Se nenhum destino for alcançável, retorna ([], inf, None, expandidos).
+        """
+        self._destinos = {destino for destino in destinos if self.livre(*destino)}
+        if not self._destinos:
+            return [], float("inf"), None, 0
+        heuristica = self._heuristica(list(self._destinos))
+
+        # Cada estado é um pixel junto com a direção em que se chegou nele (None nas origens).
+        dist = {}
+        pred = {}
+        Q = []
+        for origem in origens:
+            estado = (origem, None)
+            if self.livre(*origem) and estado not in dist:
+                dist[estado] = 0
+                pred[estado] = None
+                h = heuristica(*origem)
+                heapq.heappush(Q, (h, h, 0, estado))
+
+        expandidos = 0
+        while Q:
+            _, _, g, estado = heapq.heappop(Q)
+            if g > dist[estado]:
+                continue
+            (x, y), direcao = estado
+            if (x, y) in self._destinos:
+                return self._caminho(estado, pred), g, (x, y), expandidos
+
+            expandidos += 1
+            sucessores = []
+            if direcao is None or self._paradas[y][x]:
+                # Expansão normal: cada vizinho livre a um passo, com o peso do pixel atual.
+                for dx, dy in _DIRECOES:
+                    if self.livre(x + dx, y + dy):
+                        sucessores.append(((x + dx, y + dy), (dx, dy), self._pesos[y][x]))
+            else:
+                for dx, dy in self._direcoesPodadas(x, y, direcao):
+                    if dy == 0:
+                        salto = self._saltaHorizontal(x, y, dx)
+                    else:
+                        salto = self._saltaVertical(x, y, dy)
+                    if salto is not None:
+                        sucessores.append((salto, (dx, dy), abs(salto[0] - x) + abs(salto[1] - y)))
+
+            for no, novaDirecao, custo in sucessores:
+                novoEstado = (no, novaDirecao)
+                if dist.get(novoEstado, float("inf")) > g + custo:
+                    dist[novoEstado] = g + custo
+                    pred[novoEstado] = estado
+                    h = heuristica(*no)
+                    heapq.heappush(Q, (g + custo + h, h, g + custo, novoEstado))
+
+        return [], float("inf"), None, expandidos
+
+    def _caminho(self, estado, pred):
+        """
+        Reconstrói o caminho completo, preenchendo os pixels entre pontos de salto consecutivos.
+        """
+        pontos = []
+        while estado is not None:
+            pontos.append(estado[0])
+            estado = pred[estado]
+        pontos.reverse()
+
+        caminho = pontos[:1]
+        for (x, y), (proximoX, proximoY) in zip(pontos, pontos[1:]):
+            dx = (proximoX > x) - (proximoX < x)
+            dy = (proximoY > y) - (proximoY < y)
+            while (x, y) != (proximoX, proximoY):
+                x, y = x + dx, y + dy
+                caminho.append((x, y))
+        return caminho
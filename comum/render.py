@@ -0,0 +1,165 @@
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+
+# Classe das células que não são desenhadas (ficam com a cor de fundo).
+VAZIA = 255
+
+# Abaixo desse espaçamento (em pixels da imagem) as células são desenhadas como quadrados cheios, sem círculo.
+_ESPACAMENTO_MINIMO_CIRCULO = 3
+
+
+@lru_cache(maxsize=64)
+def _amostragem(largura, altura, espacamento, base, alturaMapa, x0=0, y0=0):
+    """
+    Calcula, para cada pixel da imagem, a célula do mapa que ele mostra e se ele cai no círculo ou no contorno.
+    A imagem começa no pixel (x0, y0) do mapa inteiro desenhado com esse espaçamento.
+
+    Retorna:
+    Uma tupla (linhas, colunas, circulo, contorno): os índices de linha e coluna do mapa de cada linha e coluna
+    da imagem que cai dentro do mapa, e as máscaras (len(linhas), len(colunas)) do interior do círculo de cada
+    célula (raio 0.4 * espacamento, como nas elipses do ImageDraw) e do seu contorno de 1 pixel. O resultado
+    depende só das dimensões, então redesenhos com o mesmo zoom reaproveitam as máscaras.
+    """
+    posicoesY = (np.arange(altura) + y0 + 0.5) / espacamento
+    posicoesX = (np.arange(largura) + x0 + 0.5) / espacamento
+    linhas = posicoesY.astype(np.int64)
+    colunas = posicoesX.astype(np.int64)
+    linhas = linhas[linhas < alturaMapa]
+    colunas = colunas[colunas < base]
+
+    if espacamento < _ESPACAMENTO_MINIMO_CIRCULO:
+        circulo = np.ones((len(linhas), len(colunas)), dtype=bool)
+        contorno = np.zeros_like(circulo)
+    else:
+        dy = (posicoesY[:len(linhas)] - linhas - 0.5) * espacamento
+        dx = (posicoesX[:len(colunas)] - colunas - 0.5) * espacamento
+        distancias = dy[:, np.newaxis] ** 2 + dx[np.newaxis, :] ** 2
+        raio = 0.4 * espacamento
+        circulo = distancias <= raio ** 2
+        contorno = circulo & (distancias > (raio - 1) ** 2)
+
+    for array in (linhas, colunas, circulo, contorno):
+        array.flags.writeable = False
+    return linhas, colunas, circulo, contorno
+
+
+def desenhaCelulas(classes, paleta, tamanho, espacamento, fundo=(255, 255, 255), corContorno=(0, 0, 0), origem=(0, 0)):
+    """
+    Desenha de uma só vez as células de um mapa em um array RGB.
+
+    Parâmetros:
+    - classes: Array (altura, base) com o índice na paleta da cor de cada célula, ou VAZIA para não desenhar.
+    - paleta: Sequência de cores RGB, uma por classe.
+    - tamanho: O tamanho (largura, altura) da imagem gerada.
+    - espacamento: O lado de cada célula em pixels da imagem.
+    - fundo, corContorno: As cores do fundo e do contorno das células.
+    - origem: O pixel (x, y) do mapa inteiro desenhado que fica no canto superior esquerdo da imagem, para
+      desenhar só uma janela do mapa.
+
+    Cada pixel da imagem mostra a célula que fica embaixo dele (amostragem pelo vizinho mais próximo): as
+    células são círculos coloridos com contorno, como os desenhados com ImageDraw.ellipse, ou quadrados cheios
+    quando o espaçamento é pequeno demais para um círculo. O trabalho é proporcional ao tamanho da imagem e
+    não ao número de nós, então redesenhar um mapa grande leva milissegundos.
+
+    Retorna:
+    Um array (altura, largura, 3) de uint8, pronto para Image.fromarray.
+    """
+    largura, altura = tamanho
+    imagem = np.empty((altura, largura, 3), dtype=np.uint8)
+    imagem[...] = fundo
+
+    x0, y0 = (int(valor) for valor in origem)
+    linhas, colunas, circulo, contorno = _amostragem(
+        largura, altura, float(espacamento), classes.shape[1], classes.shape[0], x0, y0
+    )
+    amostras = np.asarray(classes)[np.ix_(linhas, colunas)]
+    presentes = amostras != VAZIA
+
+    cores = np.zeros((256, 3), dtype=np.uint8)
+    cores[:len(paleta)] = np.asarray(paleta, dtype=np.uint8).reshape(-1, 3)
+
+    regiao = imagem[:len(linhas), :len(colunas)]
+    interior = presentes & circulo
+    regiao[interior] = cores[amostras[interior]]
+    regiao[presentes & contorno] = corContorno
+    return imagem
+
+
+class CacheBlocos:
+    """
+    Desenha janelas de um mapa a partir de blocos quadrados já desenhados, guardados em um cache LRU.
+
+    O mapa inteiro, desenhado com um espaçamento (zoom), é dividido em blocos de tamanhoBloco pixels. Uma
+    janela é montada só com os blocos que ela cobre; cada bloco é desenhado com desenhaCelulas na primeira
+    vez e reaproveitado enquanto estiver no cache, então arrastar a janela ou voltar a um zoom já visto
+    só desenha os blocos que ainda não estão prontos. O cache guarda no máximo limiteBytes de blocos e
+    descarta primeiro os usados há mais tempo.
+    """
+
+    def __init__(self, limiteBytes=64 << 20, tamanhoBloco=256) -> None:
+        self.limiteBytes = limiteBytes
+        self.tamanhoBloco = tamanhoBloco
+        self.blocos = OrderedDict()
+        self.bytes = 0
+
+    def desenhaJanela(self, chave, classes, paleta, tamanho, espacamento, origem, fundo=(255, 255, 255)):
+        """
+        Desenha a janela do mapa que começa no pixel "origem" do mapa inteiro desenhado.
+
+        Parâmetros:
+        - chave: Identifica o conteúdo de classes e paleta (por exemplo o hash do mapa e o caminho desenhado).
+          Blocos de outra chave nunca são reaproveitados.
+        - classes, paleta, espacamento, fundo: Como no desenhaCelulas.
+        - tamanho: O tamanho (largura, altura) da janela.
+        - origem: O pixel (x, y) do mapa inteiro desenhado que fica no canto superior esquerdo da janela.
+
+        Retorna:
+        Um array (altura, largura, 3) de uint8, pronto para Image.fromarray.
+        """
+        largura, altura = tamanho
+        x0, y0 = (int(valor) for valor in origem)
+        lado = self.tamanhoBloco
+        janela = np.empty((altura, largura, 3), dtype=np.uint8)
+        janela[...] = fundo
+
+        for blocoY in range(max(y0, 0) // lado, max(y0 + altura - 1, 0) // lado + 1):
+            for blocoX in range(max(x0, 0) // lado, max(x0 + largura - 1, 0) // lado + 1):
+                bloco = self._bloco(chave, classes, paleta, espacamento, blocoX, blocoY, fundo)
+                # Parte do bloco que cai dentro da janela, nas coordenadas do mapa inteiro desenhado.
+                inicioY, fimY = max(blocoY * lado, y0), min((blocoY + 1) * lado, y0 + altura)
+                inicioX, fimX = max(blocoX * lado, x0), min((blocoX + 1) * lado, x0 + largura)
+                if inicioY >= fimY or inicioX >= fimX:
+                    continue
+                janela[inicioY - y0:fimY - y0, inicioX - x0:fimX - x0] = bloco[
+                    inicioY - blocoY * lado:fimY - blocoY * lado, inicioX - blocoX * lado:fimX - blocoX * lado
+                ]
+        return janela
+
+    def _bloco(self, chave, classes, paleta, espacamento, blocoX, blocoY, fundo):
+        """
+        Retorna o bloco (blocoX, blocoY) do mapa desenhado, do cache ou desenhando-o agora.
+        """
+        chaveBloco = (chave, float(espacamento), blocoX, blocoY)
+        if chaveBloco in self.blocos:
+            self.blocos.move_to_end(chaveBloco)
+            return self.blocos[chaveBloco]
+
+        lado = self.tamanhoBloco
+        bloco = desenhaCelulas(classes, paleta, (lado, lado), espacamento, fundo, origem=(blocoX * lado, blocoY * lado))
+        self.blocos[chaveBloco] = bloco
+        self.bytes += bloco.nbytes
+        while self.bytes > self.limiteBytes and len(self.blocos) > 1:
+            _, antigo = self.blocos.popitem(last=False)
+            self.bytes -= antigo.nbytes
+        return bloco
+
+    def limpa(self):
+        """
+        Remove todos os blocos do cache.
+        """
+        self.blocos.clear()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self.blocos)
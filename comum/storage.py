@@ -0,0 +1,164 @@
+from collections.abc import Sequence
+import hashlib
+import json
+import os
+import numpy as np
+
+# Versão do formato em disco. Arquivos de outra versão são recusados na leitura.
+VERSAO = 1
+
+_META = "meta.json"
+
+
+def hashArquivos(caminhos):
+    """
+    Calcula o hash (SHA-1) do conteúdo de um ou mais arquivos, na ordem informada.
+
+    Parâmetros:
+    - caminhos: O caminho de um arquivo ou uma lista de caminhos.
+    """
+    if isinstance(caminhos, (str, os.PathLike)):
+        caminhos = [caminhos]
+    resumo = hashlib.sha1()
+    for caminho in caminhos:
+        with open(caminho, "rb") as arquivo:
+            for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+                resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+def salvaArrays(diretorio, arrays, meta):
+    """
+    Salva um grafo pronto em um diretório, com um arquivo .npy por array e um meta.json.
+
+    Parâmetros:
+    - diretorio: O diretório de destino (criado se não existir).
+    - arrays: Dicionário {nome: array} com os arrays do grafo.
+    - meta: Dicionário com os demais dados do grafo (números, tuplas e strings), incluindo o hash da origem.
+
+    O meta.json é apagado antes e escrito por último, então um diretório que ficou pela metade (por um erro
+    no meio da escrita) não tem meta.json e é recusado pelo carregaArrays.
+    """
+    preparaDiretorio(diretorio)
+    for nome, array in arrays.items():
+        np.save(os.path.join(diretorio, nome + ".npy"), np.ascontiguousarray(array))
+    escreveMeta(diretorio, arrays, meta)
+
+
+def preparaDiretorio(diretorio):
+    """
+    Cria o diretório de um grafo salvo (se não existir) e apaga o meta.json de um grafo anterior, que só é
+    escrito de novo (com escreveMeta) depois de todos os arrays.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    caminhoMeta = os.path.join(diretorio, _META)
+    if os.path.exists(caminhoMeta):
+        os.remove(caminhoMeta)
+
+
+def escreveMeta(diretorio, nomes, meta):
+    """
+    Escreve o meta.json de um grafo salvo, o último passo do salvamento.
+
+    Parâmetros:
+    - diretorio: O diretório do grafo.
+    - nomes: Os nomes dos arrays já salvos no diretório.
+    - meta: Dicionário com os demais dados do grafo.
+    """
+    with open(os.path.join(diretorio, _META), "w", encoding="utf-8") as arquivo:
+        json.dump(dict(meta, versao=VERSAO, arrays=sorted(nomes)), arquivo)
+
+
+def criaArrayEmDisco(diretorio, nome, forma, tipo):
+    """
+    Cria o arquivo .npy de um array que será preenchido aos poucos, sem que ele precise caber na memória.
+
+    Parâmetros:
+    - diretorio: O diretório do grafo (ver preparaDiretorio).
+    - nome: O nome do array, que vira o arquivo nome.npy.
+    - forma, tipo: A forma e o tipo do array.
+
+    Retorna:
+    O array mapeado do arquivo para escrita (np.lib.format.open_memmap). Um array vazio não pode ser mapeado,
+    então é salvo direto e retornado em memória.
+    """
+    caminho = os.path.join(diretorio, nome + ".npy")
+    if int(np.prod(forma, dtype=np.int64)) == 0:
+        array = np.zeros(forma, dtype=tipo)
+        np.save(caminho, array)
+        return array
+    return np.lib.format.open_memmap(caminho, mode="w+", dtype=tipo, shape=tuple(forma))
+
+
+def carregaArrays(diretorio, origem=None):
+    """
+    Carrega um grafo salvo com salvaArrays, mapeando os arrays do disco na memória.
+
+    Parâmetros:
+    - diretorio: O diretório onde o grafo foi salvo.
+    - origem: O arquivo (ou lista de arquivos) de onde o grafo foi criado. Se informado, o hash do conteúdo
+      atual é comparado com o guardado e um grafo desatualizado é recusado.
+
+    Os arrays são abertos com np.load(mmap_mode="c"): nada é lido até ser usado, e escritas ficam só na
+    memória, sem alterar o arquivo. Se o diretório não existir, for de outra versão ou estiver desatualizado,
+    imprime o motivo e retorna None.
+
+    Retorna:
+    Uma tupla (arrays, meta) com o dicionário {nome: array} e o dicionário de metadados.
+    """
+    caminhoMeta = os.path.join(diretorio, _META)
+    try:
+        with open(caminhoMeta, encoding="utf-8") as arquivo:
+            meta = json.load(arquivo)
+    except (OSError, ValueError) as e:
+        print(f"Grafo salvo em {diretorio} não encontrado ou incompleto: {e}")
+        return None
+
+    if meta.get("versao") != VERSAO:
+        print(f"Grafo salvo em {diretorio} tem versão {meta.get('versao')}, esperada {VERSAO}.")
+        return None
+    if origem is not None and meta.get("origem") != hashArquivos(origem):
+        print(f"Grafo salvo em {diretorio} está desatualizado: o bitmap de origem mudou.")
+        return None
+
+    arrays = {nome: np.load(os.path.join(diretorio, nome + ".npy"), mmap_mode="c") for nome in meta["arrays"]}
+    return arrays, meta
+
+
+class PixelsSalvos(Sequence):
+    """
+    Lista somente leitura de pixels guardados em um array (n, dimensões) de um grafo salvo.
+
+    Substitui as listas de tuplas (areasVerdes, pixelsPretos, ...) de um grafo carregado sem converter o
+    array inteiro: cada acesso devolve a tupla do pixel. Na primeira consulta "pixel in lista" o array é lido
+    uma vez para um conjunto, e as consultas seguintes saem em O(1).
+    """
+
+    def __init__(self, array) -> None:
+        self.array = array
+        self._conjunto = None
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [tuple(pixel) for pixel in self.array[i].tolist()]
+        return tuple(self.array[i].tolist())
+
+    def __iter__(self):
+        for inicio in range(0, len(self.array), 1 << 16):
+            yield from (tuple(pixel) for pixel in self.array[inicio:inicio + (1 << 16)].tolist())
+
+    def __contains__(self, pixel):
+        if self._conjunto is None:
+            self._conjunto = set(self)
+        try:
+            return tuple(pixel) in self._conjunto
+        except TypeError:
+            return False
+
+    def __eq__(self, outra):
+        if isinstance(outra, (list, PixelsSalvos)):
+            return len(self) == len(outra) and all(a == b for a, b in zip(self, outra))
+        return NotImplemented
@@ -0,0 +1,118 @@
+import queue
+import threading
+
+
+class Cancelado(Exception):
+    """
+    Lançada dentro de uma tarefa quando um pedido mais novo do mesmo canal a substituiu.
+    """
+
+
+class Trabalhador:
+    """
+    Executa as tarefas pesadas das interfaces (criar o grafo, buscar, desenhar) fora da thread do Tk.
+
+    As tarefas rodam uma de cada vez em uma thread separada, e a janela continua respondendo enquanto isso.
+    A thread é daemon, então uma tarefa longa ainda rodando não impede o programa de terminar quando a janela fecha.
+    Cada tarefa pertence a um canal (por exemplo "grafo" ou "busca"), e um pedido novo em um canal substitui
+    o anterior: se o anterior ainda não começou, ele é descartado; se já está rodando, ele é interrompido no
+    próximo aviso de progresso e o seu resultado é ignorado.
+
+    O Tk não pode ser usado de outra thread, então os avisos de progresso, os resultados e os erros vão para
+    uma fila que a thread do Tk esvazia a cada "intervalo" milissegundos (com root.after), chamando ali as
+    funções aoProgredir, aoTerminar e aoFalhar.
+    """
+
+    def __init__(self, root, intervalo=50) -> None:
+        self.root = root
+        self.intervalo = intervalo
+        self.tarefas = queue.Queue()
+        self.fila = queue.Queue()
+        self.geracoes = {}
+        self._trava = threading.Lock()
+        self._thread = threading.Thread(target=self._rodaTarefas, daemon=True)
+        self._thread.start()
+        self.root.after(self.intervalo, self._processaFila)
+
+    def executa(self, canal, tarefa, aoTerminar, aoFalhar=None, aoProgredir=None):
+        """
+        Agenda uma tarefa, substituindo o pedido anterior do mesmo canal.
+
+        Parâmetros:
+        - canal: O nome do canal da tarefa.
+        - tarefa: Função que recebe a função progresso(mensagem) e retorna o resultado. Ela roda fora da thread do
+          Tk, então não pode usar widgets; cada chamada a progresso avisa a interface e lança Cancelado se a tarefa
+          foi substituída.
+        - aoTerminar: Chamada na thread do Tk com o resultado.
+        - aoFalhar: Chamada na thread do Tk com a exceção, se a tarefa falhar. Se não for fornecida, o erro é impresso.
+        - aoProgredir: Chamada na thread do Tk com cada mensagem de progresso.
+        """
+        with self._trava:
+            geracao = self.geracoes.get(canal, 0) + 1
+            self.geracoes[canal] = geracao
+
+        def atual():
+            return self.geracoes.get(canal) == geracao
+
+        def progresso(mensagem):
+            if not atual():
+                raise Cancelado()
+            if aoProgredir is not None:
+                self.fila.put((atual, aoProgredir, mensagem))
+
+        def roda():
+            if not atual():
+                return  # Substituída antes de começar
+            try:
+                resultado = tarefa(progresso)
+            except Cancelado:
+                return
+            except Exception as e:
+                self.fila.put((atual, aoFalhar or self._imprimeErro, e))
+                return
+            self.fila.put((atual, aoTerminar, resultado))
+
+        self.tarefas.put(roda)
+
+    def cancela(self, canal):
+        """
+        Descarta o pedido pendente ou em andamento do canal.
+        """
+        with self._trava:
+            self.geracoes[canal] = self.geracoes.get(canal, 0) + 1
+
+    def _rodaTarefas(self):
+        """
+        Laço da thread das tarefas: roda cada tarefa agendada, na ordem, até receber None (ver fecha).
+        """
+        while True:
+            roda = self.tarefas.get()
+            if roda is None:
+                return
+            roda()
+
+    def _imprimeErro(self, erro):
+        print("Erro na tarefa em segundo plano:", erro)
+
+    def _processaFila(self):
+        """
+        Entrega na thread do Tk os avisos e resultados das tarefas que ainda não foram substituídas.
+        """
+        while True:
+            try:
+                atual, funcao, valor = self.fila.get_nowait()
+            except queue.Empty:
+                break
+            if atual():
+                funcao(valor)
+        self.root.after(self.intervalo, self._processaFila)
+
+    def fecha(self):
+        """
+        Cancela os pedidos pendentes e encerra a thread das tarefas depois da tarefa em andamento, sem esperar
+        por ela.
+        """
+        with self._trava:
+            for canal in self.geracoes:
+                self.geracoes[canal] += 1
+        self.tarefas.put(None)